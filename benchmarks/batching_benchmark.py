@@ -0,0 +1,81 @@
+"""
+Бенчмарк микро-батчинга: запросы в секунду с батчингом и без
+против локального фейкового API (services/mock_api.py)
+
+Запуск из корня проекта: python -m benchmarks.batching_benchmark
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+# Кэши не должны влиять на замер
+os.environ["DISK_CACHE_ENABLED"] = "0"
+# Ограничитель частоты запросов тоже: иначе без батчинга измеряется он, а не API
+os.environ["RATE_LIMIT_RPS"] = "0"
+
+from aiohttp import web
+
+import services.api_client as api_client
+from services.backends import FtapiBackend, backend_router
+from services.batching import TranslationBatcher
+from services.http_client import http_client
+from services.mock_api import create_app
+from services.translation_cache import translation_cache
+
+
+async def run_load(requests: int, concurrency: int, run_id: str) -> float:
+    """
+    Отправляет requests уникальных текстов не более чем concurrency одновременно
+
+    Returns:
+        Количество запросов в секунду
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            result = await api_client.translate_text(f"phrase {run_id} {i}", "en", "ru")
+            assert result == f"PHRASE {run_id} {i}".upper(), result
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк батчинга запросов перевода")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--server-concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+
+    app = create_app(latency=args.latency, max_concurrency=args.server_concurrency)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    backend_router.backends = [FtapiBackend("mock", f"http://127.0.0.1:{args.port}")]
+
+    try:
+        results = {}
+        for mode in ("off", "on"):
+            translation_cache.clear()
+            batcher = TranslationBatcher(api_client._request_translation) if mode == "on" else None
+            api_client.translation_batcher = batcher
+            app["stats"]["requests"] = 0
+            rps = await run_load(args.requests, args.concurrency, mode)
+            results[mode] = rps
+            print(f"batching {mode:>3}: {rps:8.1f} req/s, upstream requests: {app['stats']['requests']}")
+            if batcher is not None:
+                print(f"             {batcher.get_stats()}")
+        print(f"speedup: x{results['on'] / results['off']:.1f}")
+    finally:
+        await http_client.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
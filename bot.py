@@ -10,11 +10,20 @@ from config.settings import BOT_TOKEN
 from routers.commands import router as commands_router
 from routers.handlers.translation import router as translation_router
 from routers.handlers.settings import router as settings_router
-from routers.handlers.admin import router as admin_router
+from routers.handlers.admin import router as admin_router, banned_users_store
 from middlewares.check_language import CheckLanguageMiddleware
 from middlewares.antispam import AntiSpamMiddleware
 from utils.logger import logger
-from utils.formatters import load_user_settings  # Ensure user settings are loaded
+from utils.formatters import load_user_settings, settings_store  # Ensure user settings are loaded
+from services.http_client import http_client
+from services.disk_cache import disk_cache
+from services.api_client import languages_catalog
+from services.scheduler import translation_scheduler
+from services.translation_memory import translation_memory
+from services.prewarm import cache_prewarmer
+from services.popular_phrases import popular_phrases
+from services.history_storage import load_history, history_cache
+from services.storage_io import shutdown_storage_io
 from config.settings import ADMIN_IDS
 
 async def set_bot_commands(bot: Bot):
@@ -35,6 +44,7 @@ async def set_bot_commands(bot: Bot):
     admin_commands = user_commands + [
         BotCommand(command="admin", description="⚙️ Админ-панель"),
         BotCommand(command="stats", description="📊 Статистика бота"),
+        BotCommand(command="health", description="🩺 Состояние API перевода"),
         BotCommand(command="broadcast", description="📢 Рассылка сообщений"),
         BotCommand(command="ban", description="🚫 Заблокировать пользователя"),
         BotCommand(command="unban", description="✅ Разблокировать пользователя"),
@@ -91,6 +101,38 @@ async def main():
     # Загружаем пользовательские настройки
     load_user_settings()
     
+    # Запускаем акторы, которые по очереди применяют и сохраняют изменения настроек и блокировок
+    await settings_store.start()
+    await banned_users_store.start()
+    
+    # Открываем хранилище истории, загружаем её в память и запускаем фоновую запись
+    await history_cache.start()
+    
+    # Строим память переводов и счётчик фраз для прогрева по истории
+    if translation_memory is not None or popular_phrases is not None:
+        history = load_history()
+        if translation_memory is not None:
+            translation_memory.rebuild(history)
+        if popular_phrases is not None:
+            popular_phrases.rebuild(history)
+    
+    # Открываем общую HTTP-сессию для запросов к API перевода
+    await http_client.start()
+    
+    # Открываем дисковый кэш переводов
+    if disk_cache is not None:
+        await disk_cache.start()
+    
+    # Загружаем снимок списка языков и запускаем его фоновое обновление
+    await languages_catalog.start()
+    
+    # Запускаем воркеры планировщика переводов
+    await translation_scheduler.start()
+    
+    # Запускаем фоновый прогрев кэша популярными фразами
+    if cache_prewarmer is not None:
+        await cache_prewarmer.start()
+    
     # Устанавливаем команды бота
     await set_bot_commands(bot)
     
@@ -100,6 +142,18 @@ async def main():
     except Exception as e:
         logger.error(f"Ошибка при запуске бота: {e}")
     finally:
+        if cache_prewarmer is not None:
+            await cache_prewarmer.close()
+        await translation_scheduler.close()
+        await languages_catalog.close()
+        await http_client.close()
+        await history_cache.close()
+        if disk_cache is not None:
+            await disk_cache.close()
+        await settings_store.close()
+        await banned_users_store.close()
+        # Дожидаемся начатых записей в файлы хранилища
+        shutdown_storage_io()
         await bot.session.close()
 
 if __name__ == "__main__":
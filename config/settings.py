@@ -32,9 +32,124 @@ if ADMIN_IDS_STR:
 
 # Настройки API
 TRANSLATION_API_URL = os.getenv("TRANSLATION_API_URL", "https://ftapi.pythonanywhere.com/")
+# Провайдеры перевода: "имя=адрес" или "имя=тип:адрес" через запятую
+# Пусто - один провайдер по адресу TRANSLATION_API_URL
+TRANSLATION_BACKENDS = os.getenv("TRANSLATION_BACKENDS", "")
 
-# Максимальная длина текста для перевода
-MAX_TEXT_LENGTH = 4000
+# Настройки пула HTTP-соединений
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", 100))  # Всего соединений в пуле
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 20))  # Соединений на один хост
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", 300))  # Время жизни кэша DNS в секундах
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30))  # Удержание простаивающих соединений
+
+# Настройки in-memory кэша переводов
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", 10000))  # Максимум записей
+TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", 86400))  # Время жизни записи в секундах
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_MAX_BYTES", 32 * 1024 * 1024))  # Бюджет памяти
+
+# Настройки дискового кэша переводов
+DISK_CACHE_ENABLED = os.getenv("DISK_CACHE_ENABLED", "1") == "1"
+DISK_CACHE_FILE = os.getenv("DISK_CACHE_FILE", "storage/translation_cache.sqlite3")
+DISK_CACHE_TTL = int(os.getenv("DISK_CACHE_TTL", 30 * 86400))  # Время жизни записи в секундах
+DISK_CACHE_MAX_BYTES = int(os.getenv("DISK_CACHE_MAX_BYTES", 256 * 1024 * 1024))  # Лимит размера переводов
+DISK_CACHE_COMPACT_INTERVAL = int(os.getenv("DISK_CACHE_COMPACT_INTERVAL", 3600))  # Интервал компактизации
+
+# Настройки микро-батчинга запросов перевода
+BATCH_ENABLED = os.getenv("BATCH_ENABLED", "1") == "1"
+BATCH_WINDOW = float(os.getenv("BATCH_WINDOW", 0.015))  # Окно сбора пачки в секундах
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 16))  # Максимум текстов в пачке
+BATCH_MAX_CHARS = int(os.getenv("BATCH_MAX_CHARS", 2000))  # Максимальная длина объединённого текста
+BATCH_SEPARATOR = os.getenv("BATCH_SEPARATOR", "\n|||\n")  # Разделитель текстов в пачке
+
+# Минимальная уверенность локального определения языка для показа и записи в историю
+DETECTION_MIN_CONFIDENCE = float(os.getenv("DETECTION_MIN_CONFIDENCE", 0.8))
+# Сколько букв нужно, чтобы различать языки одной письменности (русский и украинский)
+DETECTION_MIN_LETTERS = int(os.getenv("DETECTION_MIN_LETTERS", 10))
+
+# Уверенность определения языка, при которой текст на целевом языке не отправляется в API
+SAME_LANGUAGE_MIN_CONFIDENCE = float(os.getenv("SAME_LANGUAGE_MIN_CONFIDENCE", 0.8))
+
+# Настройки каталога языков
+LANGUAGES_TTL = int(os.getenv("LANGUAGES_TTL", 86400))  # Через сколько секунд список языков обновляется
+LANGUAGES_FAILURE_TTL = int(os.getenv("LANGUAGES_FAILURE_TTL", 60))  # Пауза после ошибки загрузки
+LANGUAGES_SNAPSHOT_FILE = os.getenv("LANGUAGES_SNAPSHOT_FILE", "storage/languages.json")  # Снимок списка на диске
+
+# Ограничение частоты запросов к каждому провайдеру перевода
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", 10))  # Запросов в секунду, 0 - без ограничения
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 20))  # Запросов подряд без пауз
+
+# Настройки автоматического выключателя запросов к API перевода
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))  # Ошибок подряд до размыкания
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", 30))  # Пауза перед пробными запросами
+CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", 1))  # Одновременных пробных запросов
+
+# Настройки адаптивного лимита одновременных запросов к API перевода
+CONCURRENCY_INITIAL_LIMIT = int(os.getenv("CONCURRENCY_INITIAL_LIMIT", 10))  # Начальный лимит
+CONCURRENCY_MIN_LIMIT = int(os.getenv("CONCURRENCY_MIN_LIMIT", 1))  # Нижняя граница лимита
+CONCURRENCY_MAX_LIMIT = int(os.getenv("CONCURRENCY_MAX_LIMIT", 50))  # Верхняя граница лимита
+CONCURRENCY_MAX_WAITING = int(os.getenv("CONCURRENCY_MAX_WAITING", 200))  # Максимум запросов в очереди
+
+# Общий срок перевода одного сообщения вместе с повторами, в секундах
+TRANSLATION_DEADLINE = float(os.getenv("TRANSLATION_DEADLINE", 15))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", 0.5))  # Базовая пауза перед повтором
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", 4))  # Максимальная пауза перед повтором
+
+# Настройки дублирования затянувшихся запросов перевода
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 0.95))  # Перцентиль задержки, после которого шлётся дубль
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", 0.1))  # Допустимая доля дублей от числа запросов
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 0.05))  # Минимальная пауза перед дублем в секундах
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))  # Замеров задержки до начала дублирования
+
+# Перевод по предложениям: каждое предложение ищется в кэше отдельно
+SEGMENT_CACHE_ENABLED = os.getenv("SEGMENT_CACHE_ENABLED", "1") == "1"
+SEGMENT_MIN_SENTENCES = int(os.getenv("SEGMENT_MIN_SENTENCES", 2))  # С какого числа предложений делить текст
+
+# Прогрев кэша самыми частыми фразами из истории
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "1") == "1"
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", 100))  # Сколько частых фраз держать в кэше
+PREWARM_INTERVAL = int(os.getenv("PREWARM_INTERVAL", 600))  # Пауза между проходами в секундах
+PREWARM_QUIET_RPM = float(os.getenv("PREWARM_QUIET_RPM", 10))  # Переводов в минуту, при которых нагрузка низкая
+PREWARM_REFRESH_BEFORE = int(os.getenv("PREWARM_REFRESH_BEFORE", 3600))  # За сколько секунд до истечения обновлять
+
+# Настройки памяти переводов: повторы текстов из истории переводятся без API
+TM_ENABLED = os.getenv("TM_ENABLED", "1") == "1"
+TM_MAX_TEXT_LENGTH = int(os.getenv("TM_MAX_TEXT_LENGTH", 500))  # Более длинные тексты в память не попадают
+
+# Настройки планировщика переводов
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 16))  # Сколько переводов выполняется одновременно
+SCHEDULER_INLINE_LIMIT = int(os.getenv("SCHEDULER_INLINE_LIMIT", 8))  # Лимит для inline-запросов
+SCHEDULER_BULK_LIMIT = int(os.getenv("SCHEDULER_BULK_LIMIT", 4))  # Лимит для массовых переводов
+SCHEDULER_BACKGROUND_LIMIT = int(os.getenv("SCHEDULER_BACKGROUND_LIMIT", 2))  # Лимит для фоновых задач
+
+# Максимальная длина текста в одном запросе к API
+# Более длинные тексты переводятся по фрагментам
+MAX_TEXT_LENGTH = int(os.getenv("MAX_TEXT_LENGTH", 4000))
+
+# Сколько фрагментов длинного текста переводится одновременно
+CHUNK_CONCURRENCY = int(os.getenv("CHUNK_CONCURRENCY", 4))
+
+# Потоков для файловых операций хранилища (история, настройки, списки)
+STORAGE_IO_WORKERS = int(os.getenv("STORAGE_IO_WORKERS", 4))
+STORAGE_MAX_BATCH = int(os.getenv("STORAGE_MAX_BATCH", 256))  # Изменений настроек или списков в одной записи файла
+# Когда сбрасывать записанное на диск: always (файл и каталог), file (только файл) или never
+STORAGE_FSYNC = os.getenv("STORAGE_FSYNC", "always")
 
 # Путь к файлу истории
-HISTORY_FILE = "storage/history.json"
\ No newline at end of file
+HISTORY_FILE = "storage/history.json"
+
+# Хранилище истории: jsonl (журнал с дозаписью) или sqlite
+HISTORY_BACKEND = os.getenv("HISTORY_BACKEND", "jsonl")
+HISTORY_DB_FILE = os.getenv("HISTORY_DB_FILE", "storage/history.sqlite3")
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", 100))  # Записей в одной пакетной вставке в SQLite
+HISTORY_BATCH_DELAY = float(os.getenv("HISTORY_BATCH_DELAY", 0.05))  # Сколько секунд запись ждёт пакетной вставки
+
+# Отложенная запись истории: изменения копятся в памяти и пишутся пачками
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", 1.0))  # Интервал записи в секундах
+HISTORY_FLUSH_THRESHOLD = int(os.getenv("HISTORY_FLUSH_THRESHOLD", 200))  # Изменений до досрочной записи
+
+# Журнал истории с дозаписью; history.json переносится в него при первом запуске
+HISTORY_LOG_FILE = os.getenv("HISTORY_LOG_FILE", "storage/history.jsonl")
+HISTORY_MAX_RECORDS = int(os.getenv("HISTORY_MAX_RECORDS", 50))  # Сколько записей хранить на пользователя
+HISTORY_COMPACT_INTERVAL = int(os.getenv("HISTORY_COMPACT_INTERVAL", 3600))  # Интервал компактизации в секундах
+HISTORY_COMPACT_THRESHOLD = int(os.getenv("HISTORY_COMPACT_THRESHOLD", 10000))  # Дозаписей до досрочной компактизации
\ No newline at end of file
@@ -44,7 +44,7 @@ class CheckLanguageMiddleware(BaseMiddleware):
                 else:
                     default_lang = 'en'
                 
-                set_user_language(user_id, default_lang)
+                await set_user_language(user_id, default_lang)
                 user_lang = default_lang
             
             # Добавляем язык пользователя в данные для обработчиков
@@ -7,10 +7,12 @@ import os
 
 from states.language_state import LanguageState
 from utils.logger import logger
-from utils.formatters import get_message, get_user_language, format_translation_history, set_user_language, get_user_translate_languages
+from utils.formatters import get_message, get_user_language, format_translation_history, set_user_language, get_user_translate_languages, format_translation_error
 from keyboards.inline import help_inline_keyboard, about_inline_keyboard, main_menu_inline_keyboard, history_keyboard, choose_language_keyboard
-from services.api_client import translate_text, get_languages
+from services.api_client import translate_text_result, get_languages, detect_language
+from services.scheduler import PRIORITY_INTERACTIVE
 from services.history_storage import add_to_history, get_history, clear_history
+from services.fast_path import fast_path
 
 def check_user_banned(user_id: int) -> bool:
     """Проверяет, заблокирован ли пользователь"""
@@ -195,7 +197,7 @@ async def language_english(message: Message):
     logger.info(f"Пользователь {username} (ID: {user_id}) выбрал английский язык")
     
     # Устанавливаем язык пользователя
-    set_user_language(user_id, "en")
+    await set_user_language(user_id, "en")
     
     await message.answer(
         get_message("en", "language_set"),
@@ -213,7 +215,7 @@ async def language_russian(message: Message):
     logger.info(f"Пользователь {username} (ID: {user_id}) выбрал русский язык")
     
     # Устанавливаем язык пользователя
-    set_user_language(user_id, "ru")
+    await set_user_language(user_id, "ru")
     
     await message.answer(
         get_message("ru", "language_set"),
@@ -247,15 +249,31 @@ async def handle_text_translation(message: Message):
     # Получаем язык пользователя для сообщений
     user_lang = get_user_language(user_id)
     
+    # Ссылки, числа, эмодзи и код переводить не нужно
+    if fast_path.is_untranslatable(text):
+        await message.answer(get_message(user_lang, "nothing_to_translate"))
+        return
+    
+    # Текст уже на целевом языке - переводить нечего
+    if fast_path.is_already_in_target(text, target_lang):
+        await message.answer(
+            get_message(user_lang, "already_in_language").format(language=target_lang.upper())
+        )
+        return
+    
     # Отправляем сообщение о начале перевода
     processing_msg = await message.answer(get_message(user_lang, "processing"))
     
     try:
         # Вызываем API для перевода
-        translated = await translate_text(text, source_lang, target_lang)
-        if translated:
+        result = await translate_text_result(text, source_lang, target_lang, priority=PRIORITY_INTERACTIVE)
+        if result.ok:
+            translated = result.text
+            # Определяем язык исходного текста локально для ответа и истории
+            detected_lang = await detect_language(text)
+            
             # Формируем ответ
-            response_text = f"🔄 {source_lang.upper()} → {target_lang.upper()}\n\n"
+            response_text = f"🔄 {detected_lang.upper()} → {target_lang.upper()}\n\n"
             response_text += f"{get_message(user_lang, 'original_text')}\n{text}\n\n"
             response_text += f"{get_message(user_lang, 'translated_text')}\n{translated}"
             
@@ -263,7 +281,7 @@ async def handle_text_translation(message: Message):
             history_record = {
                 "original": text,
                 "translated": translated,
-                "from_lang": source_lang,
+                "from_lang": detected_lang,
                 "to_lang": target_lang
             }
             
@@ -275,10 +293,10 @@ async def handle_text_translation(message: Message):
             await message.answer(response_text, parse_mode="HTML")
             
         else:
-            # Если перевод не удался, используем локализованное сообщение об ошибке
+            # Если перевод не удался, сообщаем причину на языке пользователя
             await processing_msg.delete()
             await message.answer(
-                get_message(user_lang, "translation_error"),
+                format_translation_error(user_lang, result.outcome, result.retry_after),
                 reply_markup=main_menu_inline_keyboard(user_lang)
             )
             
@@ -3,7 +3,6 @@
 """
 
 import json
-import os
 from typing import List, Dict, Any
 
 from aiogram import Router, F
@@ -15,47 +14,80 @@ from filters.admin_filter import IsAdmin, IsAdminCallback, IsNotAdmin
 from states.admin_states import AdminStates
 from utils.logger import logger
 from utils.formatters import get_user_language, get_message, USER_SETTINGS
-from config.settings import HISTORY_FILE
-from services.history_storage import load_history
+from services.history_storage import get_history_user_ids, count_history_records
+from services.backends import backend_router
+from services.api_client import request_hedger, segment_cache
+from services.fast_path import fast_path
+from services.translation_cache import translation_cache
+from services.scheduler import translation_scheduler
+from services.storage_actor import StorageActor
+from services.storage_io import quarantine_file, read_json_file
 
 router = Router()
 
 # Файл для хранения заблокированных пользователей
 BANNED_USERS_FILE = "storage/banned_users.json"
 
-def load_banned_users() -> List[int]:
-    """Загружает список заблокированных пользователей"""
+def _read_banned_users() -> List[int]:
+    """Читает список заблокированных пользователей с диска"""
     try:
-        if os.path.exists(BANNED_USERS_FILE):
-            with open(BANNED_USERS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        return read_json_file(BANNED_USERS_FILE, [])
+    except json.JSONDecodeError as e:
+        logger.error(f"Список заблокированных пользователей повреждён: {e}")
+        # Откладываем повреждённый файл, иначе первое же сохранение затрёт его
+        quarantine_file(BANNED_USERS_FILE)
     except Exception as e:
         logger.error(f"Ошибка загрузки списка заблокированных пользователей: {e}")
     return []
 
-def save_banned_users(banned_users: List[int]) -> None:
-    """Сохраняет список заблокированных пользователей"""
+# Единственный писатель списка заблокированных: блокировки и разблокировки
+# применяются по очереди и сохраняются групповой записью файла
+banned_users_store = StorageActor("banned_users", BANNED_USERS_FILE, _read_banned_users, list)
+
+def load_banned_users() -> List[int]:
+    """Возвращает копию списка заблокированных пользователей"""
+    return list(banned_users_store.state)
+
+async def save_banned_users(banned_users: List[int]) -> None:
+    """Заменяет список заблокированных пользователей"""
+    def replace(current: List[int]) -> None:
+        current[:] = banned_users
+
+    try:
+        await banned_users_store.submit(replace)
+    except Exception as e:
+        logger.error(f"Ошибка сохранения списка заблокированных пользователей: {e}")
+
+async def ban_user(user_id: int) -> bool:
+    """Добавляет пользователя в список заблокированных"""
+    def mutate(banned_users: List[int]) -> None:
+        if user_id not in banned_users:
+            banned_users.append(user_id)
+
+    try:
+        await banned_users_store.submit(mutate)
+        return True
+    except Exception as e:
+        logger.error(f"Ошибка сохранения списка заблокированных пользователей: {e}")
+        return False
+
+async def unban_user(user_id: int) -> bool:
+    """Убирает пользователя из списка заблокированных"""
+    def mutate(banned_users: List[int]) -> None:
+        if user_id in banned_users:
+            banned_users.remove(user_id)
+
     try:
-        os.makedirs(os.path.dirname(BANNED_USERS_FILE), exist_ok=True)
-        with open(BANNED_USERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(banned_users, f, indent=2)
+        await banned_users_store.submit(mutate)
+        return True
     except Exception as e:
         logger.error(f"Ошибка сохранения списка заблокированных пользователей: {e}")
+        return False
 
 def get_all_users() -> List[int]:
     """Получает список всех пользователей из истории"""
     try:
-        history = load_history()
-        user_ids = set()
-        
-        # История хранится в формате {user_id_str: [...]}
-        for user_id_str in history.keys():
-            try:
-                user_ids.add(int(user_id_str))
-            except ValueError:
-                continue
-        
-        return list(user_ids)
+        return get_history_user_ids()
     except Exception as e:
         logger.error(f"Ошибка получения списка пользователей: {e}")
         return []
@@ -82,6 +114,10 @@ def get_admin_keyboard(lang: str = "en") -> InlineKeyboardMarkup:
         [InlineKeyboardButton(
             text=get_message(lang, "admin_banned_list"),
             callback_data="admin_banned_list"
+        )],
+        [InlineKeyboardButton(
+            text=get_message(lang, "admin_health"),
+            callback_data="admin_health"
         )]
     ]
     
@@ -117,7 +153,8 @@ async def admin_panel(message: Message):
             [InlineKeyboardButton(text=get_message(user_lang, "admin_broadcast"), callback_data="admin_broadcast")],
             [InlineKeyboardButton(text=get_message(user_lang, "admin_ban"), callback_data="admin_ban")],
             [InlineKeyboardButton(text=get_message(user_lang, "admin_unban"), callback_data="admin_unban")],
-            [InlineKeyboardButton(text=get_message(user_lang, "admin_banned_list"), callback_data="admin_banned_list")]
+            [InlineKeyboardButton(text=get_message(user_lang, "admin_banned_list"), callback_data="admin_banned_list")],
+            [InlineKeyboardButton(text=get_message(user_lang, "admin_health"), callback_data="admin_health")]
         ])
         
         await message.answer(
@@ -148,8 +185,7 @@ async def admin_stats(event):
         total_users = len(USER_SETTINGS)
         
         # Получаем общее количество переводов
-        history = load_history()
-        total_translations = sum(len(user_history) for user_history in history.values())
+        total_translations = count_history_records()
         
         # Получаем количество заблокированных пользователей
         banned_users = load_banned_users()
@@ -172,6 +208,115 @@ async def admin_stats(event):
             reply_markup=get_admin_keyboard(user_lang)
         )
 
+# Состояние API перевода
+@router.message(Command("health"), IsAdmin())
+@router.callback_query(F.data == "admin_health", IsAdminCallback())
+async def admin_health(event):
+    """Показывает состояние провайдеров перевода: выключатели, лимиты, задержки"""
+    if isinstance(event, Message):
+        user_id = event.from_user.id
+        answer_func = event.answer
+    else:  # CallbackQuery
+        user_id = event.from_user.id
+        answer_func = event.message.edit_text
+        await event.answer()
+    
+    user_lang = get_user_language(user_id)
+    
+    try:
+        state_icons = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+        backends = ""
+        for backend in backend_router.get_stats():
+            breaker = backend["breaker"]
+            limiter = backend["limiter"]
+            rate_limiter = backend["rate_limiter"]
+            retry_in = ""
+            if breaker["retry_in"] is not None:
+                retry_in = get_message(user_lang, "admin_health_retry_in").format(seconds=breaker["retry_in"])
+            backends += get_message(user_lang, "admin_health_backend").format(
+                name=backend["name"],
+                state_icon=state_icons.get(breaker["state"], "⚪"),
+                state=breaker["state"],
+                latency=backend["latency_ms"] if backend["latency_ms"] is not None else "—",
+                error_rate=round(backend["error_rate"] * 100),
+                failures=breaker["consecutive_failures"],
+                times_opened=breaker["times_opened"],
+                breaker_rejected=breaker["rejected"],
+                retry_in=retry_in,
+                limit=limiter["limit"],
+                in_flight=limiter["in_flight"],
+                waiting=limiter["waiting"],
+                limiter_rejected=limiter["rejected"],
+                decreases=limiter["decreases"],
+                rate=rate_limiter["rate"] if rate_limiter["rate"] is not None else "∞",
+                rate_limited=rate_limiter["rate_limited"],
+                throttled=rate_limiter["throttled"]
+            )
+        hedging = ""
+        if request_hedger is not None:
+            hedger = request_hedger.get_stats()
+            hedging = get_message(user_lang, "admin_health_hedging").format(
+                hedges_sent=hedger["hedges_sent"],
+                requests=hedger["requests"],
+                hedge_wins=hedger["hedge_wins"],
+                win_rate=round(hedger["win_rate"] * 100),
+                hedge_delay=hedger["hedge_delay"] if hedger["hedge_delay"] is not None else "—"
+            )
+        
+        cache_stats = translation_cache.get_stats()
+        saved_calls = fast_path.get_stats()
+        cache = get_message(user_lang, "admin_health_cache").format(
+            hits=cache_stats["hits"],
+            total=cache_stats["hits"] + cache_stats["misses"],
+            hit_ratio=round(cache_stats["hit_ratio"] * 100),
+            entries=cache_stats["entries"],
+            saved=saved_calls["total"],
+            untranslatable=saved_calls.get("untranslatable", 0),
+            same_language=saved_calls.get("same_language", 0)
+        )
+        
+        segments = ""
+        if segment_cache is not None:
+            segment_stats = segment_cache.get_stats()
+            segments = get_message(user_lang, "admin_health_segments").format(
+                hits=segment_stats["segment_hits"],
+                total=segment_stats["segment_hits"] + segment_stats["segment_misses"],
+                hit_ratio=round(segment_stats["segment_hit_ratio"] * 100),
+                fully_cached=segment_stats["fully_cached_texts"],
+                texts=segment_stats["texts"]
+            )
+        
+        queues = ""
+        for priority, stats in translation_scheduler.get_stats().items():
+            queues += get_message(user_lang, "admin_health_queue").format(
+                priority=priority,
+                running=stats["running"],
+                limit=stats["limit"],
+                queued=stats["queued"],
+                max_depth=stats["max_depth"],
+                avg_wait=stats["avg_wait_ms"]
+            )
+        
+        health_text = get_message(user_lang, "admin_health_text").format(
+            backends=backends,
+            hedging=hedging,
+            cache=cache,
+            segments=segments,
+            queues=queues
+        )
+        
+        await answer_func(
+            health_text,
+            reply_markup=get_admin_keyboard(user_lang)
+        )
+        
+    except Exception as e:
+        logger.error(f"Ошибка получения состояния API: {e}")
+        await answer_func(
+            get_message(user_lang, "admin_error"),
+            reply_markup=get_admin_keyboard(user_lang)
+        )
+
 # Рассылка - начало
 @router.message(Command("broadcast"), IsAdmin())
 @router.callback_query(F.data == "admin_broadcast", IsAdminCallback())
@@ -328,9 +473,15 @@ async def admin_ban_confirm(callback: CallbackQuery, state: FSMContext):
         await state.clear()
         return
     
-    banned_users = load_banned_users()
-    banned_users.append(user_id_to_ban)
-    save_banned_users(banned_users)
+    if not await ban_user(user_id_to_ban):
+        # Блокировка уже действует, но при перезапуске может пропасть
+        await callback.answer()
+        await callback.message.edit_text(
+            get_message(user_lang, "admin_banned_list_save_error"),
+            reply_markup=get_admin_keyboard(user_lang)
+        )
+        await state.clear()
+        return
     
     await callback.answer()
     await callback.message.edit_text(
@@ -411,10 +562,14 @@ async def admin_unban_confirm(callback: CallbackQuery, state: FSMContext):
         await state.clear()
         return
     
-    banned_users = load_banned_users()
-    if user_id_to_unban in banned_users:
-        banned_users.remove(user_id_to_unban)
-        save_banned_users(banned_users)
+    if not await unban_user(user_id_to_unban):
+        await callback.answer()
+        await callback.message.edit_text(
+            get_message(user_lang, "admin_banned_list_save_error"),
+            reply_markup=get_admin_keyboard(user_lang)
+        )
+        await state.clear()
+        return
     
     await callback.answer()
     await callback.message.edit_text(
@@ -464,8 +619,8 @@ async def admin_banned_list(callback: CallbackQuery):
 # Функция проверки блокировки (для использования в других модулях)
 def is_user_banned(user_id: int) -> bool:
     """Проверяет, заблокирован ли пользователь"""
-    banned_users = load_banned_users()
-    return user_id in banned_users
+    # Список в памяти актора, без чтения файла на каждое сообщение
+    return user_id in banned_users_store.state
 
 
 # Обработчик для не-админов (должен быть в конце)
@@ -85,7 +85,7 @@ async def set_interface_language(callback: CallbackQuery, state: FSMContext):
     logger.info(f"Пользователь {username} (ID: {user_id}) выбрал язык интерфейса: {language_code}")
     
     # Сохраняем выбранный язык в настройках пользователя
-    if set_user_language(user_id, language_code):
+    if await set_user_language(user_id, language_code):
         # Получаем сообщение на новом языке
         success_msg = get_message(language_code, "language_chosen")
         
@@ -4,11 +4,13 @@ from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
 
 from states.language_state import TranslateState
-from utils.formatters import get_message, get_user_language, get_user_translate_languages, set_user_translate_languages
+from utils.formatters import get_message, get_user_language, get_user_translate_languages, set_user_translate_languages, format_translation_error
 from utils.logger import logger
 from keyboards.inline import main_menu_inline_keyboard, after_translation_keyboard, target_language_keyboard
-from services.api_client import translate_text, get_languages
+from services.api_client import translate_text_result, get_languages, detect_language
+from services.scheduler import PRIORITY_INTERACTIVE
 from services.history_storage import add_to_history
+from services.fast_path import fast_path
 
 def check_user_banned(user_id: int) -> bool:
     """Проверяет, заблокирован ли пользователь"""
@@ -100,20 +102,39 @@ async def process_translation(message: Message, state: FSMContext):
     translate_settings = get_user_translate_languages(user_id)
     target_lang = translate_settings["target"]
     
+    # Ссылки, числа, эмодзи и код переводить не нужно
+    if fast_path.is_untranslatable(text):
+        await state.clear()
+        await message.answer(
+            get_message(user_lang, "nothing_to_translate"),
+            reply_markup=after_translation_keyboard(user_lang)
+        )
+        return
+    
+    # Текст уже на целевом языке - переводить нечего
+    if fast_path.is_already_in_target(text, target_lang):
+        await state.clear()
+        await message.answer(
+            get_message(user_lang, "already_in_language").format(language=target_lang.upper()),
+            reply_markup=after_translation_keyboard(user_lang)
+        )
+        return
+    
     # Отправляем сообщение о процессе перевода
     processing_msg = await message.answer(get_message(user_lang, "processing"))
     try:
         # Переводим текст
-        translated = await translate_text(text, source_lang, target_lang)
+        result = await translate_text_result(text, source_lang, target_lang, priority=PRIORITY_INTERACTIVE)
         
-        if translated:
-            # Определяем, какой язык был определен автоматически
-            detected_lang = "auto" # В реальном API здесь будет определенный язык
+        if result.ok:
+            translated = result.text
+            # Определяем язык исходного текста локально
+            detected_lang = await detect_language(text)
             
             # Формируем сообщение с переводом
             translation_result = (
                 f"<b>{text}</b>\n\n"
-                f"🔄 AUTO ➡️ {target_lang.upper()}\n\n"
+                f"🔄 {detected_lang.upper()} ➡️ {target_lang.upper()}\n\n"
                 f"{translated}"
             )
             
@@ -121,7 +142,7 @@ async def process_translation(message: Message, state: FSMContext):
             history_record = {
                 "original": text,
                 "translated": translated,
-                "from_lang": "auto",
+                "from_lang": detected_lang,
                 "to_lang": target_lang
             }
             add_to_history(user_id, history_record)
@@ -140,8 +161,8 @@ async def process_translation(message: Message, state: FSMContext):
         else:
             # Если перевод не удался
             await processing_msg.delete()
-            # Используем сообщение на языке пользователя
-            error_message = get_message(user_lang, "translation_error") 
+            # Сообщаем причину на языке пользователя
+            error_message = format_translation_error(user_lang, result.outcome, result.retry_after)
             await message.answer(
                 error_message,
                 reply_markup=main_menu_inline_keyboard(user_lang)
@@ -217,7 +238,7 @@ async def select_target_language(callback: CallbackQuery, state: FSMContext):
     # Извлекаем код языка из callback_data
     lang_code = callback.data.replace("target_", "")
       # Сохраняем выбранный целевой язык
-    set_user_translate_languages(user_id, source="auto", target=lang_code)
+    await set_user_translate_languages(user_id, source="auto", target=lang_code)
     
     # Получаем название языка для отображения
     languages = await get_languages()
@@ -1,45 +1,59 @@
-import aiohttp
 import asyncio
+import random
+from contextvars import ContextVar
 from typing import Dict, List, Optional
 from utils.logger import logger
+from services.translation_cache import translation_cache
+from services.disk_cache import disk_cache
+from services.singleflight import SingleFlight
+from services.batching import TranslationBatcher
+from services.languages_catalog import LanguagesCatalog
+from services.backends import backend_router
+from services.hedging import RequestHedger
+from services.scheduler import translation_scheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from services.translation_memory import translation_memory
+from services.segment_cache import SegmentCache
+from services.language_detector import is_reliable, language_detector
+from services.input_classifier import mask, unmask
+from services.translation_result import (
+    OUTCOME_BAD_INPUT,
+    OUTCOME_INVALID_RESPONSE,
+    OUTCOME_OK,
+    OUTCOME_RATE_LIMITED,
+    OUTCOME_TIMEOUT,
+    OUTCOME_UPSTREAM_ERROR,
+    TranslationResult,
+)
+from config.settings import BATCH_ENABLED, BATCH_MAX_CHARS, BATCH_MAX_SIZE, MAX_TEXT_LENGTH, CHUNK_CONCURRENCY
+from config.settings import DETECTION_MIN_CONFIDENCE, DETECTION_MIN_LETTERS
+from config.settings import TRANSLATION_DEADLINE, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX, HEDGE_ENABLED
+from config.settings import SEGMENT_CACHE_ENABLED
+from utils.text_segmentation import split_into_chunks, strip_edges
 
-API_BASE_URL = "https://ftapi.pythonanywhere.com"
 REQUEST_TIMEOUT = 10
 RETRY_COUNT = 3
 
-# Кэш для списка языков
-_languages_cache: Optional[Dict] = None
+# Объединение одинаковых одновременных запросов перевода
+translation_flight = SingleFlight()
+
+# Момент (по часам цикла событий), к которому должен завершиться текущий перевод
+_deadline: ContextVar[Optional[float]] = ContextVar("translation_deadline", default=None)
 
 async def get_languages() -> Dict[str, str]:
     """
-    Получает список поддерживаемых языков из API с кэшированием
+    Возвращает список поддерживаемых языков из каталога, не дожидаясь сети
     """
-    global _languages_cache
-    
-    if _languages_cache is not None:
-        return _languages_cache
-    
-    try:
-        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(f"{API_BASE_URL}/languages") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    _languages_cache = data
-                    logger.info("Список языков успешно загружен и закэширован")
-                    return data
-                else:
-                    logger.error(f"Ошибка получения языков: HTTP {response.status}")
-                    return _get_fallback_languages()
-    except asyncio.TimeoutError:
-        logger.error("Таймаут при получении списка языков")
-        return _get_fallback_languages()
-    except aiohttp.ClientError as e:
-        logger.error(f"Сетевая ошибка при получении языков: {e}")
-        return _get_fallback_languages()
-    except Exception as e:
-        logger.error(f"Неожиданная ошибка при получении языков: {e}")
-        return _get_fallback_languages()
+    return languages_catalog.get()
+
+async def _fetch_languages() -> Optional[Dict[str, str]]:
+    """
+    Загружает список поддерживаемых языков у первого ответившего провайдера
+    """
+    for backend in backend_router.by_preference():
+        languages = await backend.fetch_languages(REQUEST_TIMEOUT)
+        if languages:
+            return languages
+    return None
 
 def _get_fallback_languages() -> Dict[str, str]:
     """
@@ -70,96 +84,395 @@ async def translate_text(text: str, source_lang: str, target_lang: str) -> Optio
     Returns:
         Переведённый текст или None в случае ошибки
     """
+    result = await translate_text_result(text, source_lang, target_lang)
+    return result.text
+
+async def translate_text_result(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    deadline: float = TRANSLATION_DEADLINE,
+    priority: str = PRIORITY_INTERACTIVE
+) -> TranslationResult:
+    """
+    Переводит текст, укладываясь в общий срок, и сообщает исход
+    
+    Args:
+        text: Текст для перевода
+        source_lang: Исходный язык (например, 'en')
+        target_lang: Целевой язык (например, 'ru')
+        deadline: Сколько секунд отведено на перевод вместе с повторами
+        priority: Класс приоритета в планировщике переводов
+        
+    Returns:
+        TranslationResult с переводом или причиной неудачи
+    """
     if not text or not text.strip():
         logger.error("Пустой текст для перевода")
-        return None
+        return TranslationResult.failure(OUTCOME_BAD_INPUT)
     
     if source_lang == target_lang:
         logger.info("Исходный и целевой языки совпадают")
-        return text
+        return TranslationResult(text)
+    
+    # Этот же текст уже переводили - берём перевод из истории
+    if translation_memory is not None:
+        match = translation_memory.lookup(text, source_lang, target_lang)
+        if match is not None:
+            logger.info("Перевод найден в памяти переводов")
+            return TranslationResult(match.translated)
+    
+    # Срок отсчитывается с момента постановки в очередь: ожидание воркера тоже входит в него
+    expires_at = asyncio.get_running_loop().time() + deadline
+    try:
+        return await translation_scheduler.run(
+            lambda: _translate_job(text, source_lang, target_lang, expires_at),
+            priority,
+            timeout=deadline,
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Перевод не дождался очереди за {deadline} с")
+        return TranslationResult.failure(OUTCOME_TIMEOUT)
+
+async def _translate_job(text: str, source_lang: str, target_lang: str, expires_at: float) -> TranslationResult:
+    """Задача планировщика: перевод с маскированием в пределах срока expires_at"""
+    # Срок виден всем вложенным вызовам, включая фрагменты и пачки
+    token = _deadline.set(expires_at)
+    try:
+        # Ссылки, почту и код не переводим: заменяем их метками и возвращаем после перевода
+        masked = mask(text)
+        if masked.has_spans:
+            result = await _translate_prose(masked.text, source_lang, target_lang)
+            if not result.ok:
+                return result
+            restored = unmask(result.text, masked)
+            if restored is not None:
+                return TranslationResult(restored)
+            logger.warning("Метки непереводимых фрагментов потерялись, переводим текст целиком")
+        
+        return await _translate_prose(text, source_lang, target_lang)
+    finally:
+        _deadline.reset(token)
+
+async def refresh_translation(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    refresh_before: float,
+    priority: str = PRIORITY_BACKGROUND,
+    fill_missing: bool = True
+) -> Optional[bool]:
+    """
+    Заранее кладёт перевод в кэш или обновляет запись, которая скоро истечёт
+    
+    Args:
+        text: Текст, который переводится одним запросом
+        source_lang: Исходный язык
+        target_lang: Целевой язык
+        refresh_before: Запись, истекающая раньше чем через столько секунд, переводится заново
+        priority: Класс приоритета в планировщике переводов
+        fill_missing: Запрашивать ли перевод, которого в кэше нет совсем
+        
+    Returns:
+        True, если перевод запрошен у API, False, если запрос не нужен, None при ошибке
+    """
+    remaining = translation_cache.expires_in(text, source_lang, target_lang)
+    if remaining is not None and remaining > refresh_before:
+        return False
+    # В памяти записи нет, но она может быть на диске
+    if remaining is None and disk_cache is not None:
+        cached = await disk_cache.get(text, source_lang, target_lang)
+        if cached is not None:
+            translation_cache.set(text, source_lang, target_lang, cached)
+            return False
+    if remaining is None and not fill_missing:
+        return False
+    
+    expires_at = asyncio.get_running_loop().time() + TRANSLATION_DEADLINE
+    try:
+        result = await translation_scheduler.run(
+            lambda: _refresh_job(text, source_lang, target_lang, expires_at),
+            priority,
+            timeout=TRANSLATION_DEADLINE,
+        )
+    except asyncio.TimeoutError:
+        return None
+    return True if result.ok else None
+
+async def _refresh_job(text: str, source_lang: str, target_lang: str, expires_at: float) -> TranslationResult:
+    """Задача планировщика: запрос перевода в обход кэша с сохранением результата"""
+    token = _deadline.set(expires_at)
+    try:
+        return await _translate_uncached(text, source_lang, target_lang)
+    finally:
+        _deadline.reset(token)
+
+def _current_deadline() -> float:
+    """
+    Возвращает срок текущего перевода, а вне translate_text_result - срок по умолчанию
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        deadline = asyncio.get_running_loop().time() + TRANSLATION_DEADLINE
+    return deadline
+
+async def _translate_prose(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Переводит текст одним запросом или, если он длинный, по фрагментам
+    Текст из нескольких предложений переводится по сегментам через их кэш
+    """
+    if segment_cache is not None:
+        result = await segment_cache.translate(text, source_lang, target_lang)
+        if result is not None:
+            return result
+    
+    # Длинный текст переводим по фрагментам, а не обрезаем
+    if len(text) > MAX_TEXT_LENGTH:
+        return await _translate_chunked(text, source_lang, target_lang)
+    
+    return await _translate_single(text, source_lang, target_lang)
+
+async def _translate_chunked(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Переводит длинный текст: делит его по абзацам и предложениям,
+    переводит фрагменты параллельно и собирает результат в исходном порядке
+    """
+    chunks = split_into_chunks(text, MAX_TEXT_LENGTH)
+    logger.info(f"Текст длиной {len(text)} разбит на {len(chunks)} фрагментов")
+    semaphore = asyncio.Semaphore(CHUNK_CONCURRENCY)
     
-    # Обрезаем текст если он слишком длинный
-    if len(text) > 4000:
-        text = text[:4000]
-        logger.warning("Текст обрезан до 4000 символов")
+    async def translate_chunk(chunk: str) -> TranslationResult:
+        leading, core, trailing = strip_edges(chunk)
+        if not core:
+            return TranslationResult(chunk)
+        async with semaphore:
+            result = await _translate_single(core, source_lang, target_lang)
+        if not result.ok:
+            return result
+        return TranslationResult(leading + result.text + trailing)
+    
+    results = await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks))
+    for result in results:
+        if not result.ok:
+            logger.error("Не удалось перевести один или несколько фрагментов текста")
+            return result
+    return TranslationResult("".join(result.text for result in results).strip())
+
+async def _translate_single(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Переводит текст, укладывающийся в один запрос к API
+    """
+    # Сначала проверяем кэш переводов
+    cached = await _cache_lookup(text, source_lang, target_lang)
+    if cached is not None:
+        logger.info(f"Перевод найден в кэше: {source_lang} -> {target_lang}")
+        return TranslationResult(cached)
+    
+    return await _translate_uncached(text, source_lang, target_lang)
+
+async def _translate_segment(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Переводит сегмент, которого нет в кэше
+    Слишком длинное предложение переводится по фрагментам
+    """
+    if len(text) > MAX_TEXT_LENGTH:
+        return await _translate_chunked(text, source_lang, target_lang)
+    return await _translate_uncached(text, source_lang, target_lang)
+
+async def _translate_uncached(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Запрашивает перевод текста, которого нет в кэше
+    """
+    # Одинаковые одновременные запросы ждут один общий запрос к API
+    key = translation_cache.make_key(text, source_lang, target_lang)
+    return await translation_flight.do(
+        key, lambda: _fetch_and_store(text, source_lang, target_lang)
+    )
+
+async def _fetch_and_store(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Запрашивает перевод у API и сохраняет успешный результат в кэш
+    """
+    if translation_batcher is not None:
+        result = await translation_batcher.submit(text, source_lang, target_lang)
+    else:
+        result = await _request_translation_hedged(text, source_lang, target_lang)
+    if result.ok:
+        _cache_store(text, source_lang, target_lang, result.text)
+    return result
+
+async def _cache_lookup(text: str, source_lang: str, target_lang: str) -> Optional[str]:
+    """
+    Ищет перевод в кэше: сначала в памяти, затем на диске
+    Найденное на диске поднимается в in-memory кэш
+    """
+    cached = translation_cache.get(text, source_lang, target_lang)
+    if cached is not None or disk_cache is None:
+        return cached
+    
+    cached = await disk_cache.get(text, source_lang, target_lang)
+    if cached is not None:
+        translation_cache.set(text, source_lang, target_lang, cached)
+    return cached
+
+def _cache_store(text: str, source_lang: str, target_lang: str, translated: str) -> None:
+    """
+    Сохраняет перевод во все уровни кэша
+    """
+    translation_cache.set(text, source_lang, target_lang, translated)
+    if disk_cache is not None:
+        disk_cache.set_nowait(text, source_lang, target_lang, translated)
+
+def _backoff_delay(attempt: int, retry_after: Optional[float]) -> float:
+    """
+    Возвращает паузу перед повтором: Retry-After от API
+    или экспоненциальная задержка со случайным разбросом
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, RETRY_BACKOFF_BASE)
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempt + 1)))
+
+async def _request_translation_hedged(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Выполняет запрос перевода и, если он затянулся, дублирует его
+    """
+    if request_hedger is None:
+        return await _request_translation(text, source_lang, target_lang)
+    return await request_hedger.run(
+        lambda: _request_translation(text, source_lang, target_lang),
+        lambda result: result.ok
+    )
+
+async def _request_translation(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+    """
+    Выполняет запрос перевода с повторными попытками
+    Повторы и паузы укладываются в оставшееся до срока время
+    После ошибки провайдера следующая попытка сразу идёт к другому, если он есть
+    Пока все провайдеры недоступны, запросы отклоняются без обращения к сети
+    """
+    params = {
+        'sl': source_lang,
+        'dl': target_lang,
+        'text': text
+    }
+    loop = asyncio.get_running_loop()
+    deadline = _current_deadline()
+    last_outcome, retry_after = OUTCOME_TIMEOUT, None
+    failed_backends = set()
     
     for attempt in range(RETRY_COUNT):
+        backend = backend_router.choose(exclude=failed_backends)
+        if backend is None:
+            logger.warning("Все провайдеры перевода недоступны, запрос отклонён без обращения к сети")
+            return TranslationResult.failure(OUTCOME_UPSTREAM_ERROR, backend_router.retry_in())
+        
+        time_left = deadline - loop.time()
+        if time_left <= 0:
+            break
+        # Выключатель проверяем до очередей: отклонённый запрос не должен
+        # тратить токены и место в очереди и ждать их
+        if not backend.breaker.allow_request():
+            last_outcome = OUTCOME_UPSTREAM_ERROR
+            failed_backends.add(backend)
+            if not backend_router.has_alternative(failed_backends):
+                return TranslationResult.failure(OUTCOME_UPSTREAM_ERROR, backend_router.retry_in())
+            continue
+        # Сами выдерживаем частоту запросов, чтобы не тратить попытки на 429
+        if not await backend.rate_limiter.acquire(time_left):
+            logger.warning(f"[{backend.name}] Лимит частоты запросов не позволяет уложиться в срок")
+            backend.breaker.record_ignored()
+            last_outcome = OUTCOME_RATE_LIMITED
+            failed_backends.add(backend)
+            continue
+        time_left = deadline - loop.time()
         try:
-            timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-            
-            params = {
-                'sl': source_lang,
-                'dl': target_lang,
-                'text': text
-            }
-            
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(f"{API_BASE_URL}/translate", params=params) as response:
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Проверяем структуру ответа
-                        if isinstance(data, dict) and 'destination-text' in data:
-                            translated = data['destination-text']
-                            if translated and translated.strip():
-                                logger.info(f"Перевод выполнен успешно: {source_lang} -> {target_lang}")
-                                return translated.strip()
-                            else:
-                                logger.error("API вернул пустой перевод")
-                                return None
-                        else:
-                            logger.error(f"Некорректная структура ответа API: {data}")
-                            return None
-                    
-                    elif response.status == 400:
-                        logger.error("Некорректные параметры запроса")
-                        return None
-                    
-                    elif response.status == 429:
-                        logger.warning("Превышен лимит запросов, повторная попытка...")
-                        await asyncio.sleep(2 ** attempt)  # Экспоненциальная задержка
-                        continue
-                    
-                    else:
-                        logger.error(f"API вернул ошибку: HTTP {response.status}")
-                        if attempt < RETRY_COUNT - 1:
-                            await asyncio.sleep(1)
-                            continue
-                        return None
-                        
+            generation = await asyncio.wait_for(backend.limiter.acquire(), time_left)
         except asyncio.TimeoutError:
-            logger.error(f"Таймаут при переводе (попытка {attempt + 1}/{RETRY_COUNT})")
-            if attempt < RETRY_COUNT - 1:
-                await asyncio.sleep(1)
-                continue
-            return None
-            
-        except aiohttp.ClientError as e:
-            logger.error(f"Сетевая ошибка при переводе: {e} (попытка {attempt + 1}/{RETRY_COUNT})")
-            if attempt < RETRY_COUNT - 1:
-                await asyncio.sleep(1)
-                continue
-            return None
-            
-        except Exception as e:
-            logger.error(f"Неожиданная ошибка при переводе: {e}")
-            return None
+            logger.warning(f"[{backend.name}] Срок перевода истёк в очереди запросов")
+            backend.breaker.record_ignored()
+            return TranslationResult.failure(OUTCOME_TIMEOUT)
+        if generation is None:
+            logger.warning(f"[{backend.name}] Очередь запросов переполнена, запрос отклонён")
+            backend.breaker.record_ignored()
+            last_outcome = OUTCOME_RATE_LIMITED
+            failed_backends.add(backend)
+            continue
+        
+        outcome, translated, retry_after = None, None, None
+        started = loop.time()
+        try:
+            outcome, translated, retry_after = await backend.translate(
+                params, min(REQUEST_TIMEOUT, deadline - loop.time())
+            )
+        finally:
+            backend.record(outcome, generation, loop.time() - started, retry_after)
+        
+        if outcome == OUTCOME_OK:
+            return TranslationResult(translated)
+        if outcome == OUTCOME_BAD_INPUT:
+            return TranslationResult.failure(OUTCOME_BAD_INPUT)
+        if outcome == OUTCOME_INVALID_RESPONSE:
+            # Повтор того же запроса даст тот же ответ
+            return TranslationResult.failure(OUTCOME_INVALID_RESPONSE)
+        logger.warning(f"[{backend.name}] Попытка {attempt + 1}/{RETRY_COUNT} не удалась: {outcome}")
+        last_outcome = outcome
+        failed_backends.add(backend)
+        if attempt == RETRY_COUNT - 1:
+            break
+        
+        # Есть другой провайдер - переключаемся на него без паузы
+        if backend_router.has_alternative(failed_backends):
+            continue
+        
+        # Пауза, которая не укладывается в срок, бессмысленна - сразу сообщаем исход
+        delay = _backoff_delay(attempt, retry_after)
+        if delay >= deadline - loop.time():
+            logger.warning(f"Повтор через {delay:.1f} с не укладывается в срок перевода")
+            break
+        await asyncio.sleep(delay)
     
     logger.error("Все попытки перевода исчерпаны")
-    return None
+    return TranslationResult.failure(last_outcome, retry_after)
 
 async def detect_language(text: str) -> str:
     """
-    Определяет язык текста (заглушка)
-    В реальном API может быть отдельный endpoint для определения языка
+    Определяет язык текста локально, без запроса к API
+    
+    Returns:
+        Код языка или "auto", если уверенность ниже порога
     """
-    if not text:
+    return _detect_source(text)
+
+def _detect_source(text: str) -> str:
+    """Код языка текста по локальному определению или "auto", если уверенность ниже порога"""
+    detection = language_detector.detect(text)
+    if not is_reliable(detection, DETECTION_MIN_CONFIDENCE, DETECTION_MIN_LETTERS):
         return "auto"
-    
-    # Простая эвристика для определения языка
-    russian_chars = set('абвгдеёжзийклмнопрстуфхцчшщъыьэюя')
-    if any(char.lower() in russian_chars for char in text):
-        return "ru"
-    
-    return "en"  # По умолчанию английский
\ No newline at end of file
+    return detection.lang
+
+# Дублирование затянувшихся запросов, None если оно отключено в настройках
+request_hedger: Optional[RequestHedger] = RequestHedger() if HEDGE_ENABLED else None
+
+# Батчер запросов перевода, None если батчинг отключён в настройках
+translation_batcher: Optional[TranslationBatcher] = (
+    # Тексты на разных языках в одну пачку не попадают
+    TranslationBatcher(
+        _request_translation_hedged,
+        max_batch_chars=min(BATCH_MAX_CHARS, MAX_TEXT_LENGTH),
+        detect_func=_detect_source,
+    )
+    if BATCH_ENABLED else None
+)
+
+# Перевод по предложениям с кэшем для каждого, None если он отключён в настройках
+segment_cache: Optional[SegmentCache] = (
+    # С батчингом промахи одного текста уходят в API общими пачками
+    SegmentCache(
+        _cache_lookup, _translate_segment,
+        concurrency=BATCH_MAX_SIZE if BATCH_ENABLED else CHUNK_CONCURRENCY
+    )
+    if SEGMENT_CACHE_ENABLED else None
+)
+
+# Каталог языков: отдаётся из памяти, обновляется в фоне
+languages_catalog = LanguagesCatalog(_fetch_languages, _get_fallback_languages())
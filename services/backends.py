@@ -0,0 +1,326 @@
+"""
+Провайдеры перевода и выбор между ними
+
+Каждый провайдер имеет свой выключатель, своё ведро жетонов для
+ограничения частоты и свой адаптивный лимит одновременных запросов. Маршрутизатор отправляет запрос провайдеру
+с наименьшей ожидаемой задержкой с учётом доли ошибок и текущей
+нагрузки, а недоступных провайдеров пропускает.
+
+Список провайдеров задаётся в TRANSLATION_BACKENDS записями
+"имя=адрес" или "имя=тип:адрес" через запятую, например:
+    ftapi=https://ftapi.pythonanywhere.com,mock=http://127.0.0.1:8080
+Если список пуст, используется один провайдер из TRANSLATION_API_URL.
+"""
+
+import asyncio
+import random
+import time
+from abc import ABC, abstractmethod
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from config.settings import TRANSLATION_API_URL, TRANSLATION_BACKENDS
+from services.http_client import http_client
+from services.rate_limiter import TokenBucket
+from services.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker
+from services.translation_result import (
+    OUTCOME_BAD_INPUT,
+    OUTCOME_INVALID_RESPONSE,
+    OUTCOME_OK,
+    OUTCOME_RATE_LIMITED,
+    OUTCOME_TIMEOUT,
+    OUTCOME_UPSTREAM_ERROR,
+)
+from utils.logger import logger
+
+# (исход попытки, перевод или None, Retry-After в секундах или None)
+AttemptResult = Tuple[str, Optional[str], Optional[float]]
+
+# Сглаживание скользящих средних задержки и доли ошибок
+EWMA_ALPHA = 0.2
+# Сколько секунд задержки «стоит» стопроцентная доля ошибок при выборе провайдера
+ERROR_PENALTY = 5.0
+# Доля запросов, отправляемых случайному провайдеру, чтобы оценки не устаревали
+EXPLORE_RATE = 0.05
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Разбирает заголовок Retry-After: число секунд или HTTP-дата
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TranslationBackend(ABC):
+    """
+    Базовый провайдер перевода
+    Подклассы реализуют translate и fetch_languages для своего протокола
+    """
+
+    def __init__(self, name: str, base_url: str):
+        """
+        Args:
+            name: Имя провайдера для логов и статистики
+            base_url: Базовый адрес API
+        """
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.breaker = CircuitBreaker()
+        self.limiter = AdaptiveConcurrencyLimiter()
+        # Квота у каждого провайдера своя, поэтому и ведро своё
+        self.rate_limiter = TokenBucket()
+
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+
+    @abstractmethod
+    async def translate(self, params: Dict[str, str], request_timeout: float) -> AttemptResult:
+        """
+        Выполняет одну попытку перевода
+
+        Args:
+            params: Параметры запроса: sl, dl, text
+            request_timeout: Таймаут попытки в секундах
+        """
+
+    @abstractmethod
+    async def fetch_languages(self, request_timeout: float) -> Optional[Dict[str, str]]:
+        """Загружает список поддерживаемых языков, None при ошибке"""
+
+    @property
+    def available(self) -> bool:
+        """Провайдер принимает запросы: его выключатель не разомкнут"""
+        return not self.breaker.is_open
+
+    def score(self) -> float:
+        """
+        Ожидаемая «стоимость» запроса: чем меньше, тем лучше
+        Провайдер без замеров получает 0, чтобы его попробовали
+        """
+        latency = self.latency_ewma or 0.0
+        limiter = self.limiter.get_stats()
+        load = 1 + limiter["in_flight"] / max(limiter["limit"], 1)
+        return latency * load + ERROR_PENALTY * self.error_rate
+
+    def record(
+        self,
+        outcome: Optional[str],
+        generation: int,
+        latency: float,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """
+        Учитывает исход попытки в выключателе, лимитах и оценках провайдера
+        """
+        if outcome in (None, OUTCOME_INVALID_RESPONSE):
+            # Запрос прерван или ответ непонятен - о здоровье API это ничего не говорит
+            self.breaker.record_ignored()
+            self.limiter.release(generation, None)
+            return
+
+        self.requests += 1
+        failed = outcome in (OUTCOME_TIMEOUT, OUTCOME_UPSTREAM_ERROR)
+        self.error_rate += EWMA_ALPHA * ((1.0 if failed else 0.0) - self.error_rate)
+        if outcome in (OUTCOME_OK, OUTCOME_BAD_INPUT):
+            # API ответил, значит он жив
+            self.breaker.record_success()
+            self.limiter.release(generation, True)
+            self.rate_limiter.on_success()
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+        elif outcome == OUTCOME_RATE_LIMITED:
+            self.breaker.record_ignored()
+            self.limiter.release(generation, False)
+            self.rate_limiter.on_rate_limited(retry_after)
+        else:
+            self.breaker.record_failure()
+            self.limiter.release(generation, False)
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние провайдера"""
+        return {
+            "name": self.name,
+            "latency_ms": round(self.latency_ewma * 1000) if self.latency_ewma is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "breaker": self.breaker.get_stats(),
+            "limiter": self.limiter.get_stats(),
+            "rate_limiter": self.rate_limiter.get_stats(),
+        }
+
+
+class FtapiBackend(TranslationBackend):
+    """
+    Провайдер с протоколом ftapi: GET /translate?sl=&dl=&text= и GET /languages
+    Этот же протокол реализует локальный фейковый API (services/mock_api.py)
+    """
+
+    async def translate(self, params: Dict[str, str], request_timeout: float) -> AttemptResult:
+        source_lang, target_lang = params['sl'], params['dl']
+        try:
+            timeout = aiohttp.ClientTimeout(total=request_timeout)
+
+            session = await http_client.get_session()
+            async with session.get(f"{self.base_url}/translate", params=params, timeout=timeout) as response:
+
+                if response.status == 200:
+                    data = await response.json()
+
+                    # Проверяем структуру ответа
+                    if isinstance(data, dict) and 'destination-text' in data:
+                        translated = data['destination-text']
+                        if translated and translated.strip():
+                            logger.info(f"[{self.name}] Перевод выполнен успешно: {source_lang} -> {target_lang}")
+                            return OUTCOME_OK, translated.strip(), None
+                        else:
+                            logger.error(f"[{self.name}] API вернул пустой перевод")
+                            return OUTCOME_INVALID_RESPONSE, None, None
+                    else:
+                        logger.error(f"[{self.name}] Некорректная структура ответа API: {data}")
+                        return OUTCOME_INVALID_RESPONSE, None, None
+
+                elif response.status == 400:
+                    logger.error(f"[{self.name}] Некорректные параметры запроса")
+                    return OUTCOME_BAD_INPUT, None, None
+
+                elif response.status == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    logger.warning(f"[{self.name}] Превышен лимит запросов, Retry-After: {retry_after}")
+                    return OUTCOME_RATE_LIMITED, None, retry_after
+
+                else:
+                    logger.error(f"[{self.name}] API вернул ошибку: HTTP {response.status}")
+                    return OUTCOME_UPSTREAM_ERROR, None, parse_retry_after(response.headers.get("Retry-After"))
+
+        except asyncio.TimeoutError:
+            logger.error(f"[{self.name}] Таймаут при переводе")
+            return OUTCOME_TIMEOUT, None, None
+
+        except aiohttp.ClientError as e:
+            logger.error(f"[{self.name}] Сетевая ошибка при переводе: {e}")
+            return OUTCOME_UPSTREAM_ERROR, None, None
+
+        except Exception as e:
+            logger.error(f"[{self.name}] Неожиданная ошибка при переводе: {e}")
+            return OUTCOME_INVALID_RESPONSE, None, None
+
+    async def fetch_languages(self, request_timeout: float) -> Optional[Dict[str, str]]:
+        try:
+            timeout = aiohttp.ClientTimeout(total=request_timeout)
+            session = await http_client.get_session()
+            async with session.get(f"{self.base_url}/languages", timeout=timeout) as response:
+                if response.status == 200:
+                    return await response.json()
+                logger.error(f"[{self.name}] Ошибка получения языков: HTTP {response.status}")
+                return None
+        except asyncio.TimeoutError:
+            logger.error(f"[{self.name}] Таймаут при получении списка языков")
+            return None
+        except aiohttp.ClientError as e:
+            logger.error(f"[{self.name}] Сетевая ошибка при получении языков: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"[{self.name}] Неожиданная ошибка при получении языков: {e}")
+            return None
+
+
+# Типы провайдеров по протоколу
+BACKEND_TYPES = {
+    "ftapi": FtapiBackend,
+}
+
+
+def parse_backends(spec: str, default_url: str = TRANSLATION_API_URL) -> List[TranslationBackend]:
+    """
+    Создаёт провайдеров по строке настроек
+
+    Args:
+        spec: Записи "имя=адрес" или "имя=тип:адрес" через запятую
+        default_url: Адрес единственного провайдера, если spec пуст
+    """
+    backends: List[TranslationBackend] = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, target = entry.partition("=")
+        backend_type, _, url = target.partition(":")
+        if backend_type not in BACKEND_TYPES or url.startswith("//"):
+            backend_type, url = "ftapi", target
+        if not name.strip() or not url.strip():
+            logger.error(f"Некорректная запись провайдера перевода: '{entry}'")
+            continue
+        backends.append(BACKEND_TYPES[backend_type](name.strip(), url.strip()))
+
+    if not backends:
+        backends.append(FtapiBackend("ftapi", default_url))
+    return backends
+
+
+class BackendRouter:
+    """
+    Выбирает провайдера для очередного запроса
+    """
+
+    def __init__(self, backends: List[TranslationBackend]):
+        self.backends = backends
+
+    def choose(self, exclude: Iterable[TranslationBackend] = ()) -> Optional[TranslationBackend]:
+        """
+        Возвращает лучшего доступного провайдера
+
+        Args:
+            exclude: Провайдеры, которые уже подвели этот запрос. Они выбираются,
+                только если других доступных нет
+
+        Returns:
+            Провайдер или None, если все выключатели разомкнуты
+        """
+        available = [backend for backend in self.backends if backend.available]
+        if not available:
+            return None
+        excluded = set(exclude)
+        candidates = [backend for backend in available if backend not in excluded] or available
+        if len(candidates) > 1 and random.random() < EXPLORE_RATE:
+            return random.choice(candidates)
+        return min(candidates, key=lambda backend: backend.score())
+
+    def has_alternative(self, exclude: Iterable[TranslationBackend]) -> bool:
+        """Проверяет, есть ли доступный провайдер вне exclude"""
+        excluded = set(exclude)
+        return any(backend.available and backend not in excluded for backend in self.backends)
+
+    def retry_in(self) -> Optional[float]:
+        """Через сколько секунд ближайший разомкнутый выключатель начнёт пробовать снова"""
+        waits = [
+            backend.breaker.get_stats()["retry_in"] for backend in self.backends
+            if backend.breaker.get_stats()["retry_in"] is not None
+        ]
+        return min(waits) if waits else None
+
+    def by_preference(self) -> List[TranslationBackend]:
+        """Провайдеры от лучшего к худшему, доступные в начале"""
+        return sorted(self.backends, key=lambda backend: (not backend.available, backend.score()))
+
+    def get_stats(self) -> List[Dict]:
+        """Возвращает состояние всех провайдеров"""
+        return [backend.get_stats() for backend in self.backends]
+
+
+# Общий маршрутизатор провайдеров перевода
+backend_router = BackendRouter(parse_backends(TRANSLATION_BACKENDS))
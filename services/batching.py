@@ -0,0 +1,189 @@
+"""
+Микро-батчинг запросов перевода
+Тексты с одинаковой парой языков, пришедшие в коротком окне,
+отправляются в API одним запросом через разделитель
+
+API определяет исходный язык один раз на весь объединённый текст,
+поэтому тексты с source_lang='auto' объединяются только с текстами,
+для которых локально определён тот же язык. Если язык определить
+не удалось, текст отправляется отдельным запросом.
+"""
+
+import asyncio
+import re
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import (
+    BATCH_WINDOW,
+    BATCH_MAX_SIZE,
+    BATCH_MAX_CHARS,
+    BATCH_SEPARATOR,
+)
+from services.translation_result import (
+    OUTCOME_RATE_LIMITED,
+    OUTCOME_TIMEOUT,
+    OUTCOME_UPSTREAM_ERROR,
+    TranslationResult,
+)
+from utils.logger import logger
+
+RequestFunc = Callable[[str, str, str], Awaitable[TranslationResult]]
+# Текст -> код языка или "auto", если уверенности нет
+DetectFunc = Callable[[str], str]
+# (исходный язык запроса, язык, по которому собирается пачка, целевой язык)
+BatchKey = Tuple[str, str, str]
+
+# Исходы, которые касаются API, а не текстов: их получает вся пачка.
+# На остальные (отказ в тексте, непонятный ответ) тексты переводятся
+# по одному, чтобы один плохой текст не испортил перевод соседей
+SHARED_OUTCOMES = (OUTCOME_TIMEOUT, OUTCOME_RATE_LIMITED, OUTCOME_UPSTREAM_ERROR)
+
+
+class TranslationBatcher:
+    """
+    Собирает ожидающие тексты по парам языков и отправляет их пачками
+    Если ответ API не удаётся разделить обратно или API отклонил пачку,
+    тексты переводятся по одному
+    """
+
+    def __init__(
+        self,
+        request_func: RequestFunc,
+        window: float = BATCH_WINDOW,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_batch_chars: int = BATCH_MAX_CHARS,
+        separator: str = BATCH_SEPARATOR,
+        detect_func: Optional[DetectFunc] = None,
+    ):
+        """
+        Инициализация батчера
+
+        Args:
+            request_func: Функция одиночного запроса перевода (text, sl, dl)
+            window: Окно сбора пачки в секундах
+            max_batch_size: Максимальное количество текстов в пачке
+            max_batch_chars: Максимальная длина объединённого текста
+            separator: Разделитель текстов в объединённом запросе
+            detect_func: Локальное определение языка для текстов с source_lang='auto';
+                без него такие тексты не объединяются
+        """
+        self.request_func = request_func
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_batch_chars = max_batch_chars
+        self.separator = separator
+        self.detect_func = detect_func
+        # Разделитель после перевода может обрасти пробелами и переносами
+        self._split_re = re.compile(r"\s*" + re.escape(separator.strip()) + r"\s*")
+
+        self._pending: Dict[BatchKey, List[Tuple[str, asyncio.Future]]] = {}
+        self._pending_chars: Dict[BatchKey, int] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self._tasks = set()
+
+        self.batches_sent = 0
+        self.texts_batched = 0
+        self.split_failures = 0
+        self.rejected_batches = 0
+        self.undetected_texts = 0
+
+    async def submit(self, text: str, source_lang: str, target_lang: str) -> TranslationResult:
+        """
+        Ставит текст в пачку и ждёт его перевод
+        """
+        # Тексты с разделителем внутри или слишком длинные идут отдельным запросом
+        if self.separator.strip() in text or len(text) >= self.max_batch_chars:
+            return await self.request_func(text, source_lang, target_lang)
+
+        batch_lang = source_lang
+        if source_lang == "auto":
+            batch_lang = self.detect_func(text) if self.detect_func is not None else "auto"
+            if batch_lang == "auto":
+                # API выбрал бы для пачки один язык и мог бы не перевести этот текст
+                self.undetected_texts += 1
+                return await self.request_func(text, source_lang, target_lang)
+
+        pair = (source_lang, batch_lang, target_lang)
+        added_chars = len(text) + len(self.separator)
+        if self._pending_chars.get(pair, 0) + added_chars > self.max_batch_chars:
+            self._flush(pair)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(pair, []).append((text, future))
+        self._pending_chars[pair] = self._pending_chars.get(pair, 0) + added_chars
+
+        if len(self._pending[pair]) >= self.max_batch_size:
+            self._flush(pair)
+        elif pair not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[pair] = loop.call_later(self.window, self._flush, pair)
+
+        return await future
+
+    def _flush(self, pair: BatchKey) -> None:
+        """Забирает накопленную пачку и запускает её отправку"""
+        timer = self._timers.pop(pair, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(pair, None)
+        self._pending_chars.pop(pair, None)
+        if not items:
+            return
+
+        task = asyncio.ensure_future(self._send(pair, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pair: BatchKey, items: List[Tuple[str, asyncio.Future]]) -> None:
+        """Отправляет пачку и раздаёт результаты ожидающим"""
+        source_lang, _, target_lang = pair
+        texts = [text for text, _ in items]
+        try:
+            if len(texts) == 1:
+                results = [await self.request_func(texts[0], source_lang, target_lang)]
+            else:
+                results = await self._send_combined(texts, source_lang, target_lang)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _send_combined(self, texts: List[str], source_lang: str, target_lang: str) -> List[TranslationResult]:
+        """Переводит тексты одним запросом, при неудаче - по одному"""
+        self.batches_sent += 1
+        self.texts_batched += len(texts)
+
+        combined = await self.request_func(self.separator.join(texts), source_lang, target_lang)
+        if not combined.ok and combined.outcome in SHARED_OUTCOMES:
+            # Ошибка API касается всей пачки, повторять по одному нет смысла
+            return [combined] * len(texts)
+
+        if combined.ok:
+            parts = self._split_re.split(combined.text.strip())
+            if len(parts) == len(texts) and all(parts):
+                return [TranslationResult(part) for part in parts]
+            self.split_failures += 1
+            logger.warning(f"Не удалось разделить пачку из {len(texts)} текстов, перевод по одному")
+        else:
+            self.rejected_batches += 1
+            logger.warning(f"Пачка из {len(texts)} текстов отклонена ({combined.outcome}), перевод по одному")
+        return list(await asyncio.gather(
+            *(self.request_func(text, source_lang, target_lang) for text in texts)
+        ))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Возвращает статистику батчинга"""
+        return {
+            "batches_sent": self.batches_sent,
+            "texts_batched": self.texts_batched,
+            "avg_batch_size": self.texts_batched / self.batches_sent if self.batches_sent else 0.0,
+            "split_failures": self.split_failures,
+            "rejected_batches": self.rejected_batches,
+            "undetected_texts": self.undetected_texts,
+            "pending": sum(len(items) for items in self._pending.values()),
+        }
@@ -0,0 +1,260 @@
+"""
+Персистентный кэш переводов на диске (SQLite)
+Переживает перезапуски бота и стоит под in-memory кэшем
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from config.settings import (
+    DISK_CACHE_ENABLED,
+    DISK_CACHE_FILE,
+    DISK_CACHE_TTL,
+    DISK_CACHE_MAX_BYTES,
+    DISK_CACHE_COMPACT_INTERVAL,
+)
+from services.translation_cache import normalize_text
+from utils.logger import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    key TEXT PRIMARY KEY,
+    translated TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_translations_last_access ON translations (last_access);
+CREATE INDEX IF NOT EXISTS idx_translations_expires_at ON translations (expires_at);
+"""
+
+
+class DiskTranslationCache:
+    """
+    Кэш переводов в SQLite
+    Все обращения к базе выполняются в отдельном потоке, чтобы не блокировать event loop
+    """
+
+    def __init__(
+        self,
+        path: str = DISK_CACHE_FILE,
+        ttl: float = DISK_CACHE_TTL,
+        max_bytes: int = DISK_CACHE_MAX_BYTES,
+        compact_interval: float = DISK_CACHE_COMPACT_INTERVAL,
+    ):
+        """
+        Инициализация кэша
+
+        Args:
+            path: Путь к файлу базы данных
+            ttl: Время жизни записи в секундах
+            max_bytes: Максимальный суммарный размер переводов в байтах
+            compact_interval: Интервал фоновой компактизации в секундах
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compact_interval = compact_interval
+        # Один поток - одно соединение, операции выполняются строго по порядку
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="disk-cache")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+        self._compact_task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str, source_lang: str, target_lang: str) -> str:
+        """Строит ключ записи как хэш (текст, исходный язык, целевой язык)"""
+        raw = f"{source_lang}\x00{target_lang}\x00{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def _run(self, func, *args):
+        """Выполняет функцию в потоке кэша"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # --- Синхронные операции, выполняются только в потоке кэша ---
+
+    def _ensure_open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()
+            self._bytes = row[0]
+            self._conn = conn
+            logger.info(f"Дисковый кэш переводов открыт: {self.path}")
+        return self._conn
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        conn = self._ensure_open()
+        now = time.time()
+        row = conn.execute(
+            "SELECT translated, expires_at FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._delete_sync(conn, key)
+            return None
+        conn.execute("UPDATE translations SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return row[0]
+
+    def _set_sync(self, key: str, translated: str) -> None:
+        conn = self._ensure_open()
+        now = time.time()
+        size = len(translated.encode("utf-8"))
+        old = conn.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+        conn.execute(
+            "INSERT OR REPLACE INTO translations (key, translated, expires_at, last_access, size) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, translated, now + self.ttl, now, size),
+        )
+        conn.commit()
+        self._bytes += size - (old[0] if old else 0)
+        if self._bytes > self.max_bytes:
+            self._evict_sync(conn)
+
+    def _delete_sync(self, conn: sqlite3.Connection, key: str) -> None:
+        row = conn.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+            conn.commit()
+            self._bytes -= row[0]
+
+    def _evict_sync(self, conn: sqlite3.Connection) -> None:
+        """Удаляет давно не использованные записи, пока размер не станет меньше 90% лимита"""
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute("SELECT key, size FROM translations ORDER BY last_access")
+        evicted = []
+        for key, size in rows:
+            if self._bytes <= target:
+                break
+            evicted.append((key,))
+            self._bytes -= size
+        conn.executemany("DELETE FROM translations WHERE key = ?", evicted)
+        conn.commit()
+        self.evictions += len(evicted)
+
+    def _compact_sync(self) -> int:
+        conn = self._ensure_open()
+        cursor = conn.execute("DELETE FROM translations WHERE expires_at <= ?", (time.time(),))
+        removed = cursor.rowcount
+        conn.commit()
+        self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+        if self._bytes > self.max_bytes:
+            self._evict_sync(conn)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        return removed
+
+    def _count_sync(self) -> int:
+        conn = self._ensure_open()
+        return conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def _close_sync(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- Асинхронный интерфейс ---
+
+    async def get(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """
+        Возвращает перевод из дискового кэша или None
+        """
+        try:
+            translated = await self._run(self._get_sync, self.make_key(text, source_lang, target_lang))
+        except Exception as e:
+            logger.error(f"Ошибка чтения дискового кэша: {e}")
+            return None
+
+        if translated is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return translated
+
+    def set_nowait(self, text: str, source_lang: str, target_lang: str, translated: str) -> None:
+        """
+        Ставит запись перевода в очередь на запись, не дожидаясь диска
+        """
+        future = self._executor.submit(
+            self._set_sync, self.make_key(text, source_lang, target_lang), translated
+        )
+        future.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, future) -> None:
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Ошибка записи в дисковый кэш: {error}")
+        else:
+            self.writes += 1
+
+    async def compact(self) -> int:
+        """
+        Удаляет просроченные записи, применяет лимит размера и сжимает файл базы
+
+        Returns:
+            Количество удалённых просроченных записей
+        """
+        removed = await self._run(self._compact_sync)
+        logger.info(f"Компактизация дискового кэша: удалено просроченных записей {removed}")
+        return removed
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.error(f"Ошибка компактизации дискового кэша: {e}")
+
+    async def start(self) -> None:
+        """
+        Открывает базу, выполняет компактизацию и запускает фоновую компактизацию
+        """
+        await self.compact()
+        if self._compact_task is None:
+            self._compact_task = asyncio.create_task(self._compact_loop())
+
+    async def close(self) -> None:
+        """
+        Останавливает фоновую компактизацию, дожидается записей и закрывает базу
+        """
+        if self._compact_task is not None:
+            self._compact_task.cancel()
+            self._compact_task = None
+        await self._run(self._close_sync)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику работы дискового кэша"""
+        total = self.hits + self.misses
+        return {
+            "entries": await self._run(self._count_sync),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+# Общий экземпляр дискового кэша, None если он отключён в настройках
+disk_cache: Optional[DiskTranslationCache] = DiskTranslationCache() if DISK_CACHE_ENABLED else None
@@ -0,0 +1,55 @@
+"""
+Быстрые пути перед переводом: ответ без обращения к API,
+когда перевод заведомо не нужен
+"""
+
+from collections import Counter
+from typing import Dict
+
+from config.settings import DETECTION_MIN_LETTERS, SAME_LANGUAGE_MIN_CONFIDENCE
+from services.input_classifier import is_untranslatable
+from services.language_detector import is_reliable, language_detector, languages_match
+
+
+class FastPath:
+    """
+    Проверки, позволяющие не отправлять текст в API перевода
+    Считает, сколько запросов удалось сэкономить
+    """
+
+    def __init__(self, same_language_min_confidence: float = SAME_LANGUAGE_MIN_CONFIDENCE):
+        """
+        Args:
+            same_language_min_confidence: Уверенность определения языка,
+                при которой текст считается уже написанным на целевом языке
+        """
+        self.same_language_min_confidence = same_language_min_confidence
+        self.saved_calls: Counter = Counter()
+
+    def is_untranslatable(self, text: str) -> bool:
+        """
+        Проверяет, что в тексте нечего переводить (ссылки, числа, эмодзи, код)
+        """
+        if is_untranslatable(text):
+            self.saved_calls["untranslatable"] += 1
+            return True
+        return False
+
+    def is_already_in_target(self, text: str, target_lang: str) -> bool:
+        """
+        Проверяет, написан ли текст уже на целевом языке
+        """
+        detection = language_detector.detect(text)
+        if (is_reliable(detection, self.same_language_min_confidence, DETECTION_MIN_LETTERS)
+                and languages_match(detection.lang, target_lang)):
+            self.saved_calls["same_language"] += 1
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, int]:
+        """Возвращает количество сэкономленных запросов по причинам"""
+        return {"total": sum(self.saved_calls.values()), **self.saved_calls}
+
+
+# Общий экземпляр быстрых путей
+fast_path = FastPath()
@@ -0,0 +1,186 @@
+"""
+Дублирующие (hedged) запросы для сокращения хвоста задержек
+
+Если запрос не завершился за время, которого хватает большинству
+недавних запросов, отправляется второй такой же. Берётся первый
+успешный ответ, проигравший запрос отменяется. Доля дублей
+ограничена бюджетом, чтобы не удваивать нагрузку на API.
+"""
+
+import asyncio
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from config.settings import (
+    HEDGE_BUDGET,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+)
+from utils.logger import logger
+
+
+class LatencyTracker:
+    """
+    Хранит задержки последних запросов и считает их перцентили
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Args:
+            window: Сколько последних замеров учитывать
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        """Добавляет замер задержки в секундах"""
+        self._samples.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Возвращает перцентиль задержки, например 0.95 для p95
+
+        Returns:
+            Задержка в секундах или None, если замеров ещё нет
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[index]
+
+
+class RequestHedger:
+    """
+    Выполняет запрос и при задержке дублирует его
+
+    Бюджет работает как ведро жетонов: каждый запрос добавляет
+    budget жетонов, каждый дубль тратит один. При budget=0.1
+    дублей получается не больше 10% от числа запросов.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        budget: float = HEDGE_BUDGET,
+        min_delay: float = HEDGE_MIN_DELAY,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        max_tokens: float = 10.0,
+    ):
+        """
+        Args:
+            percentile: Перцентиль недавних задержек, после которого отправляется дубль
+            budget: Допустимая доля дублей от числа запросов
+            min_delay: Минимальная пауза перед дублем в секундах
+            min_samples: Сколько замеров нужно, чтобы начать дублировать
+            max_tokens: Сколько дублей можно накопить про запас
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_tokens = max_tokens
+        self.latency = LatencyTracker()
+
+        self._tokens = 0.0
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    @property
+    def hedge_delay(self) -> Optional[float]:
+        """Пауза перед дублем или None, если замеров пока мало"""
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile))
+
+    async def run(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        is_success: Callable[[Any], bool] = lambda result: result is not None,
+    ) -> Any:
+        """
+        Выполняет запрос с возможным дублем
+
+        Args:
+            factory: Функция, создающая корутину запроса
+            is_success: Проверка, что результат годится как ответ
+
+        Returns:
+            Первый успешный результат, а если успешных нет - результат первого запроса
+        """
+        self.requests += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        primary = asyncio.ensure_future(factory())
+        delay = self.hedge_delay
+        if delay is None:
+            result = await primary
+            self._record(result, is_success, loop.time() - started)
+            return result
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            result = primary.result()
+            self._record(result, is_success, loop.time() - started)
+            return result
+
+        if self._tokens < 1:
+            self.budget_exhausted += 1
+            result = await primary
+            self._record(result, is_success, loop.time() - started)
+            return result
+
+        self._tokens -= 1
+        self.hedges_sent += 1
+        hedge = asyncio.ensure_future(factory())
+        hedge_started = loop.time()
+        pending = {primary, hedge}
+        first_result = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if task is primary:
+                        first_result = result
+                    if is_success(result):
+                        if task is hedge:
+                            self.hedge_wins += 1
+                            logger.info("Дублирующий запрос ответил раньше основного")
+                        self._record(result, is_success,
+                                     loop.time() - (hedge_started if task is hedge else started))
+                        return result
+            return first_result
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+
+    def _record(self, result: Any, is_success: Callable[[Any], bool], latency: float) -> None:
+        # Учитываем только успешные ответы: быстрые отказы исказили бы перцентиль
+        if is_success(result):
+            self.latency.record(latency)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику дублирования"""
+        delay = self.hedge_delay
+        return {
+            "requests": self.requests,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "win_rate": self.hedge_wins / self.hedges_sent if self.hedges_sent else 0.0,
+            "budget_exhausted": self.budget_exhausted,
+            "hedge_delay": round(delay, 3) if delay is not None else None,
+        }
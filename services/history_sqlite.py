@@ -0,0 +1,283 @@
+"""
+Хранение истории переводов в SQLite
+
+Записи лежат в одной таблице с индексом (user_id, timestamp), поэтому
+чтение и запись истории одного пользователя не зависят от общего
+числа пользователей. Новые записи копятся в буфере и вставляются
+пачками в одной транзакции. Запросы - постоянные строки с параметрами,
+их подготовленные выражения переиспользуются из кэша sqlite3.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import (
+    HISTORY_BATCH_DELAY,
+    HISTORY_BATCH_SIZE,
+    HISTORY_DB_FILE,
+    HISTORY_MAX_RECORDS,
+)
+from services.storage_io import fsync_policy, run_io
+from utils.logger import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_user_timestamp ON history (user_id, timestamp);
+"""
+
+_INSERT = "INSERT INTO history (user_id, timestamp, record) VALUES (?, ?, ?)"
+_SELECT_USER = "SELECT record FROM history WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?"
+# Удаляет записи сверх лимита: все, кроме max_records самых новых
+_DELETE_EVICTED = (
+    "DELETE FROM history WHERE id IN ("
+    "SELECT id FROM history WHERE user_id = ? "
+    "ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?)"
+)
+_DELETE_USER = "DELETE FROM history WHERE user_id = ?"
+
+# Функция, возвращающая историю из прежнего хранилища для переноса
+MigrateFunc = Callable[[], Dict[str, List[Dict]]]
+
+
+class SqliteHistoryStore:
+    """
+    История переводов в SQLite с пакетной вставкой
+    """
+
+    def __init__(
+        self,
+        path: str = HISTORY_DB_FILE,
+        migrate_from: Optional[MigrateFunc] = None,
+        migrated_paths: Tuple[str, ...] = (),
+        max_records: int = HISTORY_MAX_RECORDS,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        batch_delay: float = HISTORY_BATCH_DELAY,
+    ):
+        """
+        Args:
+            path: Путь к файлу базы данных
+            migrate_from: Загрузка истории из прежнего хранилища, если база пуста
+            migrated_paths: Файлы прежнего хранилища, которые переименовываются после переноса
+            max_records: Сколько последних записей хранить на пользователя
+            batch_size: Сколько записей копится в буфере до вставки
+            batch_delay: Сколько секунд запись может ждать в буфере
+        """
+        self.path = path
+        self.migrate_from = migrate_from
+        self.migrated_paths = migrated_paths
+        self.max_records = max_records
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._conn: Optional[sqlite3.Connection] = None
+        # Запись в хранилище идёт из фонового потока, поэтому
+        # соединение и буфер защищены блокировкой
+        self._lock = threading.RLock()
+        # Записи, ещё не вставленные в базу: (user_id, запись)
+        self._pending: List[Tuple[str, Dict]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Future] = None
+
+        self.batches = 0
+        self.inserted = 0
+
+    def _ensure_open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # В режиме WAL NORMAL не портит базу при сбое, но может потерять последние транзакции
+            conn.execute(f"PRAGMA synchronous={'NORMAL' if fsync_policy == 'never' else 'FULL'}")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._migrate(conn)
+        return self._conn
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Однократно переносит историю из прежнего хранилища в пустую базу"""
+        if self.migrate_from is None:
+            return
+        if conn.execute("SELECT 1 FROM history LIMIT 1").fetchone() is not None:
+            return
+        history = self.migrate_from()
+        if not history:
+            return
+        rows = [
+            (user_id_str, record.get("timestamp", ""), json.dumps(record, ensure_ascii=False))
+            for user_id_str, records in history.items()
+            # Вставляем от старых записей к новым, чтобы id росли вместе со временем
+            for record in reversed(records[:self.max_records])
+        ]
+        with conn:
+            conn.executemany(_INSERT, rows)
+        for path in self.migrated_paths:
+            if os.path.exists(path):
+                os.replace(path, path + ".migrated")
+        logger.info(f"История перенесена в {self.path}: {len(rows)} записей")
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне event loop отложить вставку некому
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self.batch_delay, self._flush_in_background)
+
+    def _flush_in_background(self) -> None:
+        # Транзакция SQLite с fsync не должна выполняться в event loop.
+        # Если буфер уже вставлен или сброшен, flush ничего не сделает
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(run_io(self.flush))
+
+    def flush(self) -> bool:
+        """Вставляет накопленные записи одной транзакцией и применяет лимит на пользователя"""
+        with self._lock:
+            if not self._pending:
+                return True
+            pending, self._pending = self._pending, []
+            try:
+                conn = self._ensure_open()
+                with conn:
+                    conn.executemany(_INSERT, [
+                        (user_id_str, record.get("timestamp", ""), json.dumps(record, ensure_ascii=False))
+                        for user_id_str, record in pending
+                    ])
+                    conn.executemany(_DELETE_EVICTED, [
+                        (user_id_str, self.max_records)
+                        for user_id_str in {user_id_str for user_id_str, _ in pending}
+                    ])
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка при записи истории в базу: {e}")
+                return False
+            self.batches += 1
+            self.inserted += len(pending)
+            return True
+
+    def add(self, user_id_str: str, record: Dict) -> bool:
+        """Ставит запись в буфер вставки"""
+        with self._lock:
+            self._pending.append((user_id_str, record))
+            if len(self._pending) >= self.batch_size:
+                return self.flush()
+            self._schedule_flush()
+            return True
+
+    def add_many(self, items: List[Tuple[str, Dict]]) -> bool:
+        """Вставляет записи нескольких пользователей одной транзакцией"""
+        with self._lock:
+            self._pending.extend(items)
+            return self.flush()
+
+    def get(self, user_id_str: str, limit: int) -> List[Dict]:
+        """Возвращает последние записи пользователя, от новых к старым"""
+        with self._lock:
+            self.flush()
+            rows = self._ensure_open().execute(_SELECT_USER, (user_id_str, limit)).fetchall()
+            return [json.loads(record) for (record,) in rows]
+
+    def clear(self, user_id_str: str) -> bool:
+        """Удаляет историю пользователя"""
+        with self._lock:
+            self.flush()
+            try:
+                with self._ensure_open() as conn:
+                    conn.execute(_DELETE_USER, (user_id_str,))
+                return True
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка при очистке истории в базе: {e}")
+                return False
+
+    def load(self) -> Dict[str, List[Dict]]:
+        """Читает всю историю {user_id: [записи от новых к старым]}"""
+        with self._lock:
+            self.flush()
+            try:
+                rows = self._ensure_open().execute(
+                    "SELECT user_id, record FROM history ORDER BY user_id, timestamp DESC, id DESC"
+                )
+                history: Dict[str, List[Dict]] = {}
+                for user_id_str, record in rows:
+                    history.setdefault(user_id_str, []).append(json.loads(record))
+                return history
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка при загрузке истории из базы: {e}")
+                return {}
+
+    def rewrite(self, history: Dict[str, List[Dict]]) -> bool:
+        """Заменяет всю историю"""
+        with self._lock:
+            self._pending = []
+            try:
+                with self._ensure_open() as conn:
+                    conn.execute("DELETE FROM history")
+                    conn.executemany(_INSERT, [
+                        (user_id_str, record.get("timestamp", ""), json.dumps(record, ensure_ascii=False))
+                        for user_id_str, records in history.items()
+                        for record in reversed(records[:self.max_records])
+                    ])
+                return True
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка при сохранении истории в базу: {e}")
+                return False
+
+    def user_ids(self) -> List[str]:
+        """Возвращает ID пользователей, у которых есть история"""
+        with self._lock:
+            self.flush()
+            rows = self._ensure_open().execute("SELECT DISTINCT user_id FROM history")
+            return [user_id_str for (user_id_str,) in rows]
+
+    def count(self) -> int:
+        """Возвращает общее число записей истории"""
+        with self._lock:
+            self.flush()
+            return self._ensure_open().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def maybe_compact(self) -> None:
+        """Лимит записей применяется при вставке, компактизация не нужна"""
+
+    def _open(self) -> None:
+        with self._lock:
+            self._ensure_open()
+
+    def _close(self) -> None:
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def start(self) -> None:
+        """Открывает базу и переносит историю из прежнего хранилища в пуле потоков хранилища"""
+        await run_io(self._open)
+
+    async def close(self) -> None:
+        """Вставляет оставшиеся записи и закрывает базу в пуле потоков хранилища"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        await run_io(self._close)
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние хранилища"""
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "inserted": self.inserted,
+        }
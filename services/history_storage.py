@@ -1,42 +1,562 @@
+"""
+Хранение истории переводов
+
+Рабочая копия истории держится в памяти, а изменения записываются
+в хранилище фоновой задачей (WriteBehindHistory).
+
+По умолчанию история хранится в журнале с дозаписью (JSONL).
+При HISTORY_BACKEND=sqlite используется база SQLite
+(services/history_sqlite.py), куда журнал переносится при первом запуске.
+
+Каждое изменение в журнале - одна строка в конце файла: добавление записи
+или очистка истории пользователя. Запись стоит O(1) независимо
+от числа пользователей. Фоновая компактизация переписывает журнал,
+оставляя только актуальные записи, не больше HISTORY_MAX_RECORDS
+на пользователя.
+"""
+
+import asyncio
+import itertools
 import json
 import os
-from typing import Dict, List
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
 from datetime import datetime
+
+from config.settings import (
+    HISTORY_BACKEND,
+    HISTORY_COMPACT_INTERVAL,
+    HISTORY_COMPACT_THRESHOLD,
+    HISTORY_FILE,
+    HISTORY_FLUSH_INTERVAL,
+    HISTORY_FLUSH_THRESHOLD,
+    HISTORY_LOG_FILE,
+    HISTORY_MAX_RECORDS,
+)
 from utils.logger import logger
+from services.history_sqlite import SqliteHistoryStore
+from services.storage_io import atomic_write_bytes, run_io, sync_file
+from services.popular_phrases import popular_phrases
+from services.translation_memory import translation_memory
 
-HISTORY_FILE = "storage/history.json"
+# (ID пользователя, запись), вытесненные лимитом при компактизации
+Evicted = List[Tuple[str, Dict]]
 
-def load_history() -> Dict:
+
+class HistoryLog:
     """
-    Загружает историю переводов из файла
+    Журнал истории переводов с дозаписью и компактизацией
     """
-    if not os.path.exists(HISTORY_FILE):
-        return {}
-    
-    try:
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            if not content:
-                return {}
-            return json.loads(content)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        logger.error(f"Ошибка при загрузке истории: {e}")
-        return {}
 
-def save_history(history: Dict) -> bool:
+    def __init__(
+        self,
+        path: str = HISTORY_LOG_FILE,
+        legacy_path: str = HISTORY_FILE,
+        max_records: int = HISTORY_MAX_RECORDS,
+        compact_interval: float = HISTORY_COMPACT_INTERVAL,
+        compact_threshold: int = HISTORY_COMPACT_THRESHOLD,
+    ):
+        """
+        Args:
+            path: Путь к файлу журнала
+            legacy_path: Путь к прежнему файлу history.json для переноса
+            max_records: Сколько последних записей хранить на пользователя
+            compact_interval: Интервал фоновой компактизации в секундах
+            compact_threshold: После скольких дозаписей компактизация запускается досрочно
+        """
+        self.path = path
+        self.legacy_path = legacy_path
+        self.max_records = max_records
+        self.compact_interval = compact_interval
+        self.compact_threshold = compact_threshold
+        # Дозапись и подмена файла при компактизации не должны пересекаться
+        self._lock = threading.Lock()
+        self._migrated = False
+        self._tail_checked = False
+        self._appended = 0
+        self._compact_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+        self.compactions = 0
+
+    def _ensure_migrated(self) -> None:
+        """Переносит историю из прежнего history.json в журнал при первом обращении"""
+        if self._migrated:
+            return
+        self._migrated = True
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            history = json.loads(content) if content else {}
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Ошибка при переносе истории из {self.legacy_path}: {e}")
+            return
+        if self.rewrite(history):
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+            logger.info(f"История перенесена из {self.legacy_path} в {self.path}")
+
+    def _replay(self, lines: List[str]) -> Tuple[Dict[str, List[Dict]], Evicted]:
+        """
+        Восстанавливает историю по строкам журнала
+
+        Returns:
+            История {user_id: [записи от новых к старым]} и записи, вытесненные лимитом
+        """
+        history: Dict[str, List[Dict]] = {}
+        evicted: Evicted = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                user_id_str = str(entry["user_id"])
+                record = None if entry.get("clear") else entry["record"]
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                # Недописанная строка после сбоя - пропускаем её
+                logger.warning("Пропущена повреждённая строка журнала истории")
+                continue
+            if record is None:
+                history.pop(user_id_str, None)
+                continue
+            records = history.setdefault(user_id_str, [])
+            records.insert(0, record)
+            if len(records) > self.max_records:
+                evicted.append((user_id_str, records.pop()))
+        return history, evicted
+
+    def _read_lines(self) -> List[str]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def load(self) -> Dict[str, List[Dict]]:
+        """Читает всю историю"""
+        self._ensure_migrated()
+        try:
+            history, _ = self._replay(self._read_lines())
+            return history
+        except OSError as e:
+            logger.error(f"Ошибка при загрузке истории: {e}")
+            return {}
+
+    def append(self, entry: Dict) -> bool:
+        """Дописывает одно изменение в конец журнала"""
+        return self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]) -> bool:
+        """Дописывает несколько изменений в конец журнала одной записью"""
+        self._ensure_migrated()
+        line = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        try:
+            with self._lock:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    if not self._tail_checked:
+                        # После сбоя последняя строка может быть недописанной - начинаем с новой
+                        self._tail_checked = True
+                        if f.tell() > 0 and not self._ends_with_newline():
+                            f.write("\n")
+                    f.write(line)
+                    sync_file(f)
+                self._appended += len(entries)
+        except OSError as e:
+            logger.error(f"Ошибка при записи в журнал истории: {e}")
+            return False
+        self.maybe_compact()
+        return True
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def add(self, user_id_str: str, record: Dict) -> bool:
+        """Дописывает запись пользователя; лимит записей применяется при чтении"""
+        return self.append({"user_id": user_id_str, "record": record})
+
+    def add_many(self, items: List[Tuple[str, Dict]]) -> bool:
+        """Дописывает записи нескольких пользователей одной записью в файл"""
+        return self.append_many([{"user_id": user_id_str, "record": record} for user_id_str, record in items])
+
+    def get(self, user_id_str: str, limit: int) -> List[Dict]:
+        """Возвращает последние записи пользователя, от новых к старым"""
+        return self.load().get(user_id_str, [])[:limit]
+
+    def clear(self, user_id_str: str) -> bool:
+        """Дописывает очистку истории пользователя"""
+        return self.append({"user_id": user_id_str, "clear": True})
+
+    def user_ids(self) -> List[str]:
+        """Возвращает ID пользователей, у которых есть история"""
+        return list(self.load().keys())
+
+    def count(self) -> int:
+        """Возвращает общее число записей истории"""
+        return sum(len(records) for records in self.load().values())
+
+    @staticmethod
+    def _render(history: Dict[str, List[Dict]]) -> str:
+        """Записывает историю строками журнала, от старых записей к новым"""
+        lines = []
+        for user_id_str, records in history.items():
+            for record in reversed(records):
+                lines.append(json.dumps({"user_id": user_id_str, "record": record}, ensure_ascii=False))
+        return "".join(line + "\n" for line in lines)
+
+    def _replace(self, content: str, tail_from: Optional[int] = None) -> None:
+        """
+        Подменяет журнал новым содержимым
+        Если задан tail_from, строки, дописанные после этой позиции, переносятся в конец
+        """
+        with self._lock:
+            tail = b""
+            if tail_from is not None and os.path.exists(self.path):
+                with open(self.path, 'rb') as f:
+                    f.seek(tail_from)
+                    tail = f.read()
+            atomic_write_bytes(self.path, content.encode('utf-8') + tail)
+            self._appended = tail.count(b"\n")
+
+    def rewrite(self, history: Dict[str, List[Dict]]) -> bool:
+        """Заменяет журнал историей целиком"""
+        try:
+            self._replace(self._render(
+                {user_id: records[:self.max_records] for user_id, records in history.items()}
+            ))
+            return True
+        except OSError as e:
+            logger.error(f"Ошибка при сохранении истории: {e}")
+            return False
+
+    def compact(self) -> Evicted:
+        """
+        Переписывает журнал, оставляя только актуальные записи
+        Выполняется в отдельном потоке; дозапись блокируется только на время подмены файла
+
+        Returns:
+            Записи, вытесненные лимитом на пользователя
+        """
+        self._ensure_migrated()
+        with self._lock:
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        # Читаем байты, а не символы: позиция нужна для переноса хвоста
+        with open(self.path, 'rb') as f:
+            lines = f.read(size).decode('utf-8', errors='replace').splitlines() if size else []
+        history, evicted = self._replay(lines)
+        self._replace(self._render(history), tail_from=size)
+        self.compactions += 1
+        logger.info(f"Компактизация журнала истории: {len(lines)} строк -> {sum(map(len, history.values()))}")
+        return evicted
+
+    async def compact_async(self) -> None:
+        """Компактизирует журнал в отдельном потоке"""
+        if not os.path.exists(self.path):
+            return
+        await run_io(self.compact)
+
+    def maybe_compact(self) -> None:
+        """
+        Запускает компактизацию, если дозаписей накопилось не меньше порога
+        Действует только в потоке event loop: из пула потоков её
+        запускает WriteBehindHistory.flush после записи
+        """
+        if self._appended >= self.compact_threshold:
+            self.compact_nowait()
+
+    def compact_nowait(self) -> None:
+        """Запускает компактизацию в фоне, если она ещё не идёт"""
+        if self._compact_task is not None and not self._compact_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._compact_task = loop.create_task(self._compact_safe())
+
+    async def _compact_safe(self) -> None:
+        try:
+            await self.compact_async()
+        except Exception as e:
+            logger.error(f"Ошибка компактизации журнала истории: {e}")
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            await self._compact_safe()
+
+    async def start(self) -> None:
+        """Переносит старую историю, компактизирует журнал и запускает фоновую компактизацию"""
+        await run_io(self._ensure_migrated)
+        await self._compact_safe()
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._compact_loop())
+
+    async def close(self) -> None:
+        """Останавливает фоновую компактизацию, дождавшись текущей"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            self._loop_task = None
+        if self._compact_task is not None and not self._compact_task.done():
+            await self._compact_task
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние журнала"""
+        return {
+            "appended_since_compaction": self._appended,
+            "compactions": self.compactions,
+            "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+def _create_history_store():
+    """Создаёт хранилище истории по настройке HISTORY_BACKEND"""
+    if HISTORY_BACKEND == "sqlite":
+        legacy_log = HistoryLog()
+        return SqliteHistoryStore(
+            migrate_from=legacy_log.load,
+            migrated_paths=(legacy_log.path,)
+        )
+    if HISTORY_BACKEND != "jsonl":
+        logger.error(f"Неизвестное хранилище истории '{HISTORY_BACKEND}', используется jsonl")
+    return HistoryLog()
+
+
+class WriteBehindHistory:
     """
-    Сохраняет историю переводов в файл
+    Горячая копия истории в памяти с отложенной записью в хранилище
+
+    Чтение и изменение истории работают только с памятью. Изменения
+    копятся в очереди и записываются в хранилище фоновой задачей
+    пачками: по таймеру или когда их накопится HISTORY_FLUSH_THRESHOLD.
+    При остановке бота очередь записывается полностью.
     """
-    try:
-        # Создаем директорию если её нет
-        os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-        
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+
+    def __init__(
+        self,
+        store,
+        max_records: int = HISTORY_MAX_RECORDS,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        flush_threshold: int = HISTORY_FLUSH_THRESHOLD,
+    ):
+        """
+        Args:
+            store: Хранилище истории (HistoryLog или SqliteHistoryStore)
+            max_records: Сколько последних записей хранить на пользователя
+            flush_interval: Как часто записывать накопленные изменения, в секундах
+            flush_threshold: При скольких изменениях в очереди записывать досрочно
+        """
+        self.store = store
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._history: Optional[Dict[str, Deque[Dict]]] = None
+        # Изменения, ещё не записанные в хранилище: ("add", user_id, запись) или ("clear", user_id, None)
+        self._dirty: List[Tuple[str, str, Optional[Dict]]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def _ensure_loaded(self) -> Dict[str, Deque[Dict]]:
+        if self._history is None:
+            self._history = {
+                user_id_str: deque(records[:self.max_records], maxlen=self.max_records)
+                for user_id_str, records in self.store.load().items()
+            }
+        return self._history
+
+    def _mark_dirty(self, change: Tuple[str, str, Optional[Dict]]) -> bool:
+        self._dirty.append(change)
+        if self._task is None:
+            # Фоновая запись не запущена (скрипты, тесты) - пишем сразу
+            return self._write(self._take_dirty()) == 0
+        if len(self._dirty) >= self.flush_threshold:
+            self._wakeup.set()
         return True
-    except Exception as e:
-        logger.error(f"Ошибка при сохранении истории: {e}")
-        return False
+
+    def _take_dirty(self) -> List[Tuple[str, str, Optional[Dict]]]:
+        dirty, self._dirty = self._dirty, []
+        return dirty
+
+    def _write(self, changes: List[Tuple[str, str, Optional[Dict]]]) -> int:
+        """
+        Записывает изменения в хранилище по порядку, объединяя подряд идущие добавления
+
+        Returns:
+            Сколько изменений с конца списка записать не удалось
+        """
+        i = 0
+        while i < len(changes):
+            action, user_id_str, _ = changes[i]
+            j = i + 1
+            if action == "add":
+                while j < len(changes) and changes[j][0] == "add":
+                    j += 1
+            try:
+                if action == "add":
+                    ok = self.store.add_many([(user_id, record) for _, user_id, record in changes[i:j]])
+                else:
+                    ok = self.store.clear(user_id_str)
+            except Exception as e:
+                logger.error(f"Ошибка записи истории в хранилище: {e}")
+                ok = False
+            if not ok:
+                return len(changes) - i
+            i = j
+        return 0
+
+    def add(self, user_id_str: str, record: Dict) -> Tuple[bool, Optional[Dict]]:
+        """
+        Добавляет запись в начало истории пользователя
+
+        Returns:
+            Признак успеха и запись, вытесненная лимитом, если такая есть
+        """
+        records = self._ensure_loaded().setdefault(
+            user_id_str, deque(maxlen=self.max_records)
+        )
+        evicted = records[-1] if len(records) == self.max_records else None
+        records.appendleft(record)
+        return self._mark_dirty(("add", user_id_str, record)), evicted
+
+    def get(self, user_id_str: str, limit: int) -> List[Dict]:
+        """Возвращает последние записи пользователя, от новых к старым"""
+        records = self._ensure_loaded().get(user_id_str)
+        return list(itertools.islice(records, limit)) if records else []
+
+    def clear(self, user_id_str: str) -> bool:
+        """Очищает историю пользователя"""
+        if self._ensure_loaded().pop(user_id_str, None) is None:
+            return True
+        return self._mark_dirty(("clear", user_id_str, None))
+
+    def load(self) -> Dict[str, List[Dict]]:
+        """Возвращает копию всей истории"""
+        return {user_id_str: list(records) for user_id_str, records in self._ensure_loaded().items()}
+
+    def _replace_history(self, history: Dict[str, List[Dict]]) -> None:
+        self._history = {
+            user_id_str: deque(records[:self.max_records], maxlen=self.max_records)
+            for user_id_str, records in history.items()
+        }
+        self._dirty = []
+
+    async def rewrite(self, history: Dict[str, List[Dict]]) -> bool:
+        """Заменяет всю историю; накопленные изменения теряют смысл"""
+        if self._flush_lock is None:
+            # Фоновая запись не запущена (скрипты, тесты)
+            self._replace_history(history)
+            return self.store.rewrite(history)
+        # Ждём начатую запись, чтобы старые изменения не легли поверх новой истории
+        async with self._flush_lock:
+            self._replace_history(history)
+            return await run_io(self.store.rewrite, history)
+
+    def user_ids(self) -> List[str]:
+        """Возвращает ID пользователей, у которых есть история"""
+        return [user_id_str for user_id_str, records in self._ensure_loaded().items() if records]
+
+    def count(self) -> int:
+        """Возвращает общее число записей истории"""
+        return sum(len(records) for records in self._ensure_loaded().values())
+
+    async def flush(self) -> None:
+        """Записывает накопленные изменения в хранилище в отдельном потоке"""
+        async with self._flush_lock:
+            changes = self._take_dirty()
+            if not changes:
+                return
+            try:
+                failed = await run_io(self._write, changes)
+            except Exception:
+                # Запись не дошла до хранилища (например, пул потоков остановлен)
+                self.flush_errors += 1
+                self._dirty = changes + self._dirty
+                raise
+            # Запись шла в пуле потоков, где нет event loop, поэтому
+            # порог компактизации проверяем здесь
+            self.store.maybe_compact()
+            self.flushes += 1
+            self.flushed += len(changes) - failed
+            if failed:
+                # Не записанное вернём в начало очереди и попробуем в следующий раз
+                self.flush_errors += 1
+                self._dirty = changes[-failed:] + self._dirty
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка записи истории: {e}")
+
+    async def start(self) -> None:
+        """Открывает хранилище, загружает историю в память и запускает фоновую запись"""
+        await self.store.start()
+        await run_io(self._ensure_loaded)
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Останавливает фоновую запись, записывает всё накопленное и закрывает хранилище"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.flush()
+            if self._dirty:
+                logger.error(f"Не удалось записать {len(self._dirty)} изменений истории")
+        await self.store.close()
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние отложенной записи"""
+        return {
+            "users": len(self._history) if self._history is not None else 0,
+            "dirty": len(self._dirty),
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+            "flush_errors": self.flush_errors,
+        }
+
+
+# Общее хранилище истории переводов
+history_store = _create_history_store()
+
+# История в памяти с отложенной записью в хранилище
+history_cache = WriteBehindHistory(history_store)
+
+
+def load_history() -> Dict:
+    """
+    Загружает всю историю переводов
+    """
+    return history_cache.load()
+
+async def save_history(history: Dict) -> bool:
+    """
+    Сохраняет историю переводов целиком, заменяя прежнюю
+    """
+    return await history_cache.rewrite(history)
 
 def add_to_history(user_id: int, record: Dict) -> bool:
     """
@@ -47,22 +567,23 @@ def add_to_history(user_id: int, record: Dict) -> bool:
         record: Словарь с данными перевода
     """
     try:
-        history = load_history()
         user_id_str = str(user_id)
         
-        if user_id_str not in history:
-            history[user_id_str] = []
-        
         # Добавляем временную метку
         record["timestamp"] = datetime.now().isoformat()
         
-        # Добавляем запись в начало списка
-        history[user_id_str].insert(0, record)
-        
-        # Ограничиваем количество записей (максимум 50)
-        history[user_id_str] = history[user_id_str][:50]
-        
-        return save_history(history)
+        # Запись попадает в память сразу, а на диск - позже, фоновой задачей
+        ok, evicted = history_cache.add(user_id_str, record)
+        # Новая пара сразу становится доступна памяти переводов, вытесненная - забывается
+        if translation_memory is not None:
+            if evicted is not None:
+                translation_memory.discard(user_id_str, evicted)
+            translation_memory.add(user_id_str, record)
+        if popular_phrases is not None:
+            if evicted is not None:
+                popular_phrases.discard(user_id_str, evicted)
+            popular_phrases.add(user_id_str, record)
+        return ok
     except Exception as e:
         logger.error(f"Ошибка при добавлении в историю: {e}")
         return False
@@ -76,11 +597,7 @@ def get_history(user_id: int, limit: int = 5) -> List[Dict]:
         limit: Максимальное количество записей
     """
     try:
-        history = load_history()
-        user_id_str = str(user_id)
-        
-        user_history = history.get(user_id_str, [])
-        return user_history[:limit]
+        return history_cache.get(str(user_id), limit)
     except Exception as e:
         logger.error(f"Ошибка при получении истории: {e}")
         return []
@@ -90,13 +607,41 @@ def clear_history(user_id: int) -> bool:
     Очищает историю переводов пользователя
     """
     try:
-        history = load_history()
         user_id_str = str(user_id)
         
-        if user_id_str in history:
-            del history[user_id_str]
-            return save_history(history)
+        if not history_cache.clear(user_id_str):
+            return False
+        if translation_memory is not None:
+            translation_memory.remove_user(user_id_str)
+        if popular_phrases is not None:
+            popular_phrases.remove_user(user_id_str)
         return True
     except Exception as e:
         logger.error(f"Ошибка при очистке истории: {e}")
         return False
+
+def get_history_user_ids() -> List[int]:
+    """
+    Возвращает ID всех пользователей, у которых есть история
+    """
+    try:
+        user_ids = []
+        for user_id_str in history_cache.user_ids():
+            try:
+                user_ids.append(int(user_id_str))
+            except ValueError:
+                continue
+        return user_ids
+    except Exception as e:
+        logger.error(f"Ошибка получения пользователей из истории: {e}")
+        return []
+
+def count_history_records() -> int:
+    """
+    Возвращает общее количество записей истории
+    """
+    try:
+        return history_cache.count()
+    except Exception as e:
+        logger.error(f"Ошибка подсчёта записей истории: {e}")
+        return 0
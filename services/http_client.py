@@ -0,0 +1,95 @@
+"""
+Общий HTTP-клиент для исходящих запросов к API перевода
+Держит одну долгоживущую aiohttp-сессию с пулом соединений
+"""
+
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from config.settings import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+)
+from utils.logger import logger
+
+
+class HttpClient:
+    """
+    Обёртка над aiohttp.ClientSession с пулом соединений,
+    keep-alive, ограничением соединений на хост и кэшем DNS
+    """
+
+    def __init__(
+        self,
+        limit: int = HTTP_POOL_LIMIT,
+        limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = HTTP_DNS_CACHE_TTL,
+        keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+    ):
+        """
+        Инициализация клиента
+
+        Args:
+            limit: Максимальное количество соединений в пуле
+            limit_per_host: Максимальное количество соединений к одному хосту
+            dns_cache_ttl: Время жизни кэша DNS в секундах
+            keepalive_timeout: Время удержания простаивающего соединения в секундах
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_closed(self) -> bool:
+        """Возвращает True, если сессия не создана или уже закрыта"""
+        return self._session is None or self._session.closed
+
+    async def start(self) -> aiohttp.ClientSession:
+        """
+        Создаёт сессию, если она ещё не создана
+        Коннектор должен создаваться внутри работающего event loop
+        """
+        async with self._lock:
+            if self.is_closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    use_dns_cache=True,
+                    keepalive_timeout=self.keepalive_timeout,
+                )
+                self._session = aiohttp.ClientSession(connector=connector)
+                logger.info(
+                    f"HTTP-сессия создана: limit={self.limit}, "
+                    f"limit_per_host={self.limit_per_host}, dns_ttl={self.dns_cache_ttl}"
+                )
+            return self._session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает общую сессию, создавая её при первом обращении
+        """
+        if self.is_closed:
+            return await self.start()
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Закрывает сессию и все соединения пула
+        """
+        async with self._lock:
+            if not self.is_closed:
+                await self._session.close()
+                logger.info("HTTP-сессия закрыта")
+            self._session = None
+
+
+# Общий экземпляр клиента, жизненным циклом управляет bot.py
+http_client = HttpClient()
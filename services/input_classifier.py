@@ -0,0 +1,101 @@
+"""
+Классификация входного текста перед переводом
+
+Ссылки, почта, упоминания и код переводить не нужно. Если кроме них
+в сообщении нет слов, оно возвращается как есть. Иначе такие фрагменты
+заменяются метками, переводится только текст, а метки потом
+заменяются обратно исходными фрагментами.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Фрагменты, которые вырезаются из текста перед переводом
+_MASK_RE = re.compile(
+    r"```.*?```"                                  # Блок кода
+    r"|`[^`\n]+`"                                 # Код в строке
+    r"|(?:https?://|www\.)[^\s<>\"]+[^\s<>\".,;:!?)\]]"  # Ссылка
+    r"|[\w.+-]+@[\w-]+(?:\.[\w-]+)+"              # Электронная почта
+    r"|(?<![\w@])@\w{3,}",                        # Упоминание
+    re.DOTALL,
+)
+
+# Строка, похожая на программный код
+_CODE_LINE_RE = re.compile(
+    r"^\s*(?:def |class |import |from \S+ import |function |const |let |var |return\b|#include"
+    r"|public |private |if\s*\(|for\s*\(|while\s*\(|[{}]|</?\w+[^>]*>|\$ )"
+    r"|[;{}]\s*$"
+)
+
+# Метка на месте вырезанного фрагмента
+PLACEHOLDER = "⟦{}⟧"
+_PLACEHOLDER_RE = re.compile(r"⟦\s*(\d+)\s*⟧")
+
+
+@dataclass
+class MaskedText:
+    """Текст с вырезанными непереводимыми фрагментами"""
+    text: str
+    spans: List[str] = field(default_factory=list)
+
+    @property
+    def has_spans(self) -> bool:
+        return bool(self.spans)
+
+
+def _has_letters(text: str) -> bool:
+    return any(char.isalpha() for char in text)
+
+
+def looks_like_code(text: str) -> bool:
+    """
+    Проверяет, похож ли многострочный текст на программный код
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < 2:
+        return False
+    code_lines = sum(1 for line in lines if _CODE_LINE_RE.search(line))
+    return code_lines / len(lines) >= 0.6
+
+
+def is_untranslatable(text: str) -> bool:
+    """
+    Проверяет, что в тексте нечего переводить:
+    только ссылки, числа, телефоны, эмодзи, знаки препинания или код
+    """
+    if not text or not text.strip():
+        return True
+    if looks_like_code(text):
+        return True
+    return not _has_letters(_MASK_RE.sub(" ", text))
+
+
+def mask(text: str) -> MaskedText:
+    """
+    Заменяет непереводимые фрагменты метками ⟦0⟧, ⟦1⟧, ...
+    """
+    spans: List[str] = []
+
+    def replace(match: re.Match) -> str:
+        spans.append(match.group(0))
+        return PLACEHOLDER.format(len(spans) - 1)
+
+    # Метки из самого текста не должны путаться с нашими
+    if _PLACEHOLDER_RE.search(text):
+        return MaskedText(text)
+    return MaskedText(_MASK_RE.sub(replace, text), spans)
+
+
+def unmask(translated: str, masked: MaskedText) -> Optional[str]:
+    """
+    Возвращает вырезанные фрагменты на место меток
+
+    Returns:
+        Текст с восстановленными фрагментами или None, если метки
+        при переводе потерялись или задвоились
+    """
+    found = [int(index) for index in _PLACEHOLDER_RE.findall(translated)]
+    if sorted(found) != list(range(len(masked.spans))):
+        return None
+    return _PLACEHOLDER_RE.sub(lambda m: masked.spans[int(m.group(1))], translated)
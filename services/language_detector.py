@@ -0,0 +1,269 @@
+"""
+Локальное определение языка текста без обращения к сети
+
+Сначала определяется письменность. Если ею пользуется один язык,
+ответ готов сразу. Иначе текст сравнивается с профилями символьных
+триграмм языков этой письменности.
+"""
+
+import math
+import re
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from services.language_profiles import (
+    ALPHABET_EXTRAS,
+    LANGUAGE_SAMPLES,
+    SCRIPT_LANGUAGES,
+    SCRIPT_RANGES,
+)
+
+# Анализируется только начало текста, этого достаточно для уверенного ответа
+MAX_SAMPLE_CHARS = 300
+# Количество триграмм текста, после которого доказательств считается достаточно
+FULL_EVIDENCE_TRIGRAMS = 12
+# Сколько самых частых триграмм языка входит в его профиль
+PROFILE_SIZE = 400
+# Бонус за совпадение целого частотного слова
+WORD_BONUS = 2.0
+# Бонус и штраф за особую букву, которая есть или отсутствует в алфавите языка
+LETTER_BONUS = 3.0
+LETTER_PENALTY = 6.0
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+# Коды одного языка в разных системах обозначений
+_LANGUAGE_ALIASES = {
+    "iw": "he",
+    "jw": "jv",
+    "zh": "zh-cn",
+    "zh-hans": "zh-cn",
+    "nb": "no",
+    "fil": "tl",
+}
+
+
+def normalize_language_code(code: str) -> str:
+    """Приводит код языка к единому виду для сравнения"""
+    code = (code or "").lower().replace("_", "-")
+    return _LANGUAGE_ALIASES.get(code, code)
+
+
+def languages_match(first: str, second: str) -> bool:
+    """Проверяет, обозначают ли два кода один язык"""
+    first, second = normalize_language_code(first), normalize_language_code(second)
+    if first == second:
+        return True
+    # zh-cn и zh-tw - разные варианты, остальные сравниваем по основе кода
+    if first.startswith("zh") or second.startswith("zh"):
+        return False
+    return first.split("-")[0] == second.split("-")[0]
+
+
+@dataclass(frozen=True)
+class Detection:
+    """Результат определения языка"""
+    lang: str          # Код языка или "auto", если определить не удалось
+    confidence: float  # Уверенность от 0 до 1
+    script: str = ""   # Основная письменность текста
+    letters: int = 0   # Сколько букв этой письменности в анализируемом начале текста
+
+
+UNKNOWN = Detection("auto", 0.0)
+
+
+def is_reliable(detection: Detection, min_confidence: float, min_letters: int) -> bool:
+    """
+    Проверяет, можно ли доверять определению языка
+
+    Язык своей письменности (греческий, корейский) узнаётся по первой же
+    букве. Языки общей письменности по нескольким буквам путаются
+    (русский, украинский и болгарский; испанский, каталанский и португальский),
+    поэтому для них нужно не меньше min_letters букв.
+    """
+    if detection.lang == "auto" or detection.confidence < min_confidence:
+        return False
+    return detection.script in SCRIPT_LANGUAGES or detection.letters >= min_letters
+
+
+def _word_trigrams(word: str) -> List[str]:
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class _ScriptModel:
+    """
+    Профили триграмм для языков одной письменности
+    Индекс хранится разреженно: триграмма -> [(номер языка, вес)]
+    """
+
+    def __init__(self, samples: Dict[str, str], alphabet_extras: Dict[str, str]):
+        self.languages: List[str] = list(samples)
+        self.trigram_index: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        self.word_index: Dict[str, Tuple[int, ...]] = {}
+        # Особая буква -> языки, в алфавите которых она есть
+        self.letter_index: Dict[str, Tuple[int, ...]] = {}
+
+        trigram_weights: Dict[str, List[Tuple[int, float]]] = {}
+        word_langs: Dict[str, List[int]] = {}
+        for idx, lang in enumerate(self.languages):
+            words = _WORD_RE.findall(samples[lang].lower())
+            counts = Counter(trigram for word in words for trigram in _word_trigrams(word))
+            ranked = counts.most_common(PROFILE_SIZE)
+            # Вес убывает с рангом триграммы в профиле, одинаково для всех языков
+            for rank, (trigram, _) in enumerate(ranked):
+                weight = math.log(PROFILE_SIZE / (rank + 1)) + 1.0
+                trigram_weights.setdefault(trigram, []).append((idx, weight))
+            for word in set(words):
+                word_langs.setdefault(word, []).append(idx)
+
+        # Триграмма, общая для многих языков, различает их хуже
+        total = len(self.languages)
+        for trigram, weights in trigram_weights.items():
+            specificity = math.log(1 + total / len(weights))
+            self.trigram_index[trigram] = tuple((idx, w * specificity) for idx, w in weights)
+        self._word_bonus: Dict[str, float] = {}
+        for word, langs in word_langs.items():
+            self.word_index[word] = tuple(langs)
+            self._word_bonus[word] = WORD_BONUS * math.log(1 + total / len(langs))
+
+        for letter in set("".join(alphabet_extras.values())):
+            self.letter_index[letter] = tuple(
+                idx for idx, lang in enumerate(self.languages)
+                if letter in alphabet_extras.get(lang, "")
+            )
+
+    def score(self, words: List[str]) -> Tuple[List[float], List[int], int]:
+        """
+        Считает очки каждого языка
+
+        Returns:
+            (очки по языкам, совпавшие триграммы по языкам, количество триграмм текста)
+        """
+        count = len(self.languages)
+        scores = [0.0] * count
+        matched = [0] * count
+        trigram_count = 0
+        penalty = 0.0
+        index_get = self.trigram_index.get
+        letter_get = self.letter_index.get
+        for word in words:
+            for trigram in _word_trigrams(word):
+                trigram_count += 1
+                entries = index_get(trigram)
+                if entries:
+                    for idx, weight in entries:
+                        scores[idx] += weight
+                        matched[idx] += 1
+            langs = self.word_index.get(word)
+            if langs:
+                bonus = self._word_bonus[word]
+                for idx in langs:
+                    scores[idx] += bonus
+            for letter in word:
+                owners = letter_get(letter)
+                if owners is not None:
+                    # Штраф получают все языки, а владельцы буквы его компенсируют
+                    penalty += LETTER_PENALTY
+                    for idx in owners:
+                        scores[idx] += LETTER_BONUS + LETTER_PENALTY
+        if penalty:
+            scores = [score - penalty for score in scores]
+        return scores, matched, trigram_count
+
+
+class LanguageDetector:
+    """
+    Офлайн-определитель языка
+    Профили строятся один раз при создании объекта
+    """
+
+    def __init__(self):
+        self._range_starts = [start for start, _, _ in SCRIPT_RANGES]
+        self._ranges = SCRIPT_RANGES
+        self._script_cache: Dict[str, Optional[str]] = {}
+        self._models = {
+            script: _ScriptModel(samples, ALPHABET_EXTRAS.get(script, {}))
+            for script, samples in LANGUAGE_SAMPLES.items()
+        }
+
+    @property
+    def supported_languages(self) -> List[str]:
+        """Список кодов языков, которые умеет различать детектор"""
+        languages = set(SCRIPT_LANGUAGES.values())
+        for model in self._models.values():
+            languages.update(model.languages)
+        return sorted(languages)
+
+    def _char_script(self, char: str) -> Optional[str]:
+        script = self._script_cache.get(char, False)
+        if script is False:
+            script = None
+            if char.isalpha():
+                code = ord(char)
+                pos = bisect_right(self._range_starts, code) - 1
+                if pos >= 0 and code <= self._ranges[pos][1]:
+                    script = self._ranges[pos][2]
+            self._script_cache[char] = script
+        return script
+
+    def detect(self, text: str) -> Detection:
+        """
+        Определяет язык текста
+
+        Args:
+            text: Текст сообщения
+
+        Returns:
+            Detection с кодом языка и уверенностью
+        """
+        if not text:
+            return UNKNOWN
+
+        sample = text[:MAX_SAMPLE_CHARS]
+        script_counts: Counter = Counter()
+        for char in sample:
+            script = self._char_script(char)
+            if script is not None:
+                script_counts[script] += 1
+        if not script_counts:
+            return UNKNOWN
+
+        letters = sum(script_counts.values())
+        # Японский текст смешивает кану и иероглифы
+        if script_counts.get("kana"):
+            script_counts["kana"] += script_counts.pop("han", 0)
+        script, count = script_counts.most_common(1)[0]
+        share = count / letters
+
+        lang = SCRIPT_LANGUAGES.get(script)
+        if lang is not None:
+            return Detection(lang, round(share, 3), script, count)
+
+        model = self._models.get(script)
+        if model is None:
+            return Detection("auto", 0.0, script)
+
+        words = [
+            word for word in _WORD_RE.findall(sample.lower())
+            if self._char_script(word[0]) == script
+        ]
+        scores, matched, trigram_count = model.score(words)
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        best_idx = ranked[0]
+        best = scores[best_idx]
+        if best <= 0 or trigram_count == 0:
+            return Detection("auto", 0.0, script)
+
+        second = max(scores[ranked[1]], 0.0) if len(ranked) > 1 else 0.0
+        margin = (best - second) / best
+        evidence = min(1.0, trigram_count / FULL_EVIDENCE_TRIGRAMS)
+        coverage = matched[best_idx] / trigram_count
+        confidence = share * evidence * min(1.0, 0.5 + margin * 2) * min(1.0, 0.4 + coverage)
+        return Detection(model.languages[best_idx], round(confidence, 3), script, count)
+
+
+# Общий экземпляр детектора
+language_detector = LanguageDetector()
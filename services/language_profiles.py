@@ -0,0 +1,308 @@
+"""
+Данные для локального определения языка
+
+SCRIPT_LANGUAGES - письменности, однозначно задающие язык
+LANGUAGE_SAMPLES - частотные слова языков, делящих одну письменность;
+из них при импорте строятся профили символьных триграмм
+"""
+
+# Письменность -> язык для письменностей, которыми пользуется один язык
+SCRIPT_LANGUAGES = {
+    "greek": "el",
+    "armenian": "hy",
+    "hebrew": "he",
+    "thai": "th",
+    "lao": "lo",
+    "khmer": "km",
+    "hangul": "ko",
+    "kana": "ja",
+    "han": "zh-cn",
+    "myanmar": "my",
+    "sinhala": "si",
+    "tamil": "ta",
+    "telugu": "te",
+    "kannada": "kn",
+    "malayalam": "ml",
+    "gujarati": "gu",
+    "gurmukhi": "pa",
+    "bengali": "bn",
+    "oriya": "or",
+    "georgian": "ka",
+    "ethiopic": "am",
+}
+
+# Диапазоны кодов символов (начало, конец включительно, письменность)
+SCRIPT_RANGES = [
+    (0x0041, 0x005A, "latin"),
+    (0x0061, 0x007A, "latin"),
+    (0x00C0, 0x024F, "latin"),
+    (0x0370, 0x03FF, "greek"),
+    (0x0400, 0x052F, "cyrillic"),
+    (0x0531, 0x058F, "armenian"),
+    (0x0590, 0x05FF, "hebrew"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0750, 0x077F, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x0980, 0x09FF, "bengali"),
+    (0x0A00, 0x0A7F, "gurmukhi"),
+    (0x0A80, 0x0AFF, "gujarati"),
+    (0x0B00, 0x0B7F, "oriya"),
+    (0x0B80, 0x0BFF, "tamil"),
+    (0x0C00, 0x0C7F, "telugu"),
+    (0x0C80, 0x0CFF, "kannada"),
+    (0x0D00, 0x0D7F, "malayalam"),
+    (0x0D80, 0x0DFF, "sinhala"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x0E80, 0x0EFF, "lao"),
+    (0x1000, 0x109F, "myanmar"),
+    (0x10A0, 0x10FF, "georgian"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x1200, 0x137F, "ethiopic"),
+    (0x1780, 0x17FF, "khmer"),
+    (0x1C90, 0x1CBF, "georgian"),
+    (0x1E00, 0x1EFF, "latin"),
+    (0x1F00, 0x1FFF, "greek"),
+    (0x3040, 0x309F, "kana"),
+    (0x30A0, 0x30FF, "kana"),
+    (0x3130, 0x318F, "hangul"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+    (0xF900, 0xFAFF, "han"),
+    (0xFB50, 0xFDFF, "arabic"),
+    (0xFE70, 0xFEFF, "arabic"),
+]
+
+# Частотные слова языков по письменностям
+LANGUAGE_SAMPLES = {
+    "latin": {
+        "en": "the of and to in is it you that he was for on are with as his they be at one have this from "
+              "or had by not but what all were we when your can said there an each which she do how their if "
+              "will up other about out many then them these so some her would make like him into time has look "
+              "two more write go see no way could people my than first been who its now find long down day did "
+              "get come made may part hello thanks thank please good morning yes where why",
+        "de": "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden "
+              "aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war haben nur "
+              "oder aber vor zur bis mehr durch man sein wurde sei ich du wir ihr mich dich uns euch hallo danke "
+              "bitte gut ja nein schön heute guten morgen tag wo warum wie geht's",
+        "fr": "le la les de des un une et à il elle ne je son que se qui ce dans en du au pour pas vous par sur "
+              "faire plus dire me on mon lui nous comme mais avec tout aller voir bien où sans tu ou leur si deux "
+              "moi te quand est sont c'est très être avoir aussi encore rien petit notre votre bonjour merci "
+              "oui non pourquoi comment ça va",
+        "es": "de la que el en y a los del se las por un para con no una su al lo como más pero sus le ya o este "
+              "sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante "
+              "todos uno les ni otros ese eso ante ellos esto mí antes algunos qué unos yo otro él tanto esa "
+              "estos mucho nada cual poco ella estar algo nosotros hola gracias buenos días está es son tengo "
+              "dónde cómo",
+        "it": "di e il la che è per un in non a del una le si sono con da mi ho ma lo io ti come questo cosa se "
+              "al della ci dei anche più gli nel alla sei perché ha tu lei lui noi voi loro ciao grazie "
+              "buongiorno molto bene sempre quando dove quello essere fare sì",
+        "pt": "de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele das "
+              "tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre era "
+              "depois sem mesmo aos ter seus quem nas me esse eles estão você tinha foram essa nem suas meu "
+              "minha têm numa elas havia seja qual será nós tenho lhe olá obrigado obrigada bom dia sim",
+        "nl": "de en van ik te dat die in een hij het niet zijn is was op aan met als voor had er maar om hem dan "
+              "zou of wat mijn men dit zo door over ze zich bij ook tot je mij uit daar haar naar heb hoe heeft "
+              "hebben deze u want nog zal zij nu geen omdat iets worden toch al waren veel meer doen toen moet "
+              "ben zonder kan hun dus alles onder ja hier wie werd altijd wordt kunnen ons tegen hallo dank "
+              "goedemorgen",
+        "sv": "och det att i en jag hon som han på den med var sig för så till är men ett om hade de av mig du "
+              "henne då sin nu har inte hans honom skulle hennes där min man vid kunde något från ut när efter "
+              "upp vi dem vara vad över än dig kan sina här ha mot alla under någon eller allt mycket sedan "
+              "denna själv detta utan varit hur ingen mitt ni bli blev oss din dessa några deras blir mina "
+              "varför vem hej tack god morgon",
+        "da": "og i jeg det at en den til er som på de med han af for ikke der var mig sig men et har om vi min "
+              "havde ham hun nu over da fra du ud sin dem os op man hans hvor eller hvad skal selv her alle vil "
+              "blev kunne ind når være dog noget ville jo deres efter ned skulle denne end dette mit også under "
+              "have dig anden hende mine alt meget sit sine mod disse hvis din nogle hos blive mange bliver "
+              "hendes været hej tak godmorgen",
+        "no": "og i jeg det at en et den til er som på de med han av ikke der så var meg seg men har om vi min "
+              "mitt ha hadde hun nå over da ved fra du ut sin dem oss opp man kan hans hvor eller hva skal selv "
+              "her alle vil bli ble kunne inn når være kom noen noe ville dere deres etter ned skulle denne for "
+              "deg sine sitt mot å hvorfor dette disse uten hvordan ingen din ditt blir også hei takk god morgen",
+        "fi": "olla olen on olemme ovat oli ja että ei se hän mutta tämä kun niin kuin jos mitä minä sinä me te "
+              "he hänen sen siitä sitä myös vain jo vielä nyt kaikki tai sitten koska joka mikä missä miten "
+              "miksi ole ollut olisi voi voisi kanssa ennen jälkeen paljon hyvä kiitos hei moi päivää huomenta "
+              "tänään kyllä haluan haluaisin tilata voin voit voimme meidän teidän heidän minun sinun tämän "
+              "tuon",
+        "et": "ja on ei et see ta ma sa me te nad oli olema kui aga või siis kes mis mida miks kus kuidas ka "
+              "veel juba nüüd kõik seda selle oma tema minu sinu meie teie nende üks kaks tere aitäh palun hea "
+              "päev jah",
+        "pl": "i w nie na się z do że to jest a o jak ale co tak za od po już czy jego tylko jej by ich może był "
+              "dla są tym jeszcze mnie być ten przez ma bardzo gdy mi go tu który która które też ty ja my wy "
+              "oni dzień dobry dziękuję cześć proszę wszystko teraz kiedy gdzie dlaczego",
+        "cs": "a se na je že v to s z do o ve jsem jako ale si by k pro jsou tak od po jeho už jen není jak co "
+              "být ten když byl bylo které který která jsme mi mě tě ty já my vy oni dobrý den děkuji ahoj "
+              "prosím všechno teď kde proč také",
+        "sk": "a sa na je že v to s z do o ako ale si by k pre sú tak od po jeho už len nie čo byť ten keď bol "
+              "bolo ktoré ktorý ktorá sme mi ma ťa ty ja my vy oni dobrý deň ďakujem ahoj prosím všetko teraz "
+              "kde prečo tiež",
+        "sl": "in je na se da v za z pa so to ki ne bi ali kot tudi po od do sem si smo ste jaz ti mi vi oni bil "
+              "bila biti še že samo kaj kje kako zakaj zdaj dober dan hvala prosim živjo",
+        "hr": "i je u se na da su za od a ne s o što to kao ali iz sam smo ste ja ti mi vi oni bio bila biti još "
+              "već samo kako gdje zašto sada dobar dan hvala molim bok ovo ono koji koja koje",
+        "ro": "și de la în nu a să cu o pe un că se din este mai sunt am ce sau dar care fost eu tu el ea noi "
+              "voi ei pentru cum unde când acum foarte bine bună ziua mulțumesc salut da această acest",
+        "hu": "a az és hogy nem is egy meg van ez de csak már volt mint el ki még mi ha vagy most azt sem minden "
+              "én te ő ti ők nagyon jó napot köszönöm szia igen hol mikor miért hogyan lesz lett kell",
+        "tr": "ve bir bu da de için ile ne ben sen o biz siz onlar değil var yok çok daha gibi ama en mi mı mu "
+              "mü olarak kadar sonra şimdi neden nasıl nerede merhaba teşekkür ederim evet hayır günaydın iyi "
+              "güzel her şey istiyorum etmek yapmak olmak gelmek gitmek bugün yarın burada orada hiçbir "
+              "çünkü hangi kim",
+        "az": "və bir bu da də üçün ilə nə mən sən o biz siz onlar deyil var yox çox daha kimi amma ən sonra "
+              "indi niyə necə harada salam təşəkkür edirəm bəli xeyr sabahınız xeyir yaxşı hər şey",
+        "id": "yang dan di ini itu dengan untuk tidak ada dari dalam akan pada juga saya ke karena bisa oleh "
+              "kami kita mereka anda dia apa sudah telah atau seperti jika bagaimana mengapa mana kapan terima "
+              "kasih selamat pagi halo baik ingin mau bisa harus sedang belum hari besok kemarin sini sana "
+              "sesuatu karena apakah",
+        "ms": "yang dan di ini itu dengan untuk tidak ada dari dalam akan pada juga saya ke kerana boleh oleh "
+              "kami kita mereka awak dia apa sudah telah atau seperti jika bagaimana mengapa mana bila terima "
+              "kasih selamat pagi helo baik",
+        "tl": "ang ng sa na at mga ay si ko ako ikaw siya kami tayo sila hindi oo po salamat magandang umaga "
+              "kumusta ito iyan iyon para kung may wala din rin lang pa ba",
+        "vi": "và của là có không một những được trong cho người này với các đã để đến khi tôi bạn anh em "
+              "chúng ta họ rất cũng như thì xin chào cảm ơn vâng gì đâu sao bao giờ",
+        "sq": "dhe të në një që është me për nga nuk i e u se si ka do ai ajo ne ju ata unë ti jam ishte shumë "
+              "mirë përshëndetje faleminderit po jo tani ku kur pse",
+        "lt": "ir yra kad su į iš bet ne tai kaip jo jos aš tu mes jūs jie buvo būti labai taip dabar kur kada "
+              "kodėl ačiū labas rytas sveiki prašau",
+        "lv": "un ir ka ar uz no bet ne tas kā viņš viņa es tu mēs jūs viņi bija būt ļoti jā tagad kur kad "
+              "kāpēc paldies labdien sveiki lūdzu",
+        "ca": "de la i el que a en un per les del no es amb una els com més però al ha seu jo tu ell ella "
+              "nosaltres vosaltres ells molt bé bon dia gràcies hola sí on quan per què també aquest aquesta",
+        "gl": "de a o que e en un para é con non unha os no se na por máis as dos como pero foi ao el das ten "
+              "seu súa ou ser cando moi hai nos xa está eu tamén só ola grazas bo día",
+        "eu": "eta da ez du bat ere bere baina dira zen ditu dute nire zure gure hau hori hura ni zu gu zuek "
+              "haiek oso bai kaixo eskerrik asko egun on non noiz zergatik nola",
+        "af": "die en van het in is nie dat vir op te met wat ek jy hy sy ons julle hulle was sal kan om by nog "
+              "maar ook as hoe hallo dankie goeie môre baie",
+        "sw": "na ya wa kwa ni la za katika hii kuwa si yake hiyo mimi wewe yeye sisi ninyi wao lakini pia sana "
+              "habari asante jambo karibu ndiyo hapana leo nini wapi lini",
+        "ga": "agus an na ar is a le go bhfuil sé sí mé tú muid sibh siad ní tá bhí don ón dia duit raibh "
+              "maith agat conas atá",
+        "cy": "a y yn ac i o ar yr mae ei bod roedd fi ti ni chi nhw ef hi gyda ond hefyd iawn bore da diolch "
+              "helo sut wyt ble pryd pam",
+        "is": "og að í er á það sem ekki var með til um hann hún ég þú við þið þeir en af fyrir eru eða hvað "
+              "hvar hvenær hvers vegna halló takk góðan daginn já nei mjög",
+        "mt": "u il ta li fl ma ġie huwa hija jien int aħna intom huma kien għandu minn għal dan din biss ukoll "
+              "grazzi bonġu iva le kif fejn meta għaliex",
+        "eo": "la kaj de en estas al mi vi li ŝi ni ili ne por kun sed ankaŭ tre saluton dankon bonan tagon jes "
+              "kie kiam kial kiel ĉi tiu",
+        "la": "et in est non ad cum ut quod sed qui quae esse sunt erat ego tu nos vos ille hic haec hoc etiam "
+              "quam enim autem salve gratias ita",
+        "uz": "va bu bir bilan uchun emas bor yo'q juda men sen u biz siz ular ham lekin qanday qayerda qachon "
+              "nima salom rahmat ha kerak edi",
+    },
+    "cyrillic": {
+        "ru": "и в не на я что он с а как это по но из к у она так его же все ты за вы было мы от бы мне то о "
+              "еще ещё они да нет когда уже был для есть привет спасибо пожалуйста здравствуйте хорошо очень "
+              "где почему сейчас этот эта может нужно надо можно хочу хотел была были будет сегодня завтра "
+              "вчера здесь там ничего потому который которая которые находится",
+        "uk": "і в не на я що він з а як це по але до у вона так його же все ти за ви було ми від би мені то "
+              "про ще вони ні коли вже був для є привіт дякую будь ласка добрий день дуже добре де чому зараз "
+              "цей ця може треба можна хочу хотів була були буде сьогодні завтра вчора тут там щось нічого "
+              "тому який яка які знаходиться",
+        "be": "і ў не на я што ён з а як гэта па але да у яна так яго ж усё ты за вы было мы ад бы мне тое пра "
+              "яшчэ яны калі ўжо быў для ёсць прывітанне дзякуй ласка добры дзень вельмі дзе чаму",
+        "bg": "и в не на аз че той с а как това по но от за да е се тя така го все ти вие беше ние би ми то още "
+              "те когато вече има здравей благодаря моля добър ден много добре къде защо сега този тази "
+              "съм си сме сте са бях бих искам може трябва със във към тук там какво кой коя кое всичко нещо "
+              "нищо защото който която които",
+        "sr": "и у не на ја да он са а како то по али од за је се она тако га све ти ви било ми би још они када "
+              "већ био има здраво хвала молим добар дан веома где зашто сада овај ова "
+              "сам смо сте су била бих хоћу може треба овде тамо шта ко нешто ништа зато који која које",
+        "mk": "и во не на јас дека тој со а како тоа по но од за е се таа така го сè ти вие беше ние би ми уште "
+              "тие да кога веќе има здраво благодарам ве молам добар ден многу каде зошто сега "
+              "сум сме сте бев сакам може треба тука таму што кој нешто ништо затоа која кое денес",
+        "kk": "және мен бұл бір да де үшін не ол біз сіз олар емес бар жоқ өте қалай қайда қашан неге сәлем "
+              "рахмет иә жақсы күн",
+        "mn": "ба нь энэ тэр би чи бид та тэд юу хаана хэзээ яагаад сайн байна уу баярлалаа тийм үгүй маш их "
+              "өдөр",
+        "ky": "жана мен бул бир да үчүн эмес ал биз силер алар бар жок абдан кантип кайда качан эмне салам "
+              "рахмат ооба жакшы күн",
+        "tg": "ва дар ба аз ки бо ин он ман ту мо шумо онҳо не ҳа барои чӣ куҷо кай чаро салом ташаккур хуб "
+              "рӯз хеле",
+    },
+    "arabic": {
+        "ar": "في من على إلى أن هذا هذه التي الذي ما لا هو هي كان مع عن كل قد ولا أنا أنت نحن هم مرحبا شكرا "
+              "نعم كيف لماذا أين",
+        "fa": "و در به از که این را با است برای آن یک خود تا می کرد شد ما من تو او شما آنها سلام ممنون بله "
+              "نه خیلی خوب چرا کجا",
+        "ur": "کے میں کی ہے اور سے کو نے کہ یہ ایک پر ہیں تھا وہ آپ ہم شکریہ السلام علیکم جی ہاں نہیں بہت "
+              "اچھا کیوں کہاں",
+        "ps": "د او په چې له دا هغه یو ته کې دی وو زه موږ تاسو دوی مننه سلام هو نه ډېر ښه ولې چېرته",
+    },
+    "devanagari": {
+        "hi": "के है में की और से को एक यह पर ने कि हैं था लिए भी नहीं तो हम आप मैं वह नमस्ते धन्यवाद हाँ "
+              "बहुत अच्छा क्यों कहाँ",
+        "mr": "आणि आहे च्या हे ते ला मी तू आम्ही तुम्ही नाही होते या एक पण काय कुठे कधी नमस्कार धन्यवाद हो "
+              "खूप छान",
+        "ne": "र छ को मा हो यो त्यो एक पनि लागि गर्न म तिमी हामी तपाईं उनीहरू छैन थियो नमस्ते धन्यवाद धेरै "
+              "राम्रो",
+    },
+}
+
+# Буквы сверх общей основы письменности (a-z для латиницы), входящие в алфавит языка
+# Такая буква в тексте добавляет очки языкам, где она есть, и снимает у остальных
+ALPHABET_EXTRAS = {
+    "latin": {
+        "en": "",
+        "de": "äöüß",
+        "fr": "àâæçéèêëîïôœùûüÿ",
+        "es": "áéíñóúü",
+        "it": "àèéìíîòóùú",
+        "pt": "áâãàçéêíóôõú",
+        "nl": "éëïóöü",
+        "sv": "åäöé",
+        "da": "æøåé",
+        "no": "æøåéêóòô",
+        "fi": "äöå",
+        "et": "äõöüšž",
+        "pl": "ąćęłńóśźż",
+        "cs": "áčďéěíňóřšťúůýž",
+        "sk": "áäčďéíĺľňóôŕšťúýž",
+        "sl": "čšž",
+        "hr": "čćđšž",
+        "ro": "ăâîșțşţ",
+        "hu": "áéíóöőúüű",
+        "tr": "çğıöşüâî",
+        "az": "çəğıöşü",
+        "id": "",
+        "ms": "",
+        "tl": "ñ",
+        "vi": "àáâãèéêìíòóôõùúýăđĩũơưạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹ",
+        "sq": "çë",
+        "lt": "ąčęėįšųūž",
+        "lv": "āčēģīķļņšūž",
+        "ca": "àçèéíïòóúü",
+        "gl": "áéíñóú",
+        "eu": "ñ",
+        "af": "êëéèîïôû",
+        "sw": "",
+        "ga": "áéíóú",
+        "cy": "âêîôûŵŷäëïöüáéíóúàèìòù",
+        "is": "áðéíóúýþæö",
+        "mt": "àċèġħìòùż",
+        "eo": "ĉĝĥĵŝŭ",
+        "la": "",
+        "uz": "",
+    },
+    "cyrillic": {
+        "ru": "ёйщъыэюяь",
+        "uk": "ґєіїйщьюя",
+        "be": "ёўійыьэюя",
+        "bg": "йщъьюя",
+        "sr": "ђјљњћџ",
+        "mk": "ѓѕјљњќџ",
+        "kk": "ёйщыьэюяәғқңөұүһі",
+        "ky": "ёйщыьэюяңөү",
+        "mn": "ёйыьэюяөү",
+        "tg": "ёйъэюяғӣқӯҳҷ",
+    },
+    "arabic": {
+        "ar": "ةىيكأإؤئ",
+        "fa": "پچژگکیآ",
+        "ur": "پچژگکیٹڈڑںےھۓ",
+        "ps": "پچژټډړږښګڼۍېکی",
+    },
+}
@@ -0,0 +1,193 @@
+"""
+Каталог поддерживаемых языков
+
+Список языков отдаётся из памяти сразу, без ожидания сети. Устаревший
+список продолжает отдаваться, пока в фоне загружается новый. Ошибка
+загрузки запоминается на время, чтобы не повторять запрос при каждом
+нажатии кнопки. Последний успешный список сохраняется на диск и
+читается при запуске.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from config.settings import LANGUAGES_FAILURE_TTL, LANGUAGES_SNAPSHOT_FILE, LANGUAGES_TTL
+from services.storage_io import run_io, write_json_file
+from utils.logger import logger
+
+
+class LanguagesCatalog:
+    """
+    Кэш списка языков с фоновым обновлением и снимком на диске
+    """
+
+    def __init__(
+        self,
+        fetch_func: Callable[[], Awaitable[Optional[Dict[str, str]]]],
+        fallback: Dict[str, str],
+        ttl: float = LANGUAGES_TTL,
+        failure_ttl: float = LANGUAGES_FAILURE_TTL,
+        snapshot_file: Optional[str] = LANGUAGES_SNAPSHOT_FILE,
+    ):
+        """
+        Args:
+            fetch_func: Корутина загрузки списка из API, возвращает None при ошибке
+            fallback: Базовый набор языков, пока нет ни одного успешного списка
+            ttl: Через сколько секунд список считается устаревшим
+            failure_ttl: Сколько секунд не повторять загрузку после ошибки
+            snapshot_file: Файл снимка списка, None - не сохранять на диск
+        """
+        self.fetch_func = fetch_func
+        self.fallback = fallback
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.snapshot_file = snapshot_file
+
+        self._languages: Optional[Dict[str, str]] = None
+        # Время по часам системы, чтобы возраст снимка переживал перезапуск
+        self._fetched_at = 0.0
+        self._failed_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+        self.refreshes = 0
+        self.failures = 0
+        self.stale_served = 0
+        self.fallback_served = 0
+
+    @property
+    def is_stale(self) -> bool:
+        return self._languages is None or time.time() - self._fetched_at >= self.ttl
+
+    def _in_failure_window(self) -> bool:
+        return self._failed_at is not None and time.time() - self._failed_at < self.failure_ttl
+
+    def get(self) -> Dict[str, str]:
+        """
+        Возвращает список языков без ожидания сети
+        Если список устарел, в фоне запускается его обновление
+        """
+        if self.is_stale:
+            self.refresh_nowait()
+        if self._languages is None:
+            self.fallback_served += 1
+            return self.fallback
+        if self.is_stale:
+            self.stale_served += 1
+        return self._languages
+
+    def refresh_nowait(self) -> None:
+        """Запускает фоновое обновление, если оно ещё не идёт и не было недавней ошибки"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        if self._in_failure_window():
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(self.refresh())
+
+    async def refresh(self) -> bool:
+        """
+        Загружает список языков из API
+
+        Returns:
+            True, если список обновлён
+        """
+        try:
+            languages = await self.fetch_func()
+        except Exception as e:
+            logger.error(f"Неожиданная ошибка при обновлении списка языков: {e}")
+            languages = None
+
+        if not languages:
+            self.failures += 1
+            self._failed_at = time.time()
+            logger.warning(f"Список языков не обновлён, повтор не раньше чем через {self.failure_ttl} с")
+            return False
+
+        self._languages = languages
+        self._fetched_at = time.time()
+        self._failed_at = None
+        self.refreshes += 1
+        logger.info(f"Список языков обновлён: {len(languages)} языков")
+        if self.snapshot_file:
+            await run_io(self._save_snapshot, languages, self._fetched_at)
+        return True
+
+    def load_snapshot(self) -> bool:
+        """
+        Читает снимок списка языков с диска
+
+        Returns:
+            True, если снимок прочитан
+        """
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return False
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            languages = snapshot["languages"]
+            if not isinstance(languages, dict) or not languages:
+                raise ValueError("пустой список языков")
+        except Exception as e:
+            logger.error(f"Не удалось прочитать снимок списка языков: {e}")
+            return False
+        self._languages = languages
+        self._fetched_at = float(snapshot.get("fetched_at", 0))
+        logger.info(f"Список языков загружен из снимка: {len(languages)} языков")
+        return True
+
+    def _save_snapshot(self, languages: Dict[str, str], fetched_at: float) -> None:
+        try:
+            write_json_file(self.snapshot_file, {"fetched_at": fetched_at, "languages": languages})
+        except Exception as e:
+            logger.error(f"Не удалось сохранить снимок списка языков: {e}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            if self._in_failure_window():
+                delay = self._failed_at + self.failure_ttl - time.time()
+            elif self._languages is None:
+                delay = 0
+            else:
+                delay = self._fetched_at + self.ttl - time.time()
+            await asyncio.sleep(max(delay, 1.0))
+            if self.is_stale:
+                self.refresh_nowait()
+                if self._refresh_task is not None:
+                    await asyncio.shield(self._refresh_task)
+
+    async def start(self) -> None:
+        """
+        Загружает снимок с диска и запускает периодическое обновление
+        """
+        self.load_snapshot()
+        if self.is_stale:
+            self.refresh_nowait()
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        """Останавливает фоновые задачи"""
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._refresh_task = None
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние каталога"""
+        return {
+            "languages": len(self._languages) if self._languages else 0,
+            "age": round(time.time() - self._fetched_at) if self._languages else None,
+            "stale": self.is_stale,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "stale_served": self.stale_served,
+            "fallback_served": self.fallback_served,
+        }
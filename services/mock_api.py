@@ -0,0 +1,89 @@
+"""
+Локальный фейковый API перевода с интерфейсом ftapi.pythonanywhere.com
+Используется для тестов, бенчмарков и ручной проверки без обращения к реальному сервису
+
+Сбои задаются через app["faults"] прямо во время работы:
+    status - код ответа на каждый запрос перевода (например 503), None - без сбоя
+    reject - тексты, содержащие эту подстроку, отклоняются с кодом 400
+    drop - подстрока, которая пропадает из перевода (например разделитель пачки)
+
+Запуск: python -m services.mock_api --port 8089 --latency 0.05
+"""
+
+import argparse
+import asyncio
+from typing import Optional
+
+from aiohttp import web
+
+MOCK_LANGUAGES = {
+    "en": "English",
+    "ru": "Russian",
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+}
+
+
+def create_app(latency: float = 0.05, max_concurrency: Optional[int] = None) -> web.Application:
+    """
+    Создаёт приложение фейкового API
+
+    Args:
+        latency: Задержка ответа на каждый запрос в секундах
+        max_concurrency: Сколько запросов сервер обрабатывает одновременно (None - без ограничений)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    app = web.Application()
+    app["stats"] = {"requests": 0}
+    app["faults"] = {"status": None, "reject": None, "drop": None}
+
+    async def translate(request: web.Request) -> web.Response:
+        app["stats"]["requests"] += 1
+        text = request.query.get("text", "")
+        if not text:
+            return web.json_response({"error": "text is required"}, status=400)
+
+        faults = app["faults"]
+        if faults["status"] is not None:
+            return web.json_response({"error": "injected failure"}, status=faults["status"])
+        if faults["reject"] and faults["reject"] in text:
+            return web.json_response({"error": "text rejected"}, status=400)
+
+        if semaphore is not None:
+            async with semaphore:
+                await asyncio.sleep(latency)
+        else:
+            await asyncio.sleep(latency)
+
+        # "Перевод" - текст в верхнем регистре, разделители сохраняются
+        translated = text.upper()
+        if faults["drop"]:
+            translated = translated.replace(faults["drop"].upper(), " ")
+        return web.json_response({
+            "source-language": request.query.get("sl", "auto"),
+            "source-text": text,
+            "destination-language": request.query.get("dl", "en"),
+            "destination-text": translated,
+        })
+
+    async def languages(request: web.Request) -> web.Response:
+        return web.json_response(MOCK_LANGUAGES)
+
+    app.router.add_get("/translate", translate)
+    app.router.add_get("/languages", languages)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Фейковый API перевода")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    args = parser.parse_args()
+    web.run_app(create_app(args.latency, args.max_concurrency), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
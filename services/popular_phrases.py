@@ -0,0 +1,127 @@
+"""
+Счётчик популярных фраз для прогрева кэша
+
+Считает, как часто в истории переводов встречаются фразы, которые
+кэш переводов действительно читает. Целый текст, который отдаёт память
+переводов, не считается: память проверяется раньше кэша. Текст из
+нескольких предложений переводится по сегментам, поэтому считаются его
+предложения - они пригодятся, когда встретятся в новом тексте.
+
+Счётчик обновляется вместе с историей, поэтому проходу прогрева
+не нужно перебирать всю историю.
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import MAX_TEXT_LENGTH, PREWARM_ENABLED, SEGMENT_CACHE_ENABLED, SEGMENT_MIN_SENTENCES
+from services.input_classifier import is_untranslatable, mask
+from services.translation_cache import normalize_text
+from services.translation_memory import TranslationMemory, translation_memory
+from utils.text_segmentation import split_sentences, strip_edges
+
+# (нормализованная фраза, целевой язык)
+PhraseKey = Tuple[str, str]
+
+
+class PopularPhrases:
+    """
+    Частоты фраз из истории переводов по пользователям
+    """
+
+    def __init__(
+        self,
+        memory: Optional[TranslationMemory] = translation_memory,
+        min_sentences: Optional[int] = SEGMENT_MIN_SENTENCES if SEGMENT_CACHE_ENABLED else None,
+        max_text_length: int = MAX_TEXT_LENGTH,
+    ):
+        """
+        Args:
+            memory: Память переводов; тексты, которые она отдаёт, не считаются
+            min_sentences: С какого числа предложений текст переводится по сегментам,
+                None если кэш предложений отключён
+            max_text_length: Фразы длиннее переводятся по фрагментам и не считаются
+        """
+        self.memory = memory
+        self.min_sentences = min_sentences
+        self.max_text_length = max_text_length
+        self._counts: Counter = Counter()
+        self._originals: Dict[PhraseKey, str] = {}
+        # Пользователь -> его вклад в счётчик, чтобы забыть его при очистке истории
+        self._by_user: Dict[str, Counter] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def phrases(self, text: str) -> List[str]:
+        """
+        Возвращает фразы текста, перевод которых кэш читает отдельной записью
+        """
+        if is_untranslatable(text) or mask(text).has_spans:
+            return []
+        cores = [core for _, core, _ in (strip_edges(piece) for piece in split_sentences(text)) if core]
+        if self.min_sentences is not None and len(cores) >= self.min_sentences:
+            # Такой текст переводится по предложениям, каждое ищется в кэше отдельно
+            return [core for core in dict.fromkeys(cores) if len(core) <= self.max_text_length]
+        if self.memory is not None and len(text) <= self.memory.max_text_length:
+            # Повтор целого текста отдаёт память переводов
+            return []
+        text = text.strip()
+        return [text] if text and len(text) <= self.max_text_length else []
+
+    def _phrases_of(self, record: Dict) -> Dict[PhraseKey, str]:
+        text, target_lang = record.get("original"), record.get("to_lang")
+        if not text or not target_lang:
+            return {}
+        return {(normalize_text(phrase), target_lang): phrase for phrase in self.phrases(text)}
+
+    def _subtract(self, counts: Counter) -> None:
+        for key, count in counts.items():
+            self._counts[key] -= count
+            if self._counts[key] <= 0:
+                del self._counts[key]
+                self._originals.pop(key, None)
+
+    def add(self, user_id, record: Dict) -> None:
+        """Учитывает новую запись истории"""
+        phrases = self._phrases_of(record)
+        if phrases:
+            for key, phrase in phrases.items():
+                self._originals.setdefault(key, phrase)
+            self._counts.update(phrases.keys())
+            self._by_user.setdefault(str(user_id), Counter()).update(phrases.keys())
+
+    def discard(self, user_id, record: Dict) -> None:
+        """Забывает запись, вытесненную из истории пользователя"""
+        user_counts = self._by_user.get(str(user_id))
+        if user_counts is None:
+            return
+        removed = Counter(key for key in self._phrases_of(record) if user_counts[key] > 0)
+        user_counts.subtract(removed)
+        self._subtract(removed)
+
+    def remove_user(self, user_id) -> None:
+        """Забывает всю историю пользователя"""
+        user_counts = self._by_user.pop(str(user_id), None)
+        if user_counts is not None:
+            self._subtract(+user_counts)
+
+    def rebuild(self, history: Dict[str, List[Dict]]) -> None:
+        """Пересчитывает частоты по всей истории {user_id: [записи]}"""
+        self._counts.clear()
+        self._originals.clear()
+        self._by_user.clear()
+        for user_id, records in history.items():
+            for record in records:
+                self.add(user_id, record)
+
+    def top(self, n: int) -> List[Tuple[str, str]]:
+        """
+        Возвращает n самых частых пар (фраза, целевой язык)
+        Повтор фразы одним пользователем считается так же, как у разных
+        """
+        return [(self._originals[key], key[1]) for key, _ in self._counts.most_common(n)]
+
+
+# Частоты фраз для прогрева, None если прогрев отключён в настройках
+popular_phrases: Optional[PopularPhrases] = PopularPhrases() if PREWARM_ENABLED else None
@@ -0,0 +1,166 @@
+"""
+Фоновый прогрев кэша популярными фразами
+
+Самые частые пары (фраза, целевой язык) берутся из счётчика PopularPhrases
+(services/popular_phrases.py), который обновляется вместе с историей. В нём
+только фразы, которые кэш действительно читает: предложения текстов,
+переводимых по сегментам, и тексты, которые не отдаёт память переводов.
+Пока очереди пользователей пусты и нагрузка низкая, недостающие переводы
+заранее кладутся в кэш, а записи, которые скоро истекут, переводятся заново.
+Под нагрузкой новые переводы не запрашиваются, а обновляются только записи,
+которые иначе истекли бы до следующего прохода.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+from config.settings import (
+    PREWARM_ENABLED,
+    PREWARM_INTERVAL,
+    PREWARM_QUIET_RPM,
+    PREWARM_REFRESH_BEFORE,
+    PREWARM_TOP_N,
+)
+from services.api_client import refresh_translation
+from services.popular_phrases import PopularPhrases, popular_phrases
+from services.scheduler import PRIORITY_INLINE, PRIORITY_INTERACTIVE, TranslationScheduler, translation_scheduler
+from utils.logger import logger
+
+# (text, sl, dl, refresh_before, fill_missing=...) -> True: запрошен у API, False: запрос не нужен, None: ошибка
+RefreshFunc = Callable[..., Awaitable[Optional[bool]]]
+
+# Классы приоритета, по которым судим о нагрузке от пользователей
+_USER_PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_INLINE)
+
+
+class CachePrewarmer:
+    """
+    Периодически прогревает кэш переводов самыми частыми фразами из истории
+    """
+
+    def __init__(
+        self,
+        phrases: PopularPhrases,
+        refresh_func: RefreshFunc,
+        scheduler: TranslationScheduler,
+        top_n: int = PREWARM_TOP_N,
+        interval: float = PREWARM_INTERVAL,
+        quiet_rpm: float = PREWARM_QUIET_RPM,
+        refresh_before: float = PREWARM_REFRESH_BEFORE,
+    ):
+        """
+        Args:
+            phrases: Счётчик фраз из истории
+            refresh_func: Функция прогрева одной фразы
+            scheduler: Планировщик, по очередям которого оценивается нагрузка
+            top_n: Сколько самых частых фраз держать в кэше
+            interval: Пауза между проходами в секундах
+            quiet_rpm: При скольких переводах в минуту и меньше нагрузка считается низкой
+            refresh_before: Запись, истекающая раньше чем через столько секунд, обновляется
+        """
+        self.phrases = phrases
+        self.refresh_func = refresh_func
+        self.scheduler = scheduler
+        self.top_n = top_n
+        self.interval = interval
+        self.quiet_rpm = quiet_rpm
+        self.refresh_before = refresh_before
+
+        self._task: Optional[asyncio.Task] = None
+        self._last_completed: Optional[int] = None
+
+        self.runs = 0
+        self.busy_runs = 0
+        self.fetched = 0
+        self.failed = 0
+        self.candidates = 0
+
+    def _user_queues_idle(self) -> bool:
+        """Переводы пользователей не ждут в очереди и не выполняются"""
+        stats = self.scheduler.get_stats()
+        return all(
+            stats[priority]["queued"] == 0 and stats[priority]["running"] == 0
+            for priority in _USER_PRIORITIES
+        )
+
+    def _is_quiet(self) -> bool:
+        """Нагрузка низкая: очереди пусты и переводов с прошлого прохода было мало"""
+        stats = self.scheduler.get_stats()
+        queued = sum(stats[priority]["queued"] for priority in _USER_PRIORITIES)
+        completed = sum(stats[priority]["completed"] for priority in _USER_PRIORITIES)
+        previous, self._last_completed = self._last_completed, completed
+        if previous is None:
+            # Первый проход после запуска: о нагрузке судим только по очередям
+            return queued == 0
+        rate_per_minute = (completed - previous) / self.interval * 60
+        return queued == 0 and rate_per_minute <= self.quiet_rpm
+
+    async def run_once(self) -> None:
+        """Один проход прогрева"""
+        quiet = self._is_quiet()
+        # Под нагрузкой обновляем только то, что истечёт до следующего прохода
+        refresh_before = self.refresh_before if quiet else min(self.refresh_before, self.interval * 2)
+
+        pairs = self.phrases.top(self.top_n)
+        self.candidates = len(pairs)
+        self.runs += 1
+        if not quiet:
+            self.busy_runs += 1
+
+        fetched = failed = 0
+        for text, target_lang in pairs:
+            # Недостающие переводы запрашиваем, только пока пользователи ничего не ждут
+            fill_missing = quiet and self._user_queues_idle()
+            # Запросы идут по одному, чтобы прогрев не занимал несколько воркеров
+            status = await self.refresh_func(text, "auto", target_lang, refresh_before, fill_missing=fill_missing)
+            if status is None:
+                failed += 1
+            elif status:
+                fetched += 1
+        self.fetched += fetched
+        self.failed += failed
+        if fetched or failed:
+            logger.info(
+                f"Прогрев кэша ({'низкая' if quiet else 'высокая'} нагрузка): "
+                f"{len(pairs)} фраз, запрошено {fetched}, ошибок {failed}"
+            )
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Ошибка прогрева кэша: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Запускает периодический прогрев"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def close(self) -> None:
+        """Останавливает прогрев"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_stats(self) -> Dict:
+        """Возвращает статистику прогрева"""
+        return {
+            "runs": self.runs,
+            "busy_runs": self.busy_runs,
+            "candidates": self.candidates,
+            "fetched": self.fetched,
+            "failed": self.failed,
+        }
+
+
+# Общий прогрев кэша, None если он отключён в настройках
+cache_prewarmer: Optional[CachePrewarmer] = (
+    CachePrewarmer(popular_phrases, refresh_translation, translation_scheduler)
+    if PREWARM_ENABLED else None
+)
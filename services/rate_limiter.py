@@ -0,0 +1,134 @@
+"""
+Ограничение частоты исходящих запросов (token bucket)
+
+Ведро пополняется жетонами со скоростью rate в секунду и вмещает
+не больше burst жетонов. Каждый запрос к API забирает один жетон,
+а при пустом ведре ждёт. Ожидающие обслуживаются строго по очереди.
+
+После ответа 429 скорость снижается вдвое, а ведро закрывается
+на время из Retry-After. Успешные ответы постепенно возвращают
+скорость к настроенной.
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from config.settings import RATE_LIMIT_BURST, RATE_LIMIT_RPS
+from utils.logger import logger
+
+
+class TokenBucket:
+    """
+    Общее для всех пользователей ведро жетонов с очередью ожидания
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_RPS,
+        burst: int = RATE_LIMIT_BURST,
+        min_rate_fraction: float = 0.05,
+        recovery_fraction: float = 0.02,
+    ):
+        """
+        Args:
+            rate: Запросов в секунду, 0 - без ограничения
+            burst: Сколько запросов можно отправить подряд без пауз
+            min_rate_fraction: Ниже какой доли от rate скорость не опускается после 429
+            recovery_fraction: На какую долю от rate скорость растёт после успешного ответа
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = rate * min_rate_fraction
+        self.recovery_step = rate * recovery_fraction
+
+        self._tokens = float(self.burst)
+        self._updated_at: Optional[float] = None
+        self._blocked_until = 0.0
+        # asyncio.Lock отдаёт управление ожидающим в порядке очереди
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+
+        self.throttled = 0
+        self.rate_limited = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rate > 0
+
+    def _refill(self, now: float) -> None:
+        if self._updated_at is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _wait_time(self, now: float) -> float:
+        """Через сколько секунд появится жетон"""
+        self._refill(now)
+        wait = max(0.0, self._blocked_until - now)
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self.rate)
+        return wait
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Забирает жетон, дожидаясь своей очереди
+
+        Args:
+            timeout: Сколько секунд можно ждать, None - без ограничения
+
+        Returns:
+            True, если жетон получен. False, если ждать пришлось бы дольше timeout
+        """
+        if not self.enabled:
+            return True
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        self._waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = loop.time()
+                    wait = self._wait_time(now)
+                    if wait <= 0:
+                        self._tokens -= 1
+                        return True
+                    # Ждать дольше срока бессмысленно - отказываем сразу
+                    if deadline is not None and now + wait > deadline:
+                        self.rejected += 1
+                        return False
+                    self.throttled += 1
+                    await asyncio.sleep(wait)
+        finally:
+            self._waiting -= 1
+
+    def on_success(self) -> None:
+        """Успешный ответ API: скорость понемногу возвращается к настроенной"""
+        if self.enabled and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """
+        Ответ 429: снижаем скорость и закрываем ведро на время Retry-After
+        """
+        if not self.enabled:
+            return
+        self.rate_limited += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0.0
+        now = asyncio.get_running_loop().time()
+        self._updated_at = now
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+        logger.warning(f"API ограничил частоту запросов, новая скорость: {self.rate:.2f} запросов/с")
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние ведра"""
+        return {
+            "rate": round(self.rate, 2) if self.enabled else None,
+            "waiting": self._waiting,
+            "throttled": self.throttled,
+            "rate_limited": self.rate_limited,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,253 @@
+"""
+Защита API перевода от перегрузки
+
+CircuitBreaker перестаёт пускать запросы к API после серии ошибок
+и через некоторое время пробует снова. AdaptiveConcurrencyLimiter
+ограничивает число одновременных запросов и подстраивает лимит
+по принципу AIMD: медленно растёт при успехах и вдвое падает при ошибках.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from config.settings import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN_MAX_CALLS,
+    CIRCUIT_RECOVERY_TIMEOUT,
+    CONCURRENCY_INITIAL_LIMIT,
+    CONCURRENCY_MAX_LIMIT,
+    CONCURRENCY_MAX_WAITING,
+    CONCURRENCY_MIN_LIMIT,
+)
+from utils.logger import logger
+
+# Состояния автоматического выключателя
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель запросов к API
+
+    closed - запросы идут, считаются ошибки подряд
+    open - запросы отклоняются сразу, без обращения к сети
+    half_open - пропускается несколько пробных запросов
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT,
+        half_open_max_calls: int = CIRCUIT_HALF_OPEN_MAX_CALLS,
+    ):
+        """
+        Args:
+            failure_threshold: Сколько ошибок подряд размыкает выключатель
+            recovery_timeout: Через сколько секунд после размыкания пробовать снова
+            half_open_max_calls: Сколько пробных запросов пропускать одновременно
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние с учётом истёкшего времени восстановления"""
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = STATE_HALF_OPEN
+            self._probes = 0
+            logger.info("Выключатель API перевода перешёл в режим пробных запросов")
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Проверяет без побочных эффектов, отклоняются ли сейчас все запросы"""
+        # Переход в режим пробных запросов выполняет state, здесь только чтение
+        return (self._state == STATE_OPEN
+                and time.monotonic() - self._opened_at < self.recovery_timeout)
+
+    def allow_request(self) -> bool:
+        """
+        Решает, можно ли отправить запрос
+
+        Returns:
+            True, если запрос можно отправить. После него обязателен
+            вызов record_success, record_failure или record_ignored
+        """
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Отмечает успешный ответ API"""
+        if self._state == STATE_HALF_OPEN:
+            logger.info("API перевода восстановился, выключатель замкнут")
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        """Отмечает ошибку API"""
+        self._consecutive_failures += 1
+        if self._state == STATE_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_ignored(self) -> None:
+        """Отмечает запрос, который не дал сведений о здоровье API"""
+        if self._state == STATE_HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _open(self) -> None:
+        if self._state != STATE_OPEN:
+            self.times_opened += 1
+            logger.warning(
+                f"API перевода недоступен ({self._consecutive_failures} ошибок подряд), "
+                f"запросы отклоняются {self.recovery_timeout} с"
+            )
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние выключателя"""
+        state = self.state
+        retry_in = None
+        if state == STATE_OPEN:
+            retry_in = round(self.recovery_timeout - (time.monotonic() - self._opened_at), 1)
+        return {
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": retry_in,
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Ограничитель одновременных запросов с адаптивным лимитом (AIMD)
+
+    Каждый успешный ответ увеличивает лимит на 1/лимит, то есть примерно
+    на единицу за каждый полный лимит успешных запросов. Ошибка, таймаут
+    или 429 уменьшают лимит вдвое. Ожидающие запросы обслуживаются по
+    очереди, а при слишком длинной очереди новые отклоняются сразу.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = CONCURRENCY_INITIAL_LIMIT,
+        min_limit: int = CONCURRENCY_MIN_LIMIT,
+        max_limit: int = CONCURRENCY_MAX_LIMIT,
+        max_waiting: int = CONCURRENCY_MAX_WAITING,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        Args:
+            initial_limit: Начальный лимит одновременных запросов
+            min_limit: Нижняя граница лимита
+            max_limit: Верхняя граница лимита
+            max_waiting: Максимальная длина очереди ожидания
+            decrease_factor: Во сколько раз умножается лимит при ошибке
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_waiting = max_waiting
+        self.decrease_factor = decrease_factor
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Уменьшаем лимит не чаще одного раза за «поколение» запросов,
+        # иначе пачка одновременных ошибок обнулит его
+        self._generation = 0
+
+        self.rejected = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self) -> Optional[int]:
+        """
+        Занимает место для запроса, при необходимости дожидаясь очереди
+
+        Returns:
+            Номер поколения для передачи в release или None,
+            если очередь переполнена и запрос отклонён
+        """
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return self._generation
+
+        if len(self._waiters) >= self.max_waiting:
+            self.rejected += 1
+            return None
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Место уже было передано нам, возвращаем его следующему
+                self._in_flight -= 1
+                self._wake_waiters()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        return self._generation
+
+    def release(self, generation: int, success: Optional[bool]) -> None:
+        """
+        Освобождает место и подстраивает лимит
+
+        Args:
+            generation: Значение, полученное из acquire
+            success: True - успешный ответ, False - перегрузка или ошибка API,
+                None - запрос не говорит о нагрузке на API
+        """
+        self._in_flight -= 1
+        if success is True:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        elif success is False and generation == self._generation:
+            self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+            self._generation += 1
+            self.decreases += 1
+            logger.info(f"Лимит одновременных запросов к API снижен до {self.limit}")
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def get_stats(self) -> Dict:
+        """Возвращает состояние ограничителя"""
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "rejected": self.rejected,
+            "decreases": self.decreases,
+        }
+
@@ -0,0 +1,211 @@
+"""
+Планировщик задач перевода с приоритетами
+
+Задачи выполняет ограниченный пул воркеров. Свободный воркер берёт
+задачу из самого приоритетного класса, у которого не исчерпан
+собственный лимит одновременных задач. Так сообщения из чата
+не ждут за массовой и фоновой работой.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from config.settings import (
+    SCHEDULER_BACKGROUND_LIMIT,
+    SCHEDULER_BULK_LIMIT,
+    SCHEDULER_INLINE_LIMIT,
+    SCHEDULER_WORKERS,
+)
+from utils.logger import logger
+
+# Классы приоритета, от самого срочного
+PRIORITY_INTERACTIVE = "interactive"  # Сообщения в чате
+PRIORITY_INLINE = "inline"            # Inline-запросы
+PRIORITY_BULK = "bulk"                # Массовые переводы
+PRIORITY_BACKGROUND = "background"    # Фоновые задачи, например прогрев кэша
+
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_INLINE, PRIORITY_BULK, PRIORITY_BACKGROUND)
+
+
+@dataclass
+class _Job:
+    factory: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float
+    expires_at: Optional[float]
+
+
+class _ClassStats:
+    def __init__(self):
+        self.running = 0
+        self.completed = 0
+        self.expired = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+
+
+class TranslationScheduler:
+    """
+    Пул воркеров с очередями по классам приоритета
+    Пока пул не запущен, задачи выполняются сразу, без очереди
+    """
+
+    def __init__(self, workers: int = SCHEDULER_WORKERS, class_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            workers: Количество воркеров, то есть общий лимит одновременных задач
+            class_limits: Лимит одновременных задач для каждого класса приоритета
+        """
+        self.workers = workers
+        self.class_limits = {
+            PRIORITY_INTERACTIVE: workers,
+            PRIORITY_INLINE: SCHEDULER_INLINE_LIMIT,
+            PRIORITY_BULK: SCHEDULER_BULK_LIMIT,
+            PRIORITY_BACKGROUND: SCHEDULER_BACKGROUND_LIMIT,
+        }
+        if class_limits:
+            self.class_limits.update(class_limits)
+
+        self._queues: Dict[str, Deque[_Job]] = {priority: deque() for priority in PRIORITIES}
+        self._stats: Dict[str, _ClassStats] = {priority: _ClassStats() for priority in PRIORITIES}
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Condition] = None
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    async def run(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        priority: str = PRIORITY_INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Ставит задачу в очередь своего класса и ждёт результат
+
+        Args:
+            factory: Функция, создающая корутину задачи
+            priority: Класс приоритета
+            timeout: Сколько секунд задача может ждать в очереди
+
+        Raises:
+            asyncio.TimeoutError: Если задача не дождалась воркера за timeout
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Неизвестный класс приоритета: {priority}")
+        if not self.is_running:
+            return await factory()
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        job = _Job(
+            factory=factory,
+            future=loop.create_future(),
+            enqueued_at=now,
+            expires_at=now + timeout if timeout is not None else None,
+        )
+        queue = self._queues[priority]
+        queue.append(job)
+        stats = self._stats[priority]
+        stats.max_depth = max(stats.max_depth, len(queue))
+        async with self._wakeup:
+            self._wakeup.notify()
+
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            # Задача ещё в очереди - убираем её, чтобы воркер не тратил на неё время
+            if job in queue:
+                queue.remove(job)
+            raise
+
+    def _take_job(self):
+        """Возвращает (класс, задача) из самого приоритетного доступного класса"""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            if queue and self._stats[priority].running < self.class_limits[priority]:
+                return priority, queue.popleft()
+        return None, None
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._wakeup:
+                priority, job = self._take_job()
+                while job is None:
+                    await self._wakeup.wait()
+                    priority, job = self._take_job()
+
+            stats = self._stats[priority]
+            if job.future.done():
+                continue
+            now = loop.time()
+            if job.expires_at is not None and now > job.expires_at:
+                stats.expired += 1
+                job.future.set_exception(asyncio.TimeoutError())
+                continue
+
+            stats.total_wait += now - job.enqueued_at
+            stats.running += 1
+            try:
+                result = await job.factory()
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                stats.running -= 1
+                stats.completed += 1
+                # Освободился слот класса - ожидающие задачи этого класса могут пойти
+                async with self._wakeup:
+                    self._wakeup.notify_all()
+
+    async def start(self) -> None:
+        """Запускает воркеры"""
+        if self.is_running:
+            return
+        self._wakeup = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Планировщик переводов запущен: {self.workers} воркеров, лимиты {self.class_limits}")
+
+    async def close(self) -> None:
+        """Останавливает воркеры и отменяет задачи, оставшиеся в очереди"""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for queue in self._queues.values():
+            while queue:
+                job = queue.popleft()
+                if not job.future.done():
+                    job.future.cancel()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает глубину очередей и нагрузку по классам приоритета"""
+        result = {}
+        for priority in PRIORITIES:
+            stats = self._stats[priority]
+            started = stats.completed + stats.running
+            result[priority] = {
+                "queued": len(self._queues[priority]),
+                "running": stats.running,
+                "limit": self.class_limits[priority],
+                "completed": stats.completed,
+                "expired": stats.expired,
+                "max_depth": stats.max_depth,
+                "avg_wait_ms": round(stats.total_wait / started * 1000, 1) if started else 0.0,
+            }
+        return result
+
+
+# Общий планировщик переводов
+translation_scheduler = TranslationScheduler()
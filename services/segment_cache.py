@@ -0,0 +1,161 @@
+"""
+Кэширование перевода по предложениям
+
+Текст из нескольких предложений делится на сегменты, и каждый
+сегмент ищется в кэше отдельно. В API уходят только промахи:
+подряд идущие предложения без перевода объединяются во фрагменты
+до max_chars, а перевод собирается обратно в исходном порядке.
+Если в кэше нет ни одного предложения, текст переводится обычным путём. Так шаблоны,
+подписи и повторяющиеся абзацы переводятся один раз.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from config.settings import CHUNK_CONCURRENCY, MAX_TEXT_LENGTH, SEGMENT_MIN_SENTENCES
+from services.translation_result import TranslationResult
+from utils.logger import logger
+from utils.text_segmentation import split_into_chunks, split_sentences, strip_edges
+
+LookupFunc = Callable[[str, str, str], Awaitable[Optional[str]]]
+TranslateFunc = Callable[[str, str, str], Awaitable[TranslationResult]]
+
+
+class SegmentCache:
+    """
+    Переводит текст по предложениям, используя кэш для каждого из них
+    """
+
+    def __init__(
+        self,
+        lookup_func: LookupFunc,
+        translate_func: TranslateFunc,
+        min_segments: int = SEGMENT_MIN_SENTENCES,
+        concurrency: int = CHUNK_CONCURRENCY,
+        max_chars: int = MAX_TEXT_LENGTH,
+    ):
+        """
+        Args:
+            lookup_func: Поиск перевода сегмента в кэше (text, sl, dl)
+            translate_func: Перевод сегмента, не найденного в кэше (text, sl, dl)
+            min_segments: С какого числа предложений текст делится на сегменты
+            concurrency: Сколько сегментов переводится одновременно
+            max_chars: Максимальная длина фрагмента из подряд идущих промахов
+        """
+        self.lookup_func = lookup_func
+        self.translate_func = translate_func
+        self.min_segments = min_segments
+        self.concurrency = concurrency
+        self.max_chars = max_chars
+
+        self.texts = 0
+        self.bypassed_texts = 0
+        self.fully_cached_texts = 0
+        self.segment_hits = 0
+        self.segment_misses = 0
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> Optional[TranslationResult]:
+        """
+        Переводит текст по сегментам
+
+        Returns:
+            TranslationResult или None, если текст выгоднее перевести целиком:
+            предложений меньше min_segments, ни одно не найдено в кэше
+            или промахи потребовали бы больше запросов, чем перевод целиком
+        """
+        pieces = [strip_edges(piece) for piece in split_sentences(text)]
+        cores: List[str] = [core for _, core, _ in pieces if core]
+        if len(cores) < self.min_segments:
+            return None
+
+        # Повторы внутри одного текста ищем один раз
+        unique = list(dict.fromkeys(cores))
+        translations: Dict[str, str] = {}
+        for core in unique:
+            cached = await self.lookup_func(core, source_lang, target_lang)
+            if cached is not None:
+                translations[core] = cached
+        misses = len(unique) - len(translations)
+
+        # Куски результата: готовый текст или список фрагментов для перевода
+        parts: List[Union[str, List[str]]] = []
+        if misses <= self.concurrency:
+            # Промахов немного - переводим каждое предложение отдельно за один
+            # параллельный проход, чтобы они попали в кэш по одному
+            for leading, core, trailing in pieces:
+                if core and core not in translations:
+                    parts.append([leading + core + trailing])
+                else:
+                    parts.append(leading + translations.get(core, "") + trailing)
+        elif not translations:
+            # Без попаданий деление на предложения только добавит запросов
+            self.bypassed_texts += 1
+            return None
+        else:
+            # Подряд идущие промахи переводятся вместе, фрагментами до max_chars,
+            # а не по одному предложению на запрос
+            runs: List[Union[str, List[str]]] = []
+            for leading, core, trailing in pieces:
+                if core in translations:
+                    runs.append(leading + translations[core] + trailing)
+                elif runs and isinstance(runs[-1], list):
+                    runs[-1].append(leading + core + trailing)
+                elif core:
+                    runs.append([leading + core + trailing])
+                else:
+                    runs.append(leading)
+            parts = [split_into_chunks("".join(run), self.max_chars) if isinstance(run, list) else run for run in runs]
+
+        chunks = list(dict.fromkeys(chunk for part in parts if isinstance(part, list) for chunk in part))
+        if len(chunks) > max(self.concurrency, len(split_into_chunks(text, self.max_chars)) + len(translations)):
+            # Промахи разбросаны по тексту так, что перевод целиком выйдет дешевле
+            self.bypassed_texts += 1
+            return None
+
+        self.texts += 1
+        self.segment_hits += len(translations)
+        self.segment_misses += misses
+        if not chunks:
+            self.fully_cached_texts += 1
+            logger.info(f"Все {len(unique)} сегментов текста найдены в кэше")
+            return TranslationResult("".join(parts).strip())
+
+        logger.info(
+            f"Сегменты в кэше: {len(translations)} из {len(unique)}, "
+            f"остальные переводятся {len(chunks)} запросами"
+        )
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate_chunk(chunk: str) -> TranslationResult:
+            leading, core, trailing = strip_edges(chunk)
+            if not core:
+                return TranslationResult(chunk)
+            async with semaphore:
+                result = await self.translate_func(core, source_lang, target_lang)
+            if not result.ok:
+                return result
+            return TranslationResult(leading + result.text + trailing)
+
+        results = await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks))
+        for result in results:
+            if not result.ok:
+                logger.error("Не удалось перевести один или несколько сегментов текста")
+                return result
+
+        translated = {chunk: result.text for chunk, result in zip(chunks, results)}
+        return TranslationResult("".join(
+            "".join(translated[chunk] for chunk in part) if isinstance(part, list) else part
+            for part in parts
+        ).strip())
+
+    def get_stats(self) -> Dict:
+        """Возвращает долю сегментов, найденных в кэше"""
+        total = self.segment_hits + self.segment_misses
+        return {
+            "texts": self.texts,
+            "bypassed_texts": self.bypassed_texts,
+            "fully_cached_texts": self.fully_cached_texts,
+            "segment_hits": self.segment_hits,
+            "segment_misses": self.segment_misses,
+            "segment_hit_ratio": self.segment_hits / total if total else 0.0,
+        }
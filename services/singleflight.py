@@ -0,0 +1,62 @@
+"""
+Объединение одинаковых одновременных запросов (single-flight)
+Параллельные вызовы с одним ключом ждут один общий запрос
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Держит по одной выполняющейся задаче на каждый ключ
+    Результат или исключение получают все ожидающие вызовы
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0  # Запросов, реально отправленных дальше
+        self.shared = 0   # Вызовов, присоединившихся к уже идущему запросу
+
+    @property
+    def in_flight(self) -> int:
+        """Количество выполняющихся сейчас запросов"""
+        return len(self._flights)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет factory() один раз для всех одновременных вызовов с ключом key
+
+        Args:
+            key: Ключ запроса
+            factory: Функция, создающая корутину запроса
+
+        Returns:
+            Результат общего запроса
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._flights[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+            self.leaders += 1
+        else:
+            self.shared += 1
+
+        # shield: отмена одного ожидающего не отменяет запрос для остальных
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        """Убирает завершённый запрос и помечает его исключение как полученное"""
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Возвращает статистику объединения запросов"""
+        return {
+            "in_flight": self.in_flight,
+            "leaders": self.leaders,
+            "shared": self.shared,
+        }
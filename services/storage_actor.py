@@ -0,0 +1,161 @@
+"""
+Единственный писатель для набора данных хранилища
+
+Актор владеет состоянием в памяти и принимает изменения через очередь.
+Команды применяются строго по порядку в одной корутине, поэтому
+параллельные изменения не затирают друг друга. Все команды, накопившиеся
+в очереди, записываются на диск одной записью файла (групповая фиксация),
+и каждая команда завершается только после того, как её изменение записано.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from config.settings import STORAGE_MAX_BATCH
+from services.storage_io import run_io, write_json
+from utils.logger import logger
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+# Команда получает состояние и изменяет его на месте
+Command = Callable[[Any], Any]
+
+
+class StorageActor(Generic[S]):
+    """
+    Владеет состоянием одного файла и применяет изменения по очереди
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        load: Callable[[], S],
+        snapshot: Callable[[S], Any],
+        max_batch: int = STORAGE_MAX_BATCH,
+    ):
+        """
+        Args:
+            name: Название набора данных для логов и статистики
+            path: Файл, в который записывается состояние
+            load: Загрузка состояния; вызывается один раз, в пуле потоков при start()
+            snapshot: Копия состояния для записи в другом потоке
+            max_batch: Сколько команд фиксируется одной записью файла
+        """
+        self.name = name
+        self.path = path
+        self.load = load
+        self.snapshot = snapshot
+        self.max_batch = max_batch
+        self._state: Optional[S] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.commands = 0
+        self.commits = 0
+        self.commit_errors = 0
+        self.largest_batch = 0
+
+    @property
+    def state(self) -> S:
+        """Текущее состояние; читать можно из любой корутины, изменять - только командами"""
+        if self._state is None:
+            self._state = self.load()
+        return self._state
+
+    async def submit(self, command: Callable[[S], T]) -> T:
+        """
+        Ставит команду в очередь и ждёт, пока её изменение будет записано
+
+        Returns:
+            Результат команды
+
+        Raises:
+            Исключение команды или ошибку записи файла
+        """
+        if self._task is None:
+            # Актор не запущен (скрипты, тесты) - применяем и записываем сразу
+            result = command(self.state)
+            self.commands += 1
+            await self._commit(1)
+            return result
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((command, future))
+        return await future
+
+    async def _commit(self, batch_size: int) -> None:
+        await write_json(self.path, self.snapshot(self.state))
+        self.commits += 1
+        self.largest_batch = max(self.largest_batch, batch_size)
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    # Остановка: сначала фиксируем всё, что пришло до неё
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._apply(batch)
+
+    async def _apply(self, batch: List[Tuple[Command, asyncio.Future]]) -> None:
+        """Применяет пачку команд по порядку и фиксирует её одной записью"""
+        results: List[Tuple[asyncio.Future, Any, Optional[BaseException]]] = []
+        for command, future in batch:
+            try:
+                results.append((future, command(self.state), None))
+            except Exception as e:
+                results.append((future, None, e))
+        self.commands += len(batch)
+
+        commit_error: Optional[BaseException] = None
+        try:
+            await self._commit(len(batch))
+        except Exception as e:
+            # Изменения остаются в памяти и попадут в файл со следующей записью
+            self.commit_errors += 1
+            commit_error = e
+            logger.error(f"Ошибка записи {self.name} в {self.path}: {e}")
+
+        for future, result, error in results:
+            if future.done():
+                continue
+            error = error or commit_error
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def start(self) -> None:
+        """Загружает состояние и запускает обработку очереди"""
+        if self._state is None:
+            self._state = await run_io(self.load)
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Останавливает актор, применив и записав команды, оставшиеся в очереди"""
+        if self._task is None:
+            return
+        # None в очереди - сигнал остановки после уже поставленных команд
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def get_stats(self) -> Dict:
+        """Возвращает статистику актора"""
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "commands": self.commands,
+            "commits": self.commits,
+            "commit_errors": self.commit_errors,
+            "largest_batch": self.largest_batch,
+        }
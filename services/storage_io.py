@@ -0,0 +1,189 @@
+"""
+Асинхронный доступ к файлам хранилища
+
+Чтение, запись и сериализация JSON выполняются в отдельном пуле потоков
+ограниченного размера, поэтому медленный диск не останавливает event loop
+и не занимает потоки, общие с остальным кодом. Запись в один файл идёт
+строго по очереди: у каждого файла своя блокировка. Изменения наборов
+данных упорядочивает StorageActor (services/storage_actor.py).
+
+Запись устойчива к сбоям: данные пишутся во временный файл рядом
+с целевым, сбрасываются на диск и атомарно подменяют его, так что
+после падения на диске остаётся либо старая, либо новая версия.
+Насколько часто вызывается fsync, задаёт STORAGE_FSYNC:
+  always - файл и каталог после каждой записи (переживает отключение питания)
+  file   - только сам файл, без каталога
+  never  - без fsync; атомарная подмена защищает только от падения процесса
+Записи одного файла, ждущие своей очереди, объединяются в одну физическую.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Callable, Dict, List, Optional, TypeVar
+
+from config.settings import STORAGE_FSYNC, STORAGE_IO_WORKERS
+from utils.logger import logger
+
+FSYNC_POLICIES = ("always", "file", "never")
+
+if STORAGE_FSYNC in FSYNC_POLICIES:
+    fsync_policy = STORAGE_FSYNC
+else:
+    logger.error(f"Неизвестная политика fsync '{STORAGE_FSYNC}', используется always")
+    fsync_policy = "always"
+
+T = TypeVar("T")
+
+# Общий пул потоков для файловых операций хранилища
+storage_executor = ThreadPoolExecutor(max_workers=STORAGE_IO_WORKERS, thread_name_prefix="storage")
+
+# Путь к файлу -> блокировка записи в него
+_file_locks: Dict[str, asyncio.Lock] = {}
+
+# Путь к файлу -> [данные, отступ, задача записи] для записи, ещё не начавшейся
+_pending_writes: Dict[str, List] = {}
+
+# Запрошенные и выполненные записи JSON: разница - объединённые записи
+write_stats = {"logical_writes": 0, "physical_writes": 0}
+
+
+def file_lock(path: str) -> asyncio.Lock:
+    """Возвращает блокировку, которая упорядочивает запись в файл"""
+    key = os.path.abspath(path)
+    lock = _file_locks.get(key)
+    if lock is None:
+        lock = _file_locks[key] = asyncio.Lock()
+    return lock
+
+
+async def run_io(func: Callable[..., T], *args) -> T:
+    """Выполняет функцию в пуле потоков хранилища"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(storage_executor, func, *args)
+
+
+def read_json_file(path: str, default: Any) -> Any:
+    """
+    Читает JSON из файла; если файла нет или он пуст, возвращает default
+
+    Raises:
+        json.JSONDecodeError: Если файл повреждён
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read().strip()
+    return json.loads(content) if content else default
+
+
+def sync_file(f: IO) -> None:
+    """Сбрасывает записанное в файл на диск, если это требует политика fsync"""
+    f.flush()
+    if fsync_policy != "never":
+        os.fsync(f.fileno())
+
+
+def _sync_directory(directory: str) -> None:
+    """Сбрасывает на диск запись каталога, чтобы переименование пережило сбой"""
+    if fsync_policy != "always" or os.name == "nt":
+        # В Windows каталог нельзя открыть для fsync
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Записывает файл целиком: временный файл, fsync и атомарная подмена
+
+    При сбое на любом шаге на месте файла остаётся прежняя версия.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            sync_file(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _sync_directory(directory)
+
+
+def quarantine_file(path: str) -> Optional[str]:
+    """
+    Переименовывает повреждённый файл, чтобы следующая запись его не затёрла
+
+    Returns:
+        Новый путь файла или None, если переименовать не удалось
+    """
+    corrupt_path = f"{path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+    try:
+        os.replace(path, corrupt_path)
+    except OSError as e:
+        logger.error(f"Не удалось отложить повреждённый файл {path}: {e}")
+        return None
+    logger.error(f"Файл {path} повреждён и сохранён как {corrupt_path}")
+    return corrupt_path
+
+
+def write_json_file(path: str, data: Any, indent: int = 2) -> None:
+    """Сериализует данные и атомарно записывает их в файл"""
+    content = json.dumps(data, ensure_ascii=False, indent=indent)
+    atomic_write_bytes(path, content.encode("utf-8"))
+
+
+async def read_json(path: str, default: Any) -> Any:
+    """Читает JSON из файла в пуле потоков хранилища"""
+    return await run_io(read_json_file, path, default)
+
+
+async def write_json(path: str, data: Any, indent: int = 2) -> None:
+    """
+    Записывает данные в файл в пуле потоков хранилища
+
+    data - полное содержимое файла, поэтому если запись в этот файл
+    уже ждёт очереди, она просто получает более новые данные, и обе
+    записи завершаются одной физической (групповая фиксация).
+    Сериализация идёт в другом потоке, поэтому data не должна
+    изменяться до конца записи: передавайте снимок состояния.
+    """
+    write_stats["logical_writes"] += 1
+    key = os.path.abspath(path)
+    pending = _pending_writes.get(key)
+    if pending is not None:
+        pending[0], pending[1] = data, indent
+        task = pending[2]
+    else:
+        pending = _pending_writes[key] = [data, indent, None]
+        task = pending[2] = asyncio.get_running_loop().create_task(_write_pending(path, key))
+    # Отмена одного из ждущих не должна отменять общую запись
+    await asyncio.shield(task)
+
+
+async def _write_pending(path: str, key: str) -> None:
+    async with file_lock(path):
+        # С этого момента новые записи ждут следующей очереди
+        data, indent, _ = _pending_writes.pop(key)
+        await run_io(write_json_file, path, data, indent)
+        write_stats["physical_writes"] += 1
+
+
+def shutdown_storage_io() -> None:
+    """Дожидается начатых файловых операций и останавливает пул потоков"""
+    storage_executor.shutdown(wait=True)
@@ -0,0 +1,151 @@
+"""
+In-memory кэш переводов с вытеснением LRU и временем жизни записей
+"""
+
+import sys
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import (
+    TRANSLATION_CACHE_MAX_ENTRIES,
+    TRANSLATION_CACHE_TTL,
+    TRANSLATION_CACHE_MAX_BYTES,
+)
+
+CacheKey = Tuple[str, str, str]
+
+# Примерные накладные расходы на одну запись (кортежи, узел OrderedDict)
+_ENTRY_OVERHEAD = 200
+
+
+def normalize_text(text: str) -> str:
+    """
+    Нормализует текст для ключа кэша: NFC и схлопывание пробелов
+    Регистр не меняется, так как он влияет на перевод
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationCache:
+    """
+    Ограниченный по количеству записей и по памяти LRU-кэш переводов
+    Ключ - (нормализованный текст, исходный язык, целевой язык)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = TRANSLATION_CACHE_MAX_ENTRIES,
+        ttl: float = TRANSLATION_CACHE_TTL,
+        max_bytes: int = TRANSLATION_CACHE_MAX_BYTES,
+    ):
+        """
+        Инициализация кэша
+
+        Args:
+            max_entries: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+            max_bytes: Примерный бюджет памяти в байтах
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> (перевод, время истечения, размер записи)
+        self._data: "OrderedDict[CacheKey, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(text: str, source_lang: str, target_lang: str) -> CacheKey:
+        """Строит ключ кэша"""
+        return (normalize_text(text), source_lang, target_lang)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """
+        Возвращает перевод из кэша или None
+        """
+        key = self.make_key(text, source_lang, target_lang)
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        translated, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return translated
+
+    def expires_in(self, text: str, source_lang: str, target_lang: str) -> Optional[float]:
+        """
+        Возвращает, через сколько секунд истечёт запись, или None, если её нет
+        Не влияет на статистику и порядок вытеснения
+        """
+        entry = self._data.get(self.make_key(text, source_lang, target_lang))
+        if entry is None:
+            return None
+        remaining = entry[1] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def set(self, text: str, source_lang: str, target_lang: str, translated: str, ttl: Optional[float] = None) -> None:
+        """
+        Сохраняет перевод в кэш, вытесняя самые старые записи при переполнении
+        """
+        key = self.make_key(text, source_lang, target_lang)
+        size = sys.getsizeof(key[0]) + sys.getsizeof(translated) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (translated, expires_at, size)
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._data))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        """Удаляет запись и обновляет занятый объём"""
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Полностью очищает кэш"""
+        self._data.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику работы кэша"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+# Общий экземпляр кэша переводов
+translation_cache = TranslationCache()
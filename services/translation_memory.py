@@ -0,0 +1,170 @@
+"""
+Память переводов на основе истории пользователей
+
+Пары (оригинал, перевод) из истории индексируются по нормализованному
+тексту. Повтор текста, отличающийся только регистром, пунктуацией
+или пробелами, находится точным совпадением нормализованного текста.
+
+Нечёткого поиска нет: перевод отдаётся пользователю как есть, а похожий
+текст может значить другое («приду» и «не приду», другое имя, другой
+порядок слов), поэтому чужой перевод для него не годится.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from config.settings import TM_ENABLED, TM_MAX_TEXT_LENGTH
+from utils.logger import logger
+
+# Знаки препинания и символы, которые не влияют на совпадение
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+# (нормализованный текст, целевой язык)
+MemoryKey = Tuple[str, str]
+
+
+def normalize_for_match(text: str) -> str:
+    """
+    Приводит текст к виду для сравнения: NFC, нижний регистр,
+    без пунктуации, с одиночными пробелами
+    """
+    text = unicodedata.normalize("NFC", text).casefold()
+    return " ".join(_PUNCT_RE.sub(" ", text).split())
+
+
+@dataclass
+class MemoryMatch:
+    """Найденный в памяти перевод"""
+    translated: str
+    original: str
+
+
+@dataclass
+class _Entry:
+    original: str
+    translated: str
+    from_lang: str
+    to_lang: str
+    # Пользователи, в чьей истории есть эта пара
+    owners: Set[str] = field(default_factory=set)
+
+
+class TranslationMemory:
+    """
+    Индекс пар из истории переводов по нормализованному тексту
+    """
+
+    def __init__(self, max_text_length: int = TM_MAX_TEXT_LENGTH):
+        """
+        Args:
+            max_text_length: Тексты длиннее не индексируются и не ищутся
+        """
+        self.max_text_length = max_text_length
+        self._entries: Dict[MemoryKey, _Entry] = {}
+
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, user_id, record: Dict) -> None:
+        """
+        Добавляет запись истории в индекс
+
+        Args:
+            user_id: ID пользователя, в чью историю попала запись
+            record: Запись истории с полями original, translated, from_lang, to_lang
+        """
+        original = record.get("original")
+        translated = record.get("translated")
+        to_lang = record.get("to_lang")
+        if not original or not translated or not to_lang or len(original) > self.max_text_length:
+            return
+        normalized = normalize_for_match(original)
+        if not normalized:
+            return
+
+        key = (normalized, to_lang)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(original, translated, record.get("from_lang", ""), to_lang)
+        else:
+            # Новый перевод того же текста заменяет старый
+            entry.original, entry.translated = original, translated
+        entry.owners.add(str(user_id))
+
+    def discard(self, user_id, record: Dict) -> None:
+        """Убирает запись, вытесненную из истории пользователя"""
+        original, to_lang = record.get("original"), record.get("to_lang")
+        if not original or not to_lang:
+            return
+        key = (normalize_for_match(original), to_lang)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.owners.discard(str(user_id))
+            if not entry.owners:
+                del self._entries[key]
+
+    def remove_user(self, user_id) -> None:
+        """Забывает пары, которые были только в истории этого пользователя"""
+        user_id_str = str(user_id)
+        for key in [key for key, entry in self._entries.items() if user_id_str in entry.owners]:
+            entry = self._entries[key]
+            entry.owners.discard(user_id_str)
+            if not entry.owners:
+                del self._entries[key]
+
+    def rebuild(self, history: Dict[str, List[Dict]]) -> None:
+        """Строит индекс заново по всей истории {user_id: [записи]}"""
+        self._entries.clear()
+        for user_id, records in history.items():
+            # Записи идут от новых к старым - добавляем в обратном порядке,
+            # чтобы последний перевод текста оказался в памяти
+            for record in reversed(records):
+                self.add(user_id, record)
+        logger.info(f"Память переводов построена: {len(self._entries)} пар")
+
+    def lookup(self, text: str, source_lang: str, target_lang: str) -> Optional[MemoryMatch]:
+        """
+        Ищет перевод текста в памяти
+
+        Args:
+            text: Текст для перевода
+            source_lang: Исходный язык или 'auto'
+            target_lang: Целевой язык
+
+        Returns:
+            Перевод того же текста или None
+        """
+        if len(text) > self.max_text_length:
+            return None
+        self.lookups += 1
+        normalized = normalize_for_match(text)
+        if not normalized:
+            return None
+
+        entry = self._entries.get((normalized, target_lang))
+        if entry is None or not self._source_matches(entry, source_lang):
+            return None
+        self.hits += 1
+        return MemoryMatch(entry.translated, entry.original)
+
+    @staticmethod
+    def _source_matches(entry: _Entry, source_lang: str) -> bool:
+        return source_lang == "auto" or not entry.from_lang or entry.from_lang == source_lang
+
+    def get_stats(self) -> Dict:
+        """Возвращает статистику памяти переводов"""
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+        }
+
+
+# Общая память переводов, None если она отключена в настройках
+translation_memory: Optional[TranslationMemory] = TranslationMemory() if TM_ENABLED else None
@@ -0,0 +1,34 @@
+"""
+Результат перевода с причиной неудачи
+
+Вместо голого None вызывающий код получает исход запроса
+и может ответить пользователю по существу
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+# Исходы перевода
+OUTCOME_OK = "ok"
+OUTCOME_TIMEOUT = "timeout"                # Не уложились в отведённое время
+OUTCOME_RATE_LIMITED = "rate_limited"      # API или наш лимит просят подождать
+OUTCOME_BAD_INPUT = "bad_input"            # API отклонил текст или языки
+OUTCOME_UPSTREAM_ERROR = "upstream_error"  # API недоступен или отвечает ошибкой
+# Ответ API непонятен. Пользователю показывается как ошибка API
+OUTCOME_INVALID_RESPONSE = "invalid_response"
+
+
+@dataclass(frozen=True)
+class TranslationResult:
+    """Результат перевода"""
+    text: Optional[str]                   # Перевод или None при неудаче
+    outcome: str = OUTCOME_OK
+    retry_after: Optional[float] = None   # Через сколько секунд имеет смысл повторить
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == OUTCOME_OK and self.text is not None
+
+    @classmethod
+    def failure(cls, outcome: str, retry_after: Optional[float] = None) -> "TranslationResult":
+        return cls(None, outcome, retry_after)
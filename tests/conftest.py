@@ -0,0 +1,92 @@
+import asyncio
+import os
+import threading
+
+# Настройки читаются при импорте модулей, поэтому задаются до них:
+# дисковый кэш не пишет в рабочий каталог, частота запросов к фейковому API
+# не ограничивается, а паузы между повторами не растягивают тесты
+os.environ.setdefault("DISK_CACHE_ENABLED", "0")
+os.environ.setdefault("RATE_LIMIT_RPS", "0")
+os.environ.setdefault("RETRY_BACKOFF_BASE", "0.01")
+
+import pytest
+from aiohttp import web
+
+import services.api_client as api_client
+import services.backends as backends
+from services.backends import FtapiBackend, backend_router
+from services.http_client import HttpClient
+from services.mock_api import create_app
+from services.translation_cache import translation_cache
+
+
+class MockApi:
+    """
+    Фейковый API перевода (services/mock_api.py), запущенный в отдельном потоке,
+    и провайдер перевода, который к нему обращается
+    """
+
+    def __init__(self, app: web.Application, backend: FtapiBackend, client: HttpClient):
+        self.app = app
+        self.backend = backend
+        self.client = client
+
+    @property
+    def requests(self) -> int:
+        """Сколько запросов перевода получил фейковый API"""
+        return self.app["stats"]["requests"]
+
+    @property
+    def faults(self) -> dict:
+        """Сбои фейкового API, см. create_app"""
+        return self.app["faults"]
+
+    def run(self, coro):
+        """Выполняет сценарий в новом event loop и закрывает HTTP-сессию этого loop"""
+        async def scenario():
+            try:
+                return await coro
+            finally:
+                await self.client.close()
+
+        return asyncio.run(scenario())
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """
+    Направляет запросы перевода в фейковый API
+    Батчинг, перевод по предложениям и память переводов отключены,
+    тесты включают то, что проверяют
+    """
+    app = create_app(latency=0)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    runner = web.AppRunner(app)
+
+    async def start() -> int:
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner.addresses[0][1]
+
+    port = asyncio.run_coroutine_threadsafe(start(), loop).result()
+    backend = FtapiBackend("mock", f"http://127.0.0.1:{port}")
+    # Своя сессия на каждый тест: сессия привязана к event loop сценария
+    client = HttpClient()
+    monkeypatch.setattr(backends, "http_client", client)
+    monkeypatch.setattr(backend_router, "backends", [backend])
+    monkeypatch.setattr(api_client, "translation_batcher", None)
+    monkeypatch.setattr(api_client, "segment_cache", None)
+    monkeypatch.setattr(api_client, "translation_memory", None)
+    translation_cache.clear()
+    try:
+        yield MockApi(app, backend, client)
+    finally:
+        translation_cache.clear()
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
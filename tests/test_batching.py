@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import services.api_client as api_client
+from services.batching import TranslationBatcher
+from services.translation_result import OUTCOME_BAD_INPUT, OUTCOME_UPSTREAM_ERROR
+
+
+@pytest.fixture
+def batcher(mock_api, monkeypatch):
+    batcher = TranslationBatcher(
+        api_client._request_translation, window=0.02, detect_func=api_client._detect_source
+    )
+    monkeypatch.setattr(api_client, "translation_batcher", batcher)
+    return batcher
+
+
+async def translate_all(texts, source_lang="en", target_lang="ru"):
+    return await asyncio.gather(*(
+        api_client.translate_text_result(text, source_lang, target_lang) for text in texts
+    ))
+
+
+def test_texts_of_one_pair_share_one_request(mock_api, batcher):
+    texts = ["good morning", "see you later", "thank you"]
+
+    results = mock_api.run(translate_all(texts))
+
+    assert [result.text for result in results] == [text.upper() for text in texts]
+    assert mock_api.requests == 1
+    assert batcher.get_stats()["batches_sent"] == 1
+
+
+def test_unsplittable_answer_falls_back_to_single_requests(mock_api, batcher):
+    # Разделитель пачки теряется в переводе
+    mock_api.faults["drop"] = "|||"
+    texts = ["good morning", "see you later", "thank you"]
+
+    results = mock_api.run(translate_all(texts))
+
+    assert [result.text for result in results] == [text.upper() for text in texts]
+    assert mock_api.requests == 1 + len(texts)
+    assert batcher.split_failures == 1
+
+
+def test_rejected_text_does_not_fail_its_neighbours(mock_api, batcher):
+    mock_api.faults["reject"] = "broken"
+    texts = ["good morning", "broken text", "thank you"]
+
+    results = mock_api.run(translate_all(texts))
+
+    assert [result.text for result in results] == ["GOOD MORNING", None, "THANK YOU"]
+    assert results[1].outcome == OUTCOME_BAD_INPUT
+    assert mock_api.requests == 1 + len(texts)
+    assert batcher.rejected_batches == 1
+
+
+def test_upstream_failure_is_shared_by_the_whole_batch(mock_api, batcher):
+    mock_api.faults["status"] = 503
+    texts = ["good morning", "see you later", "thank you"]
+
+    results = mock_api.run(translate_all(texts))
+
+    assert [result.outcome for result in results] == [OUTCOME_UPSTREAM_ERROR] * len(texts)
+    # Повторяется только объединённый запрос, по одному тексты не отправляются
+    assert mock_api.requests == api_client.RETRY_COUNT
+    assert batcher.rejected_batches == 0
+
+
+def test_auto_texts_are_batched_by_detected_language(mock_api, batcher):
+    english = ["The weather is very nice today", "Where is the railway station"]
+    german = ["Ich möchte einen Kaffee bestellen"]
+    undetected = ["ok"]
+
+    results = mock_api.run(translate_all(english + german + undetected, source_lang="auto"))
+
+    assert [result.text for result in results] == [text.upper() for text in english + german + undetected]
+    # Английские тексты в одной пачке, немецкий и неопределённый - отдельными запросами
+    assert mock_api.requests == 3
+    assert batcher.get_stats()["texts_batched"] == len(english)
+    assert batcher.undetected_texts == 1
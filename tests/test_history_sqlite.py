@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+from services.history_sqlite import SqliteHistoryStore
+
+
+def test_delayed_insert_runs_off_the_event_loop(tmp_path):
+    store = SqliteHistoryStore(str(tmp_path / "history.sqlite3"), batch_size=100, batch_delay=0.01)
+    flush_threads = []
+    flush = store.flush
+
+    def recording_flush():
+        flush_threads.append(threading.current_thread())
+        return flush()
+
+    store.flush = recording_flush
+
+    async def scenario():
+        await store.start()
+        store.add("1", {"original": "hello", "timestamp": "2024-01-01T00:00:00"})
+        await asyncio.sleep(0.1)
+        inserted = store.get_stats()["inserted"]
+        await store.close()
+        return inserted
+
+    assert asyncio.run(scenario()) == 1
+    assert flush_threads and threading.main_thread() not in flush_threads
+
+
+def test_rewrite_discards_buffered_records(tmp_path):
+    store = SqliteHistoryStore(str(tmp_path / "history.sqlite3"), batch_size=100, batch_delay=0.01)
+
+    async def scenario():
+        await store.start()
+        store.add("1", {"original": "buffered", "timestamp": "2024-01-01T00:00:00"})
+        store.rewrite({"2": [{"original": "kept", "timestamp": "2024-01-02T00:00:00"}]})
+        await asyncio.sleep(0.1)
+        await store.close()
+
+    asyncio.run(scenario())
+
+    reopened = SqliteHistoryStore(str(tmp_path / "history.sqlite3"))
+    try:
+        assert reopened.load() == {"2": [{"original": "kept", "timestamp": "2024-01-02T00:00:00"}]}
+    finally:
+        asyncio.run(reopened.close())
@@ -0,0 +1,96 @@
+import asyncio
+
+from services.history_storage import HistoryLog, WriteBehindHistory
+
+
+def test_write_behind_flush_triggers_log_compaction(tmp_path):
+    log = HistoryLog(
+        str(tmp_path / "history.jsonl"), str(tmp_path / "history.json"),
+        max_records=5, compact_interval=3600, compact_threshold=50,
+    )
+    history = WriteBehindHistory(log, max_records=5, flush_interval=3600, flush_threshold=10)
+
+    async def scenario():
+        await history.start()
+        compactions_after_start = log.compactions
+        for i in range(300):
+            history.add(str(i % 3), {"original": f"text {i}"})
+            if i % 10 == 9:
+                await history.flush()
+        # Дать запущенной компактизации завершиться
+        await log.close()
+        await history.close()
+        return compactions_after_start
+
+    compactions_after_start = asyncio.run(scenario())
+
+    assert log.compactions > compactions_after_start
+    assert log.get_stats()["appended_since_compaction"] < 50
+    assert [record["original"] for record in log.load()["0"]] == [f"text {i}" for i in range(297, 282, -3)]
+
+
+class _FlakyStore:
+    """Хранилище, первая запись в которое падает с исключением"""
+
+    def __init__(self):
+        self.records = []
+        self.fail_next = True
+
+    def load(self):
+        return {}
+
+    def add_many(self, items):
+        if self.fail_next:
+            self.fail_next = False
+            raise TypeError("Object of type bytes is not JSON serializable")
+        self.records.extend(items)
+        return True
+
+    def rewrite(self, history):
+        self.records = [(user_id, record) for user_id, records in history.items() for record in records]
+        return True
+
+    def maybe_compact(self):
+        pass
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def test_write_behind_keeps_changes_when_store_raises():
+    store = _FlakyStore()
+    history = WriteBehindHistory(store, max_records=5, flush_interval=3600, flush_threshold=100)
+
+    async def scenario():
+        await history.start()
+        history.add("1", {"original": "first"})
+        history.add("1", {"original": "second"})
+        await history.flush()
+        assert history.get_stats()["dirty"] == 2
+        await history.flush()
+        await history.close()
+
+    asyncio.run(scenario())
+
+    assert [record["original"] for _, record in store.records] == ["first", "second"]
+    assert history.get_stats()["flush_errors"] == 1
+
+
+def test_write_behind_rewrite_drops_queued_changes():
+    store = _FlakyStore()
+    store.fail_next = False
+    history = WriteBehindHistory(store, max_records=5, flush_interval=3600, flush_threshold=100)
+
+    async def scenario():
+        await history.start()
+        history.add("1", {"original": "old"})
+        await history.rewrite({"2": [{"original": "new"}]})
+        await history.close()
+
+    asyncio.run(scenario())
+
+    assert [(user_id, record["original"]) for user_id, record in store.records] == [("2", "new")]
+    assert history.get("1", 5) == []
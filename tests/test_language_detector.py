@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from services.api_client import detect_language
+from services.fast_path import FastPath
+from services.language_detector import Detection, is_reliable, language_detector
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Короткие тексты общей письменности детектор путает - язык не показывается
+    ("Добрый день", "auto"),
+    ("Hola amigo", "auto"),
+    ("Доброе утро, как дела?", "auto"),
+    ("Привет", "auto"),
+    ("Hello", "auto"),
+    ("https://x.com", "auto"),
+    ("ok", "auto"),
+    # Язык своей письменности узнаётся и по короткому тексту
+    ("Γειά σου", "el"),
+    ("안녕하세요", "ko"),
+    ("שלום", "he"),
+    # Достаточно букв для уверенного ответа
+    ("Спасибо большое", "ru"),
+    ("Це дуже добре", "uk"),
+    ("Good morning", "en"),
+    ("Where is the train station?", "en"),
+    ("Где находится вокзал?", "ru"),
+    ("Buenos días, ¿cómo estás?", "es"),
+    ("Wie geht es dir heute?", "de"),
+])
+def test_detect_language_short_texts(text, expected):
+    assert asyncio.run(detect_language(text)) == expected
+
+
+def test_detection_reports_letter_count():
+    detection = language_detector.detect("Добрый день!")
+    assert detection.script == "cyrillic"
+    assert detection.letters == 10
+
+
+def test_is_reliable_needs_letters_only_for_shared_scripts():
+    assert not is_reliable(Detection("uk", 0.95, "cyrillic", 9), 0.8, 10)
+    assert is_reliable(Detection("uk", 0.95, "cyrillic", 10), 0.8, 10)
+    assert is_reliable(Detection("el", 1.0, "greek", 3), 0.8, 10)
+    assert not is_reliable(Detection("auto", 1.0, "latin", 30), 0.8, 10)
+
+
+def test_same_language_fast_path_ignores_short_mislabels():
+    fast_path = FastPath()
+    # Детектор принимает «Добрый день» за украинский - перевод на украинский не пропускается
+    assert not fast_path.is_already_in_target("Добрый день", "uk")
+    assert fast_path.is_already_in_target("Где находится вокзал?", "ru")
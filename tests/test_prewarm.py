@@ -0,0 +1,60 @@
+import services.api_client as api_client
+from services.popular_phrases import PopularPhrases
+from services.prewarm import CachePrewarmer
+from services.scheduler import TranslationScheduler
+from services.segment_cache import SegmentCache
+from services.translation_cache import translation_cache
+from services.translation_memory import TranslationMemory
+
+
+def make_prewarmer(history):
+    memory = TranslationMemory()
+    memory.rebuild(history)
+    phrases = PopularPhrases(memory=memory, min_sentences=2)
+    phrases.rebuild(history)
+    return CachePrewarmer(phrases, api_client.refresh_translation, TranslationScheduler(), top_n=10)
+
+
+def record(original, to_lang="ru"):
+    return {"original": original, "translated": original.upper(), "from_lang": "en", "to_lang": to_lang}
+
+
+def test_prewarm_fills_cache_with_sentences_of_segmented_texts(mock_api, monkeypatch):
+    monkeypatch.setattr(
+        api_client, "segment_cache", SegmentCache(api_client._cache_lookup, api_client._translate_segment)
+    )
+    prewarmer = make_prewarmer({
+        "1": [record("Good morning. See you later.")],
+        "2": [record("See you later. Thank you.")],
+    })
+
+    async def scenario():
+        await prewarmer.run_once()
+        fetched = mock_api.requests
+        # Второй проход: всё уже в кэше и не истекает
+        await prewarmer.run_once()
+        refetched = mock_api.requests - fetched
+        # Новый текст из прогретых предложений переводится без обращения к API
+        result = await api_client.translate_text_result("Thank you. Good morning.", "auto", "ru")
+        return fetched, refetched, result
+
+    fetched, refetched, result = mock_api.run(scenario())
+
+    assert fetched == 3
+    assert refetched == 0
+    assert prewarmer.top_n >= prewarmer.candidates == 3
+    assert translation_cache.get("See you later.", "auto", "ru") == "SEE YOU LATER."
+    assert result.text == "THANK YOU. GOOD MORNING."
+    assert mock_api.requests == fetched
+
+
+def test_prewarm_skips_texts_served_by_memory(mock_api):
+    prewarmer = make_prewarmer({
+        "1": [record("Thank you"), record("Thank you")],
+        "2": [record("thank you!")],
+    })
+
+    mock_api.run(prewarmer.run_once())
+
+    assert prewarmer.candidates == 0
+    assert mock_api.requests == 0
@@ -0,0 +1,69 @@
+import asyncio
+
+import services.api_client as api_client
+from services.resilience import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+from services.translation_result import OUTCOME_UPSTREAM_ERROR
+
+
+def test_breaker_opens_rejects_and_recovers(mock_api):
+    breaker = mock_api.backend.breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=0.2)
+    mock_api.faults["status"] = 503
+
+    async def scenario():
+        states = []
+        failed = await api_client.translate_text_result("good morning", "en", "ru")
+        states.append((breaker.state, mock_api.requests))
+        # Разомкнутый выключатель отклоняет запрос, не обращаясь к API
+        rejected = await api_client.translate_text_result("see you later", "en", "ru")
+        states.append((breaker.state, mock_api.requests))
+        await asyncio.sleep(0.25)
+        states.append((breaker.state, mock_api.requests))
+        mock_api.faults["status"] = None
+        recovered = await api_client.translate_text_result("see you later", "en", "ru")
+        states.append((breaker.state, mock_api.requests))
+        return failed, rejected, recovered, states
+
+    failed, rejected, recovered, states = mock_api.run(scenario())
+
+    assert failed.outcome == rejected.outcome == OUTCOME_UPSTREAM_ERROR
+    assert recovered.text == "SEE YOU LATER"
+    assert states == [
+        (STATE_OPEN, 3),
+        (STATE_OPEN, 3),
+        (STATE_HALF_OPEN, 3),
+        (STATE_CLOSED, 4),
+    ]
+
+
+def test_failed_probe_opens_breaker_again(mock_api):
+    breaker = mock_api.backend.breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.1)
+    mock_api.faults["status"] = 503
+
+    async def scenario():
+        await api_client.translate_text_result("good morning", "en", "ru")
+        await asyncio.sleep(0.15)
+        assert breaker.state == STATE_HALF_OPEN
+        return await api_client.translate_text_result("see you later", "en", "ru")
+
+    result = mock_api.run(scenario())
+
+    assert result.outcome == OUTCOME_UPSTREAM_ERROR
+    assert breaker.state == STATE_OPEN
+    assert breaker.times_opened == 2
+    # По одной попытке на каждый вызов: после неё выключатель разомкнут
+    assert mock_api.requests == 2
+
+
+def test_rejected_text_keeps_breaker_closed(mock_api):
+    breaker = mock_api.backend.breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+    mock_api.faults["reject"] = "broken"
+
+    async def scenario():
+        for i in range(5):
+            await api_client.translate_text_result(f"broken text {i}", "en", "ru")
+
+    mock_api.run(scenario())
+
+    # Ответ 400 значит, что API работает, а плох текст
+    assert breaker.state == STATE_CLOSED
+    assert mock_api.requests == 5
@@ -0,0 +1,50 @@
+import pytest
+
+import services.api_client as api_client
+from services.translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def memory(mock_api, monkeypatch):
+    memory = TranslationMemory()
+    memory.add("1", {
+        "original": "Mary loves John.",
+        "translated": "Мэри любит Джона.",
+        "from_lang": "en",
+        "to_lang": "ru",
+    })
+    monkeypatch.setattr(api_client, "translation_memory", memory)
+    return memory
+
+
+@pytest.mark.parametrize("text", ["Mary loves John.", "mary loves john", "  MARY   loves John!"])
+def test_repeated_text_is_served_from_memory(mock_api, memory, text):
+    result = mock_api.run(api_client.translate_text_result(text, "auto", "ru"))
+
+    assert result.text == "Мэри любит Джона."
+    assert mock_api.requests == 0
+    assert memory.hits == 1
+
+
+@pytest.mark.parametrize("text, source_lang, target_lang", [
+    # Другой порядок слов - другой смысл
+    ("John loves Mary.", "en", "ru"),
+    ("Mary loves John and Kate.", "en", "ru"),
+    ("Mary loves John.", "en", "de"),
+    ("Mary loves John.", "de", "ru"),
+])
+def test_different_request_goes_to_api(mock_api, memory, text, source_lang, target_lang):
+    result = mock_api.run(api_client.translate_text_result(text, source_lang, target_lang))
+
+    assert result.text == text.upper()
+    assert mock_api.requests == 1
+    assert memory.hits == 0
+
+
+def test_cleared_history_is_forgotten(mock_api, memory):
+    memory.remove_user("1")
+
+    result = mock_api.run(api_client.translate_text_result("Mary loves John.", "en", "ru"))
+
+    assert result.text == "MARY LOVES JOHN."
+    assert mock_api.requests == 1
@@ -1,6 +1,13 @@
 import json
+import math
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from services.storage_actor import StorageActor
+from services.storage_io import quarantine_file, read_json_file, write_json
+
+# Файл с настройками пользователей
+USER_SETTINGS_FILE = "storage/user_settings.json"
 
 # Глобальный кэш для хранения пользовательских настроек
 # В реальном проекте лучше использовать базу данных
@@ -37,20 +44,17 @@ def get_user_language(user_id: int) -> str:
     # Иначе возвращаем английский по умолчанию
     return "en"
 
-def set_user_language(user_id: int, lang_code: str) -> bool:
+async def set_user_language(user_id: int, lang_code: str) -> bool:
     """
     Устанавливает язык для пользователя
     """
-    try:
-        # Убеждаемся, что у пользователя есть запись в настройках
-        if user_id not in USER_SETTINGS:
-            USER_SETTINGS[user_id] = {}
-        
+    def apply(settings: Dict) -> None:
         # Устанавливаем язык (перезаписываем если уже существует)
-        USER_SETTINGS[user_id]["language"] = lang_code
-        
-        # Сохраняем изменения
-        save_user_settings()
+        settings.setdefault(user_id, {})["language"] = lang_code
+
+    try:
+        # Изменение применяется и сохраняется актором настроек
+        await settings_store.submit(apply)
         print(f"Язык пользователя {user_id} установлен: {lang_code}")
         return True
     except Exception as e:
@@ -70,51 +74,55 @@ def get_user_translate_languages(user_id: int) -> Dict[str, str]:
         "target": "en"     # английский по умолчанию
     }
 
-def set_user_translate_languages(user_id: int, source: str, target: str) -> None:
+async def set_user_translate_languages(user_id: int, source: str, target: str) -> None:
     """
     Устанавливает языки перевода для пользователя
     """
-    # Убеждаемся, что у пользователя есть запись в настройках
-    if user_id not in USER_SETTINGS:
-        USER_SETTINGS[user_id] = {}
-    
-    # Устанавливаем языки перевода (перезаписываем если уже существует)
-    USER_SETTINGS[user_id]["translate"] = {
-        "source": source,
-        "target": target
-    }
+    def apply(settings: Dict) -> None:
+        # Устанавливаем языки перевода (перезаписываем если уже существует)
+        settings.setdefault(user_id, {})["translate"] = {
+            "source": source,
+            "target": target
+        }
     
-    # Сохраняем изменения
-    save_user_settings()
+    # Изменение применяется и сохраняется актором настроек
+    await settings_store.submit(apply)
     print(f"Языки перевода пользователя {user_id} установлены: {source} -> {target}")
 
-def swap_user_translate_languages(user_id: int) -> Dict[str, str]:
+async def swap_user_translate_languages(user_id: int) -> Dict[str, str]:
     """
     Меняет местами языки перевода пользователя
     """
-    languages = get_user_translate_languages(user_id)
-    
-    # Если исходный язык автоопределение, то нельзя менять местами
-    if languages["source"] == "auto":
-        return languages
-    
-    # Меняем местами
-    source, target = languages["target"], languages["source"]
+    def apply(settings: Dict) -> Dict[str, str]:
+        # Языки читаются и меняются в одной команде, чтобы параллельный
+        # выбор языка не потерялся между чтением и записью
+        languages = get_user_translate_languages(user_id)
+        
+        # Если исходный язык автоопределение, то нельзя менять местами
+        if languages["source"] == "auto":
+            return languages
+        
+        # Меняем местами
+        swapped = {"source": languages["target"], "target": languages["source"]}
+        settings.setdefault(user_id, {})["translate"] = swapped
+        return swapped
     
-    set_user_translate_languages(user_id, source, target)
-    return {"source": source, "target": target}
+    return await settings_store.submit(apply)
+
+def _settings_snapshot(settings: Dict) -> Dict:
+    """
+    Копия настроек для записи в другом потоке: словарь пользователя
+    копируется, вложенные словари заменяются целиком и не меняются
+    """
+    return {user_id: dict(user_settings) for user_id, user_settings in settings.items()}
 
-def save_user_settings() -> None:
+async def save_user_settings() -> None:
     """
     Сохраняет настройки пользователей в файл
     """
     try:
-        # Создаем директорию если не существует
-        os.makedirs("storage", exist_ok=True)
-        
-        # Сохраняем настройки с правильным форматированием
-        with open("storage/user_settings.json", "w", encoding="utf-8") as f:
-            json.dump(USER_SETTINGS, f, ensure_ascii=False, indent=2)
+        # Пустая команда: запись идёт через актор, по порядку с изменениями
+        await settings_store.submit(lambda settings: None)
             
         print(f"Настройки пользователей сохранены: {len(USER_SETTINGS)} пользователей")
     except Exception as e:
@@ -124,31 +132,32 @@ def load_user_settings() -> None:
     """
     Загружает настройки пользователей из файла
     """
-    global USER_SETTINGS
+    # Словарь обновляется на месте: на него ссылаются актор настроек
+    # и модули, импортировавшие USER_SETTINGS
+    USER_SETTINGS.clear()
     
     try:
-        if os.path.exists("storage/user_settings.json"):
-            with open("storage/user_settings.json", "r", encoding="utf-8") as f:
-                content = f.read().strip()
-                if content:  # Проверяем, что файл не пустой
-                    loaded_settings = json.loads(content)
-                    # Убеждаемся, что ключи - это строки (ID пользователей)
-                    USER_SETTINGS = {int(k) if k.isdigit() else k: v for k, v in loaded_settings.items()}
-                else:
-                    USER_SETTINGS = {}
+        if os.path.exists(USER_SETTINGS_FILE):
+            # Пустой файл считается пустыми настройками
+            loaded_settings = read_json_file(USER_SETTINGS_FILE, {})
+            # Убеждаемся, что ключи - это строки (ID пользователей)
+            USER_SETTINGS.update({int(k) if k.isdigit() else k: v for k, v in loaded_settings.items()})
         else:
-            USER_SETTINGS = {}
             print("Файл настроек пользователей не найден, создается новый")
     except json.JSONDecodeError as e:
         print(f"Ошибка парсинга JSON в настройках пользователей: {e}")
-        USER_SETTINGS = {}
+        # Откладываем повреждённый файл, иначе первое же сохранение затрёт его пустыми настройками
+        quarantine_file(USER_SETTINGS_FILE)
     except Exception as e:
         print(f"Error loading user settings: {e}")
-        USER_SETTINGS = {}
 
 # Загружаем настройки при импорте модуля
 load_user_settings()
 
+# Единственный писатель настроек: изменения применяются по очереди
+# и сохраняются групповой записью файла
+settings_store = StorageActor("user_settings", USER_SETTINGS_FILE, lambda: USER_SETTINGS, _settings_snapshot)
+
 def format_translation_history(history_items: list, user_lang: str) -> str:
     """
     Форматирует историю переводов для отображения
@@ -174,19 +183,36 @@ def format_translation_history(history_items: list, user_lang: str) -> str:
     
     return "\n".join(result)
 
+def format_translation_error(user_lang: str, outcome: str, retry_after: Optional[float] = None) -> str:
+    """
+    Возвращает сообщение об ошибке перевода с учётом её причины
+    """
+    keys = {
+        "timeout": "translation_timeout",
+        "rate_limited": "translation_rate_limited",
+        "bad_input": "translation_bad_input",
+        "upstream_error": "api_error",
+        "invalid_response": "api_error",
+    }
+    text = get_message(user_lang, keys.get(outcome, "translation_error"))
+    if retry_after and outcome in ("rate_limited", "upstream_error"):
+        text += get_message(user_lang, "translation_retry_in").format(seconds=math.ceil(retry_after))
+    return text
+
 def get_user_settings(user_id: int) -> Dict[str, Any]:
     """
     Получает все настройки пользователя
     """
     return USER_SETTINGS.get(user_id, {})
 
-def clear_user_settings(user_id: int) -> bool:
+async def clear_user_settings(user_id: int) -> bool:
     """
     Очищает все настройки пользователя
     """
-    if user_id in USER_SETTINGS:
-        del USER_SETTINGS[user_id]
-        save_user_settings()
+    def apply(settings: Dict) -> bool:
+        return settings.pop(user_id, None) is not None
+
+    if await settings_store.submit(apply):
         print(f"Настройки пользователя {user_id} очищены")
         return True
     return False
@@ -197,14 +223,12 @@ def get_all_users_count() -> int:
     """
     return len(USER_SETTINGS)
 
-def backup_user_settings(backup_file: str = "storage/user_settings_backup.json") -> bool:
+async def backup_user_settings(backup_file: str = "storage/user_settings_backup.json") -> bool:
     """
     Создает резервную копию настроек пользователей
     """
     try:
-        os.makedirs("storage", exist_ok=True)
-        with open(backup_file, "w", encoding="utf-8") as f:
-            json.dump(USER_SETTINGS, f, ensure_ascii=False, indent=2)
+        await write_json(backup_file, _settings_snapshot(USER_SETTINGS))
         print(f"Резервная копия настроек создана: {backup_file}")
         return True
     except Exception as e:
@@ -0,0 +1,96 @@
+"""
+Разбиение текста на абзацы, предложения и фрагменты для перевода
+Каждый кусок сохраняет свои завершающие пробельные символы,
+поэтому склейка кусков в исходном порядке восстанавливает текст без потерь
+"""
+
+import re
+from typing import List, Pattern, Tuple
+
+_PARAGRAPH_RE = re.compile(r"(\n[ \t]*\n\s*)")
+_SENTENCE_RE = re.compile(r"((?<=[.!?…。！？])\s+|\n+)")
+_WORD_RE = re.compile(r"(\s+)")
+
+
+def _split_keeping(text: str, pattern: Pattern) -> List[str]:
+    """
+    Делит текст по шаблону с одной группой, приклеивая разделитель к предыдущему куску
+    """
+    parts = pattern.split(text)
+    pieces = []
+    for i in range(0, len(parts), 2):
+        piece = parts[i] + (parts[i + 1] if i + 1 < len(parts) else "")
+        if piece:
+            pieces.append(piece)
+    return pieces
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Делит текст на абзацы"""
+    return _split_keeping(text, _PARAGRAPH_RE)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Делит текст на предложения (и строки)"""
+    return _split_keeping(text, _SENTENCE_RE)
+
+
+def _split_oversized(piece: str, max_chars: int) -> List[str]:
+    """
+    Делит слишком длинный кусок сначала по предложениям, затем по словам,
+    а в крайнем случае - жёстко по max_chars символов
+    """
+    if len(piece) <= max_chars:
+        return [piece]
+
+    sentences = split_sentences(piece)
+    if len(sentences) > 1:
+        return [part for sentence in sentences for part in _split_oversized(sentence, max_chars)]
+
+    words = _split_keeping(piece, _WORD_RE)
+    if len(words) > 1:
+        return [part for word in words for part in _split_oversized(word, max_chars)]
+
+    return [piece[i:i + max_chars] for i in range(0, len(piece), max_chars)]
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Делит текст на фрагменты не длиннее max_chars
+    Границы выбираются по абзацам, затем по предложениям, затем по словам
+
+    Args:
+        text: Исходный текст
+        max_chars: Максимальная длина фрагмента
+
+    Returns:
+        Список фрагментов, склейка которых равна исходному тексту
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    current = ""
+    for paragraph in split_paragraphs(text):
+        for piece in _split_oversized(paragraph, max_chars):
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def strip_edges(piece: str) -> Tuple[str, str, str]:
+    """
+    Отделяет ведущие и завершающие пробельные символы
+
+    Returns:
+        (ведущие пробелы, содержимое, завершающие пробелы)
+    """
+    core = piece.strip()
+    if not core:
+        return piece, "", ""
+    start = piece.index(core)
+    return piece[:start], core, piece[start + len(core):]